@@ -0,0 +1,213 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import dataclasses
+import json
+import pathlib
+import statistics
+import time
+import typing
+
+__all__ = ['Result', 'measure', 'report', 'calibrate', 'add_baseline_arguments', 'load_baseline', 'save_baseline',
+           'regressions', 'check']
+
+BASELINES = pathlib.Path(__file__).parent.joinpath('baselines')
+
+
+@dataclasses.dataclass()
+class Result:
+    """The timing of a single benchmark."""
+    name: str
+    number: int
+    seconds: float
+
+    @property
+    def per_call(self) -> float:
+        return self.seconds / self.number if self.number else 0.0
+
+    def __str__(self):
+        return f'{self.name:<48} {self.number:>8}x {self.seconds:>10.4f}s {self.per_call * 1e6:>12.2f}us/call'
+
+
+def measure(name: str, func: typing.Callable[[], typing.Any], *, number: int = 1, batches: int = 5) -> Result:
+    """Calls `func` `number` times, split into `batches`, and returns how long
+    it took.  The time is extrapolated from the fastest batch, which filters
+    out interference from the rest of the system."""
+    batches = max(min(batches, number), 1)
+    best = float('inf')
+
+    for index in range(batches):
+        size = number // batches + (index < number % batches)
+        start = time.perf_counter()
+
+        for _ in range(size):
+            func()
+
+        best = min(best, (time.perf_counter() - start) / max(size, 1))
+
+    return Result(name, number, best * number)
+
+
+def report(results: typing.Iterable[Result]):
+    """Prints the results of a benchmark run."""
+    for result in results:
+        print(result)
+
+
+# Baseline methods
+def _reference_workload():
+    total = 0
+
+    for index in range(100_000):
+        total += index * index % 7
+
+    return total
+
+
+def calibrate(*, batches: int = 10) -> float:
+    """Times a fixed, pure Python workload.  Baselines store this timing so
+    they can be scaled to the speed of the machine comparing against them."""
+    return measure('calibration', _reference_workload, number=batches, batches=batches).per_call
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser, name: str):
+    """Adds the arguments `check` expects to `parser`.  The baseline is
+    stored in benchmarks/baselines/`name`.json by default."""
+    parser.add_argument('--baseline', type=pathlib.Path, default=BASELINES.joinpath(f'{name}.json'),
+                        help='The file of per-call timings to compare against.')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Saves this run's timings as the baseline instead of comparing against it.")
+    parser.add_argument('--margin', type=float, default=0.5,
+                        help='How much slower, as a fraction of its baseline, a benchmark may be before it is '
+                             'reported.')
+    parser.add_argument('--min-delta', type=float, default=2.0,
+                        help='How much slower, in microseconds per call, a benchmark must also be before it is '
+                             'reported;  differences smaller than this are mostly noise.')
+    parser.add_argument('--attempts', type=int, default=3,
+                        help='How many runs a baseline is the median of.  When comparing, the benchmarks are run '
+                             'up to this many times before a slow benchmark is reported.')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exits with 1 if any benchmark regressed, instead of only reporting it.')
+
+
+def load_baseline(path: pathlib.Path) -> typing.Tuple[float, typing.Dict[str, float]]:
+    """Loads the calibration timing and the per-call timings, in seconds,
+    saved in `path`."""
+    with path.open(encoding='UTF-8') as infile:
+        data = json.load(infile)
+
+    return data['calibration'], data['timings']
+
+
+def save_baseline(path: pathlib.Path, results: typing.Iterable[Result], calibration: float):
+    """Saves the per-call timings of `results`, alongside the machine's
+    calibration timing, to `path`."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    with path.open('w', encoding='UTF-8') as outfile:
+        json.dump({'calibration': calibration, 'timings': {r.name: r.per_call for r in results}}, outfile, indent=2)
+        outfile.write('\n')
+
+
+def regressions(results: typing.Iterable[Result], baseline: typing.Dict[str, float], margin: float,
+                min_delta: float = 0.0) -> typing.List[typing.Tuple[Result, float]]:
+    """Returns every result, alongside its baseline, that's more than
+    `margin` slower than its baseline, and more than `min_delta` seconds per
+    call slower.  Results without a baseline are ignored."""
+    slow = []
+
+    for result in results:
+        expected = baseline.get(result.name)
+
+        if expected is None:
+            continue
+
+        if result.per_call > expected * (1 + margin) and result.per_call - expected > min_delta:
+            slow.append((result, expected))
+
+    return slow
+
+
+def _medians(runs: typing.List[typing.List[Result]]) -> typing.Dict[str, Result]:
+    by_name: typing.Dict[str, typing.List[Result]] = {}
+
+    for results in runs:
+        for result in results:
+            by_name.setdefault(result.name, []).append(result)
+
+    return {name: sorted(r, key=lambda x: x.per_call)[(len(r) - 1) // 2] for name, r in by_name.items()}
+
+
+def check(run: typing.Callable[[], typing.List[Result]], options: argparse.Namespace) -> int:
+    """Runs the benchmarks, then compares their results against the
+    baseline named in `options`, or saves them as the new baseline.
+
+    Baselines hold the median of `options.attempts` runs.  When comparing,
+    the baseline's timings are scaled by how much faster or slower this
+    machine is than the one that saved it, and if any benchmark looks slow,
+    the benchmarks are run again, up to `options.attempts` times, and their
+    medians compared instead.  Regressions are only reported, unless
+    `options.fail_on_regression` is set.  Returns the exit code of the run."""
+    attempts = max(options.attempts, 1)
+    runs = [run()]
+    calibrations = [calibrate()]
+
+    def rerun():
+        runs.append(run())
+        calibrations.append(calibrate())
+
+    if options.save_baseline:
+        for _ in range(1, attempts):
+            rerun()
+
+        results = _medians(runs)
+        save_baseline(options.baseline, results.values(), statistics.median(calibrations))
+        print(f'Saved the median of {len(runs)} runs of {len(results)} benchmarks to {options.baseline}')
+
+        return 0
+
+    if not options.baseline.exists():
+        print(f'No baseline at {options.baseline};  run with --save-baseline to create one.')
+
+        return 0
+
+    expected_calibration, timings = load_baseline(options.baseline)
+
+    while True:
+        results = _medians(runs)
+        scale = statistics.median(calibrations) / expected_calibration
+        baseline = {name: seconds * scale for name, seconds in timings.items()}
+        slow = regressions(results.values(), baseline, options.margin, options.min_delta / 1e6)
+
+        if not slow or len(runs) >= attempts:
+            break
+
+        print(f'{len(slow)} benchmarks were slower than their baseline;  running every benchmark again '
+              f'({len(runs) + 1}/{attempts})...')
+        rerun()
+
+    print(f'This machine ran the calibration workload {1 / scale:.2f}x as fast as the baseline machine.')
+
+    for result, expected in slow:
+        print(f'Regression: {result.name} took {result.per_call * 1e6:.2f}us/call;  the baseline is '
+              f'{expected * 1e6:.2f}us/call (+{options.margin:.0%} and {options.min_delta:g}us allowed)')
+
+    missing = sum(1 for name in results if name not in baseline)
+
+    if missing:
+        print(f'{missing} benchmarks have no baseline;  run with --save-baseline to record them.')
+
+    return 1 if slow and options.fail_on_regression else 0
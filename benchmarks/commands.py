@@ -0,0 +1,213 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+# Benchmarks the command framework's hot path.  Run from the repository's
+# root:
+#
+#   python -m benchmarks.commands [--number 10000] [--save-baseline] [--fail-on-regression]
+#
+# Reports every benchmark slower than benchmarks/baselines/commands.json by more
+# than the margin, after scaling the baseline to this machine's speed.  With
+# --fail-on-regression, exits with 1 if any were.
+import argparse
+import sys
+import typing
+
+from core import commands
+from core.commands import converters
+from core.dataclassez import User
+from core.utils.enums import Roles
+from . import Result, add_baseline_arguments, check, measure, report
+
+SIZES = (10, 100, 1000)
+DEPTHS = (1, 4, 16)
+
+
+def noop(*args, **kwargs):
+    pass
+
+
+def typed(count: int, ratio: float, enabled: bool, items: list, name):
+    pass
+
+
+def keywords(count: int, *, items: list, name):
+    pass
+
+
+def populate(manager: commands.Manager, count: int):
+    """Registers `count` root commands, each with two aliases."""
+    manager.commands = [commands.Command(name=f'command{i}', aliases=[f'alias{i}', f'a{i}'], func=noop)
+                        for i in range(count)]
+
+
+def nest(manager: commands.Manager, depth: int, *, width: int = 10) -> str:
+    """Registers a chain of `depth` groups, each with `width` children, and
+    returns the query that reaches the innermost command."""
+    root = commands.Group(name='group0', func=noop)
+    manager.commands = [root]
+    current = root
+
+    for level in range(1, depth + 1):
+        for sibling in range(width - 1):
+            current.children.append(commands.Command(name=f'sibling{level}_{sibling}', func=noop, parent=current))
+
+        child = commands.Group(name=f'group{level}', func=noop, parent=current)
+        current.children.append(child)
+        current = child
+
+    return ' '.join(f'group{level}' for level in range(depth + 1)) + ' first second'
+
+
+def parse_benchmarks(manager: commands.Manager, number: int) -> typing.List[Result]:
+    results = []
+
+    for size in SIZES:
+        populate(manager, size)
+        last = f'command{size - 1} first "second argument" third'
+
+        def miss():
+            try:
+                manager.parse('missing first second')
+
+            except commands.errors.CommandNotFound:
+                pass
+
+        results.extend([
+            measure(f'parse ({size} commands, first)', lambda: manager.parse('command0 first second'), number=number),
+            measure(f'parse ({size} commands, last)', lambda: manager.parse(last), number=number),
+            measure(f'parse ({size} commands, alias)', lambda: manager.parse(f'a{size - 1}'), number=number),
+            measure(f'parse ({size} commands, ignore case)',
+                    lambda: manager.parse(f'COMMAND{size - 1}', ignore_case=True), number=number),
+            measure(f'parse ({size} commands, miss)', miss, number=number)
+        ])
+
+    for depth in DEPTHS:
+        query = nest(manager, depth)
+        results.append(measure(f'parse (groups nested {depth} deep)', lambda: manager.parse(query), number=number))
+
+    return results
+
+
+def convert_benchmarks(manager: commands.Manager, number: int) -> typing.List[Result]:
+    arguments = ('42', '0.5', 'yes', '1;2;3', 'raw')
+
+    results = []
+
+    for converter, argument in ((converters.IntConverter, '42'), (converters.FloatConverter, '0.5'),
+                                (converters.BooleanConverter, 'yes'), (converters.ListConverter, 'a;b;c')):
+        def single(value):
+            pass
+
+        single.__annotations__ = {'value': converter.result()}
+        results.append(measure(f'convert_args ({converter.__name__})',
+                               lambda f=single, a=argument: manager.convert_args(f, a), number=number))
+
+    results.extend([
+        measure('convert_args (every converter)', lambda: manager.convert_args(typed, *arguments), number=number),
+        measure('convert_args (keyword arguments)',
+                lambda: manager.convert_args(keywords, '42', items='1;2;3', name='raw'), number=number),
+        measure('convert_args (unannotated)', lambda: manager.convert_args(noop, *arguments), number=number)
+    ])
+
+    return results
+
+
+def list_benchmarks(number: int) -> typing.List[Result]:
+    short = '1;2;3'
+    long = ';'.join(str(i) for i in range(100))
+    quoted = '"one two";"three four";"five six"'
+
+    return [
+        measure('ListConverter (3 items)', lambda: converters.ListConverter.convert(short), number=number),
+        measure('ListConverter (100 items)', lambda: converters.ListConverter.convert(long), number=number),
+        measure('ListConverter (quoted items)', lambda: converters.ListConverter.convert(quoted), number=number),
+        measure('ListConverter (3 items, int children)',
+                lambda: converters.ListConverter.convert(short, children=int), number=number),
+        measure('ListConverter (100 items, int children)',
+                lambda: converters.ListConverter.convert(long, children=int), number=number),
+        measure('ListConverter (100 items, float children)',
+                lambda: converters.ListConverter.convert(long, children=float), number=number)
+    ]
+
+
+def invoke_benchmarks(manager: commands.Manager, number: int) -> typing.List[Result]:
+    results = []
+
+    for size in SIZES:
+        populate(manager, size)
+        manager.commands.extend([commands.Command(name='typed', func=typed),
+                                 commands.Command(name='keywords', func=keywords)])
+
+        results.extend([
+            measure(f'invoke ({size} commands, varargs)',
+                    lambda: manager.invoke(f'command{size - 1} first second'), number=number),
+            measure(f'invoke ({size} commands, converted)',
+                    lambda: manager.invoke('typed 42 0.5 yes 1;2;3 raw'), number=number),
+            measure(f'invoke ({size} commands, keyword arguments)',
+                    lambda: manager.invoke('keywords 42 items=1;2;3 name=raw'), number=number)
+        ])
+
+    return results
+
+
+def authorize_benchmarks(manager: commands.Manager, number: int) -> typing.List[Result]:
+    viewer = User('viewer', 'Viewer')
+    moderator = User('moderator', 'Moderator', moderator=True, roles=Roles.MODERATOR | Roles.SUBSCRIBER)
+
+    public = commands.Command(name='public', func=noop)
+    roles = commands.Command(name='roles', func=noop, permission=commands.Permission(Roles.MODERATION))
+    lists = commands.Command(name='lists', func=noop,
+                             permission=commands.Permission(Roles.MODERATION, allow=frozenset({'viewer'}),
+                                                            deny=frozenset({'banned'})))
+    channels = commands.Command(name='channels', func=noop,
+                                permission=commands.Permission(Roles.MODERATION, channels={
+                                    f'channel{i}': commands.Permission(Roles.BROADCASTER) for i in range(100)
+                                }))
+    manager.commands = []
+    manager.register(public, roles, lists, channels)
+
+    return [
+        measure('authorize (public)', lambda: manager.authorize(public, viewer, 'channel'), number=number),
+        measure('authorize (roles, granted)', lambda: manager.authorize(roles, moderator, 'channel'), number=number),
+        measure('authorize (roles, denied)', lambda: manager.authorize(roles, viewer, 'channel'), number=number),
+        measure('authorize (allow and deny lists)', lambda: manager.authorize(lists, viewer, 'channel'),
+                number=number),
+        measure('authorize (100 channel overrides)', lambda: manager.authorize(channels, moderator, 'channel50'),
+                number=number)
+    ]
+
+
+def main(args: typing.List[str] = None):
+    parser = argparse.ArgumentParser(description='Benchmarks the command framework.')
+    parser.add_argument('--number', type=int, default=10_000, help='The number of calls to time per benchmark.')
+    add_baseline_arguments(parser, 'commands')
+    options = parser.parse_args(args)
+
+    manager = commands.Manager()
+
+    def run() -> typing.List[Result]:
+        results = [*parse_benchmarks(manager, options.number), *convert_benchmarks(manager, options.number),
+                   *list_benchmarks(options.number), *invoke_benchmarks(manager, options.number),
+                   *authorize_benchmarks(manager, options.number)]
+        report(results)
+
+        return results
+
+    return check(run, options)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+# Benchmarks the quote store at scale.  Run from the repository's root:
+#
+#   python -m benchmarks.quotes [--quotes 100000]
+import argparse
+import importlib.util
+import pathlib
+import random
+import sys
+import tempfile
+import typing
+
+from PySide6 import QtCore
+
+from core.utils.database import Database
+from . import measure, report
+
+
+def _load_storage():
+    # Importing extensions.quotes.storage would import the extension's
+    # package first, along with PySide2 and its widgets, so the module is
+    # loaded from its path instead.
+    path = pathlib.Path(__file__).parent.parent.joinpath('extensions', 'quotes', 'storage.py')
+    spec = importlib.util.spec_from_file_location('benchmarks._quotes_storage', path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+
+    return module
+
+
+QuoteStore = _load_storage().QuoteStore
+
+# A vocabulary about the size of a chat's, so searches match a realistic share
+# of quotes instead of nearly all of them.
+_rng = random.Random(0)
+WORDS = tuple(''.join(_rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(_rng.randint(3, 9)))
+              for _ in range(5000))
+AUTHORS = ('SirRandoo', 'Streamer', 'Viewer', 'Moderator', 'Raider')
+
+
+def populate(database: Database, count: int, *, seed: int = 0):
+    """Queues `count` random quotes, then writes them in a single batch."""
+    rng = random.Random(seed)
+
+    for _ in range(count):
+        text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+        database.enqueue(QuoteStore.INSERT, text, rng.choice(AUTHORS), 'benchmark', 0)
+
+    database.flush()
+
+
+def main(args: typing.List[str] = None):
+    parser = argparse.ArgumentParser(description='Benchmarks the quote store.')
+    parser.add_argument('--quotes', type=int, default=100_000, help='The number of quotes to store.')
+    parser.add_argument('--lookups', type=int, default=10_000, help='The number of lookups to time.')
+    options = parser.parse_args(args)
+
+    app = QtCore.QCoreApplication(sys.argv[:1])
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(str(pathlib.Path(directory, 'benchmark.db')))
+        store = QuoteStore(database)
+        store.create()
+
+        results = [measure(f'insert {options.quotes} quotes (batched)', lambda: populate(database, options.quotes))]
+        largest = store.count()
+        rng = random.Random(1)
+
+        def order_by_random():
+            query = database.execute(f'SELECT {QuoteStore.COLUMNS} FROM quotes ORDER BY RANDOM() LIMIT 1')
+            query.next()
+            query.finish()
+
+        def cold_get():
+            store._cache.clear()
+            store.get(rng.randint(1, largest))
+
+        hot = [rng.randint(1, largest) for _ in range(store.cache_size)]
+
+        for quote_id in hot:
+            store.get(quote_id)
+
+        results.extend([
+            measure('random (rowid sampling)', store.random, number=options.lookups),
+            measure('random (ORDER BY RANDOM())', order_by_random, number=max(options.lookups // 100, 1)),
+            measure('get (cold)', cold_get, number=options.lookups),
+            measure('get (cached)', lambda: store.get(rng.choice(hot)), number=options.lookups),
+            measure('search (one term)', lambda: store.search(rng.choice(WORDS)), number=options.lookups // 10),
+            measure('search (two terms)', lambda: store.search(f'{rng.choice(WORDS)} {rng.choice(WORDS)}'),
+                    number=options.lookups // 10)
+        ])
+
+        database.close()
+
+    report(results)
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+# Replays chat through the Twitch platform and the client's command pipeline.
+# Run from the repository's root:
+#
+#   python -m benchmarks.replay [--messages 50000 --rate 0 --commands 0.2 --users 1000]
+#   python -m benchmarks.replay --transcript chat.log
+#
+# Transcripts contain one raw IRC line per line, as sent by Twitch's servers.
+import argparse
+import array
+import collections
+import dataclasses
+import gc
+import pathlib
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+
+from PySide6 import QtCore
+
+from QtTwitch import gateway
+from core import commands, eventlog
+from core.daemon import QCoreApp
+from core.utils.database import Database
+
+__all__ = ['FakeGateway', 'Report', 'synthetic', 'transcript', 'replay']
+
+WORDS = ('hello', 'pog', 'lul', 'nice', 'gg', 'what', 'is', 'this', 'stream', 'chat', 'hype', 'clip', 'that',
+         'no', 'way', 'kappa', 'the', 'boss', 'again', 'wow')
+
+
+class FakeGateway(QtCore.QObject):
+    """A stand-in for QtTwitch's `gateway.Gateway` that never opens a socket.
+    Lines passed to `feed` are emitted through `on_message` exactly like lines
+    read from Twitch's servers, and messages the bot sends are counted."""
+    on_message = QtCore.Signal(str)
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super(FakeGateway, self).__init__(parent=parent)
+
+        self.channels: typing.List[str] = []
+        self.nick = ''
+        self.token = ''
+        self.sent = 0
+        self.recent: typing.Deque[str] = collections.deque(maxlen=100)
+
+        self._connected = False
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def connect(self, host: str = None, port: int = None):
+        self._connected = True
+
+    def disconnect(self):
+        self._connected = False
+
+    def join(self, channel: str):
+        self.channels.append(channel.lower())
+
+    def part(self, channel: str):
+        if channel.lower() in self.channels:
+            self.channels.remove(channel.lower())
+
+    def set_credentials(self, nick: str, token: str):
+        self.nick = nick
+        self.token = token
+
+    def send_priv_message(self, channel: str, message: str):
+        self.sent += 1
+        self.recent.append(f'PRIVMSG #{channel} :{message}')
+
+    def feed(self, line: str):
+        """Delivers a raw IRC line as if it were read from the socket."""
+        self.on_message.emit(line)
+
+
+@dataclasses.dataclass()
+class Report:
+    """The outcome of a replay."""
+    messages: int
+    commands: int
+    replies: int
+    seconds: float
+    latencies: typing.Sequence[float]  # Seconds, per message
+    command_latencies: typing.Sequence[float]
+    retained: int  # Bytes allocated during the replay that are still alive
+    peak: int
+    growth: typing.List[tracemalloc.StatisticDiff]
+
+    @property
+    def throughput(self) -> float:
+        return self.messages / self.seconds if self.seconds else 0.0
+
+    @staticmethod
+    def percentiles(latencies: typing.Sequence[float]) -> str:
+        if len(latencies) < 2:
+            return 'n/a'
+
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        values = {'p50': cuts[49], 'p90': cuts[89], 'p99': cuts[98], 'max': max(latencies)}
+
+        return '  '.join(f'{k}={v * 1e6:.1f}us' for k, v in values.items())
+
+    def __str__(self):
+        lines = [
+            f'messages        {self.messages} ({self.commands} commands, {self.replies} replies)',
+            f'elapsed         {self.seconds:.3f}s',
+            f'throughput      {self.throughput:,.0f} messages/s',
+            f'latency         {self.percentiles(self.latencies)}',
+            f'command latency {self.percentiles(self.command_latencies)}',
+            f'memory          {self.retained / 1024:,.1f}KiB retained, {self.peak / 1024:,.1f}KiB peak '
+            f'({self.retained / max(self.messages, 1):.1f}B/message retained)'
+        ]
+
+        for stat in self.growth:
+            lines.append(f'  {stat.size_diff / 1024:+10.1f}KiB  {stat.traceback[0]}')
+
+        return '\n'.join(lines)
+
+
+def synthetic(count: int, *, channel: str, prefix: str, command_ratio: float, users: int,
+              names: typing.Sequence[str], seed: int = 0) -> typing.Iterator[str]:
+    """Yields `count` PRIVMSG lines from `users` distinct chatters.  About
+    `command_ratio` of them invoke one of `names`."""
+    rng = random.Random(seed)
+
+    for index in range(count):
+        user = f'viewer{rng.randrange(users)}'
+        badges = 'moderator/1' if rng.random() < 0.05 else 'subscriber/12' if rng.random() < 0.3 else ''
+
+        if rng.random() < command_ratio:
+            text = f'{prefix}{rng.choice(names)} ' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 3)))
+
+        else:
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+
+        yield (f'@badges={badges};color=#{rng.randrange(0xFFFFFF):06X};display-name={user.title()};'
+               f'id={index};mod={int(badges.startswith("moderator"))};tmi-sent-ts={int(time.time() * 1000)} '
+               f':{user}!{user}@{user}.tmi.twitch.tv PRIVMSG #{channel} :{text.rstrip()}')
+
+
+def transcript(path: pathlib.Path) -> typing.Iterator[str]:
+    """Yields the IRC lines recorded in `path`."""
+    with path.open(encoding='UTF-8') as infile:
+        for line in infile:
+            if line.strip():
+                yield line.rstrip('\r\n')
+
+
+def replay(irc: FakeGateway, client, lines: typing.Iterable[str], *, rate: float = 0) -> Report:
+    """Feeds `lines` through `irc`, `rate` lines per second, or as fast as
+    possible if `rate` isn't positive.  Each line is processed synchronously,
+    so its latency is how long delivering it took."""
+    app = QtCore.QCoreApplication.instance()
+    interval = 1 / rate if rate > 0 else 0
+    executed = [0]
+    latencies = array.array('d')
+    command_latencies = array.array('d')
+    ignored = [tracemalloc.Filter(False, __file__), tracemalloc.Filter(False, tracemalloc.__file__)]
+
+    client.onCommandExecute.connect(lambda _: executed.__setitem__(0, executed[0] + 1))
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot().filter_traces(ignored)
+    sent = irc.sent
+    start = time.perf_counter()
+    deadline = start
+
+    for index, line in enumerate(lines):
+        if interval:
+            deadline += interval
+            delay = deadline - time.perf_counter()
+
+            if delay > 0:
+                app.processEvents(QtCore.QEventLoop.AllEvents, int(delay * 1000))
+                time.sleep(max(deadline - time.perf_counter(), 0))
+
+        elif index % 1000 == 0:
+            app.processEvents()  # Let timers, like the database's flush timer, fire
+
+        commands_before = executed[0]
+        began = time.perf_counter()
+        irc.feed(line)
+        latency = time.perf_counter() - began
+
+        latencies.append(latency)
+
+        if executed[0] != commands_before:
+            command_latencies.append(latency)
+
+    seconds = time.perf_counter() - start
+    app.processEvents()
+    gc.collect()
+
+    # The replay's own bookkeeping, like the latency arrays, is excluded.
+    after = tracemalloc.take_snapshot().filter_traces(ignored)
+    memory_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return Report(len(latencies), executed[0], irc.sent - sent, seconds, latencies, command_latencies,
+                  sum(t.size for t in after.traces) - sum(t.size for t in before.traces), memory_peak,
+                  after.compare_to(before, 'lineno')[:5])
+
+
+def register_commands(manager: commands.Manager) -> typing.List[str]:
+    """Registers a few commands shaped like real ones, and returns their
+    names.  Replies go through the platform, so they're rate limited like
+    real replies."""
+
+    @commands.command(name='ping')
+    def ping(ctx):
+        ctx.reply('pong')
+
+    @commands.command(name='echo', aliases=['say'])
+    def echo(ctx, *words):
+        ctx.reply(f'@{ctx.invoker.display_name} {" ".join(words)}')
+
+    @commands.command(name='roll')
+    def roll(ctx, sides: int = 6):
+        ctx.reply(str(random.randint(1, sides)))
+
+    manager.commands.extend([ping, echo, roll])
+
+    return ['ping', 'echo', 'say', 'roll', 'missing']
+
+
+def main(args: typing.List[str] = None):
+    parser = argparse.ArgumentParser(description='Replays chat through the Twitch platform and command pipeline.')
+    parser.add_argument('--transcript', type=pathlib.Path, help='A file of raw IRC lines to replay.')
+    parser.add_argument('--messages', type=int, default=50_000, help='The number of synthetic messages.')
+    parser.add_argument('--rate', type=float, default=0, help='Messages per second;  0 replays without pacing.')
+    parser.add_argument('--commands', type=float, default=0.2, help='The share of synthetic messages invoking '
+                                                                    'commands.')
+    parser.add_argument('--users', type=int, default=1000, help='The number of distinct synthetic chatters.')
+    parser.add_argument('--channel', default='shovelbot')
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args(args)
+
+    # The Twitch extension's pool opens its connections through gateway.Gateway.
+    gateway.Gateway = FakeGateway
+
+    app = QCoreApp(sys.argv[:1])
+    client = app.client
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+
+        # Keep the replay away from the user's settings and data.
+        client.database = Database(str(directory.joinpath('replay.db')), parent=client)
+        client.event_log = eventlog.EventLog(directory.joinpath('events'))
+        client._settings_file = QtCore.QFile(str(directory.joinpath('replay.settings')))
+        client.load_settings()
+
+        for extension in client.load_extension(pathlib.Path('extensions', 'twitch')):
+            client.extensions[extension.NAME] = extension
+
+        client.setup_extensions()
+        twitch = client.extensions['twitch']
+        twitch.channel.set_value(options.channel)
+        client.start_bot()
+
+        names = register_commands(client.command_manager)
+        irc: FakeGateway = twitch.irc.shards[options.channel]
+
+        if options.transcript is not None:
+            lines = transcript(options.transcript)
+
+        else:
+            lines = synthetic(options.messages, channel=options.channel, prefix=client.prefix.value,
+                              command_ratio=options.commands, users=options.users, names=names, seed=options.seed)
+
+        print(replay(irc, client, lines, rate=options.rate))
+        twitch.outbound.dump()
+
+        client.stop_bot()
+        client.database.close()
+        client.event_log.close()
+
+    app.quit()
+
+
+if __name__ == '__main__':
+    main()
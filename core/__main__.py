@@ -13,31 +13,63 @@ PARTICULAR PURPOSE.  See the GNU General Public License for more details.
 You should have received a copy of the GNU General Public License along with
 ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
+import importlib.metadata
+import importlib.util
 import json
 import logging
 import pathlib
-import subprocess
 
-import PySide6
 import sys
 import traceback
 import typing
 
 import click
-from PySide6 import QtCore, QtNetwork, QtWidgets
 
-from QtUtilities import settings
-from QtUtilities.utils import qmessage_handler
-from utils.custom import QApp
+from utils import dependencies, metadata, snapshot
+
+if typing.TYPE_CHECKING:
+    from daemon import QCoreApp
+    from utils.custom import QApp
 
 # Declarations
-application = QApp(sys.argv)
+# The application is created on demand, since constructing it also constructs
+# the client, its help engine, database, and web views.  Commands that only
+# print text, or run pip, shouldn't have to pay for any of that.
+application: typing.Optional[typing.Union['QApp', 'QCoreApp']] = None
+
+
+def get_application(*, headless: bool = False, profile_startup: bool = False) -> typing.Union['QApp', 'QCoreApp']:
+    """Returns the application, creating it if it doesn't exist yet.  If
+    `headless` is True, the application is created without a display.  If
+    `profile_startup` is True, the application's startup is traced from the
+    moment it's created."""
+    global application
+
+    if application is None and headless:
+        from daemon import QCoreApp
+
+        application = QCoreApp(sys.argv, profile_startup=profile_startup)
+
+        # There's no display to report errors in
+        sys.excepthook = headless_syshook
+
+    elif application is None:
+        from utils.custom import QApp
+
+        application = QApp(sys.argv, profile_startup=profile_startup)
+
+        # Assign the GUI handler to the interpreter's excepthook
+        sys.excepthook = syshook
+
+    return application
 
 
 # Custom exception handler
 # noinspection PyArgumentList
 def syshook(except_class: typing.Type[Exception], except_instance: Exception, trace):
     """A custom syshook for handling exceptions."""
+    from PySide6 import QtCore, QtWidgets
+
     error_segments = [f'{except_class.__name__}: {except_instance!s}']
 
     for m in traceback.format_tb(trace):
@@ -54,7 +86,7 @@ def syshook(except_class: typing.Type[Exception], except_instance: Exception, tr
     )
 
     dialog.setInformativeText(
-        f'You can submit a bug report <a href="{application.client.REPOSITORY.toDisplayString()}/issues/new">here</a>.'
+        f'You can submit a bug report <a href="{metadata.REPOSITORY}/issues/new">here</a>.'
     )
 
     dialog.setDetailedText(f'{error_segments[0]}\n' + '\n'.join(error_segments[1:]))
@@ -64,8 +96,11 @@ def syshook(except_class: typing.Type[Exception], except_instance: Exception, tr
     application.quit()
 
 
-# Assign the above handler to the interpreter's excepthook
-sys.excepthook = syshook
+def headless_syshook(except_class: typing.Type[Exception], except_instance: Exception, trace):
+    """A custom syshook for handling exceptions while running headless."""
+    application.logger.exception(f'{except_class.__name__}: {except_instance!s}',
+                                 exc_info=(except_class, except_instance, trace))
+    application.quit()
 
 
 @click.group(invoke_without_command=True)
@@ -82,7 +117,7 @@ def entry(ctx: click.Context):
 @click.option(
     '--settings-file',
     type=pathlib.Path,
-    default=f'{application.applicationName()}.settings',
+    default=f'{metadata.NAME}.settings',
     envvar='SBSETTINGS',
     allow_from_autoenv=True,
     help="A file path where the application's settings will be stored."
@@ -96,9 +131,26 @@ def entry(ctx: click.Context):
          'application will not load use the directory in the settings file, '
          'if it exists.'
 )
-def entry_update(settings_file: pathlib.Path, extensions: pathlib.Path = None):
+@click.option(
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=4,
+    envvar='SBJOBS',
+    allow_from_autoenv=True,
+    help='The maximum number of dependencies that will be downloaded at the same time.'
+)
+@click.option(
+    '--cache-dir',
+    type=pathlib.Path,
+    default=pathlib.Path('data', 'wheels'),
+    envvar='SBWHEELS',
+    allow_from_autoenv=True,
+    help='A directory where downloaded wheels will be cached between updates.'
+)
+def entry_update(settings_file: pathlib.Path, extensions: pathlib.Path = None, jobs: int = 4,
+                 cache_dir: pathlib.Path = None):
     # TODO: Maybe also update the application?
-    click.echo(f'Updating {application.applicationDisplayName()}...')
+    click.echo(f'Updating {metadata.DISPLAY_NAME}...')
 
     # Declarations
     app_requirements = pathlib.Path('requirements.txt')
@@ -107,38 +159,19 @@ def entry_update(settings_file: pathlib.Path, extensions: pathlib.Path = None):
     if not app_requirements.exists():
         sys.exit("The application's requirements.txt file is missing!")
 
-    # Update the application's dependencies
-    with app_requirements.open() as INFILE:
-        with click.progressbar(
-                iterable=INFILE.readlines(),
-                label='Updating dependencies...',
-                show_percent=True,
-                show_eta=True,
-                show_pos=True,
-                bar_template='▐%(bar)s▌ %(label)s %(info)s',
-                fill_char='█',
-                empty_char='▒'
-        ) as progress:
-            for dep in progress:  # type: str
-                if dep.startswith('git'):
-                    _, egg = dep.split('#')
-                    _, d = egg.split('=')
-
-                    progress._label = f'Updating {d}...'
-
-                else:
-                    progress._label = f'Updating {dep}...'
-
-                # Run pip
-                subprocess.run([sys.executable, '-m', 'pip', 'install', '-U', dep],
-                               stdout=subprocess.DEVNULL,
-                               stderr=subprocess.DEVNULL)
-
     # Validate the extensions argument
     if extensions is None:
         click.echo("You didn't specify an extensions directory; we'll just look in the settings file...")
 
-        if settings_file.exists():
+        # The snapshot can be read without translating the settings file
+        try:
+            with snapshot.Snapshot.open(snapshot.snapshot_path(settings_file), source=settings_file) as s:
+                extensions = pathlib.Path(s.value('extensions/directory'))
+
+        except (OSError, LookupError, TypeError, ValueError):
+            extensions = None
+
+        if extensions is None and settings_file.exists():
             with settings_file.open() as INFILE:
                 try:
                     settings_raw = json.load(INFILE)
@@ -146,17 +179,19 @@ def entry_update(settings_file: pathlib.Path, extensions: pathlib.Path = None):
                 except ValueError:
                     click.echo("You settings file couldn't be loaded!")
                     click.echo("If you've freshly generate it, you should report a bug @ "
-                               f"{application.client.REPOSITORY.toDisplayString()}/issues/new")
+                               f"{metadata.REPOSITORY}/issues/new")
                     click.echo(f'If your settings file is from a prior version of '
-                               f'{application.applicationDisplayName()}, you should check to see if older settings '
+                               f'{metadata.DISPLAY_NAME}, you should check to see if older settings '
                                f'files will need to be discarded/imported at '
-                               f'{application.client.REPOSITORY.toDisplayString()}/releases/'
-                               f'v{application.applicationVersion()}')
+                               f'{metadata.REPOSITORY}/releases/'
+                               f'v{metadata.VERSION}')
 
                     if click.confirm('Do you want to manually input your extensions directory?', abort=True):
                         extensions = click.prompt('Extension directory', type=pathlib.Path)
 
                 else:
+                    from QtUtilities import settings
+
                     click.echo('Translating settings file...')
                     t = []
 
@@ -172,12 +207,12 @@ def entry_update(settings_file: pathlib.Path, extensions: pathlib.Path = None):
                             except KeyError:
                                 click.echo('Your settings file is missing a couple of settings!')
                                 click.echo("If you've freshly generate it, you should report a bug @ "
-                                           f"{application.client.REPOSITORY.toDisplayString()}/issues/new")
+                                           f"{metadata.REPOSITORY}/issues/new")
                                 click.echo(f'If your settings file is from a prior version of '
-                                           f'{application.applicationDisplayName()}, you should check to see if older '
+                                           f'{metadata.DISPLAY_NAME}, you should check to see if older '
                                            f'settings files will need to be discarded/imported at '
-                                           f'{application.client.REPOSITORY.toDisplayString()}/releases/'
-                                           f'v{application.applicationVersion()}')
+                                           f'{metadata.REPOSITORY}/releases/'
+                                           f'v{metadata.VERSION}')
 
                                 if click.confirm('Do you want to manually input your extensions directory?',
                                                  abort=True):
@@ -186,7 +221,7 @@ def entry_update(settings_file: pathlib.Path, extensions: pathlib.Path = None):
                             else:
                                 extensions = d
 
-        else:
+        elif extensions is None:
             click.echo("Your settings file doesn't exist!")
 
             if click.confirm('Do you want to manually input your extensions directory?', abort=True):
@@ -200,49 +235,76 @@ def entry_update(settings_file: pathlib.Path, extensions: pathlib.Path = None):
         if not extensions.exists():
             extensions.mkdir(parents=True, exist_ok=True)
 
-    # Iterate over the extensions in the directory
-    for ext in extensions.iterdir():
+    # Gather the requirements files of every extension in the directory
+    requirement_files = [app_requirements]
+
+    for ext in sorted(extensions.iterdir()):
         if not ext.is_dir() or ext.name.startswith('_'):
             continue  # Ignore files and internal directories, like __pycache__
 
         # Ensure the extension has a requirements.txt file
         ext_requirements = ext.joinpath('requirements.txt')
 
-        if not ext_requirements.exists():
-            continue
-
-        click.echo(f'Updating dependencies for extension "{ext!s}"')
-        with ext_requirements.open() as INFILE:
-            with click.progressbar(
-                    iterable=INFILE.readlines(),
-                    label='Updating dependencies...',
-                    show_percent=True,
-                    show_eta=True,
-                    show_pos=True,
-                    bar_template='▐%(bar)s▌ %(label)s %(info)s',
-                    fill_char='█',
-                    empty_char='▒'
-            ) as progress:
-                for dep in progress:  # type: str
-                    if dep.startswith('git'):
-                        _, egg = dep.split('#')
-                        _, d = egg.split('=')
-
-                        progress._label = f'Updating {d}...'
-
-                    else:
-                        progress._label = f'Updating {dep}...'
-
-                    # Run pip
-                    subprocess.run([sys.executable, '-m', 'pip', 'install', '-U', dep],
-                                   stdout=subprocess.DEVNULL,
-                                   stderr=subprocess.DEVNULL)
+        if ext_requirements.exists():
+            requirement_files.append(ext_requirements)
+
+    # Resolve the union of every requirement
+    requirements = dependencies.collect_requirements(*requirement_files)
+    pending = [r for r in requirements if not r.is_satisfied()]
+
+    click.echo(f'Found {len(requirements)} dependencies across {len(requirement_files)} requirements files;  '
+               f'{len(requirements) - len(pending)} pinned dependencies are already satisfied.')
+
+    if not pending:
+        return click.echo('Everything is up to date!')
+
+    # Download the requirements in parallel, then their dependencies and the
+    # install in one go each
+    updater = dependencies.Updater(pending, cache=cache_dir, workers=jobs)
+    timings: typing.List[dependencies.Timing] = []
+
+    with click.progressbar(
+            length=len(pending),
+            label='Downloading dependencies...',
+            show_percent=True,
+            show_eta=True,
+            show_pos=True,
+            bar_template='▐%(bar)s▌ %(label)s %(info)s',
+            fill_char='█',
+            empty_char='▒'
+    ) as progress:
+        for timing in updater.fetch():
+            progress.label = f'Downloaded {timing.name}...'
+            progress.update(1)
+
+            timings.append(timing)
+
+    click.echo('Downloading transitive dependencies...')
+    timings.append(updater.resolve())
+
+    click.echo('Installing dependencies...')
+    timings.append(updater.install())
+
+    # Report
+    click.echo('')
+    click.echo('Timings:')
+
+    for timing in sorted(timings, key=lambda t: t.seconds, reverse=True):
+        click.echo(f'  {timing.name:<32} {timing.seconds:>8.2f}s  {"ok" if timing.okay else "failed"}')
+
+    failures = [t for t in timings if not t.okay]
+
+    for timing in failures:
+        click.echo(f'\npip output for {timing.name}:\n{timing.output}', err=True)
+
+    if failures:
+        sys.exit(f'{len(failures)} step(s) failed!')
 
 
 # noinspection PyUnusedLocal
 @entry.command(
     name='run',
-    short_help=f'Runs {application.applicationDisplayName()}',
+    short_help=f'Runs {metadata.DISPLAY_NAME}',
     context_settings={'ignore_unknown_options': True}
 )
 @click.option(
@@ -266,13 +328,40 @@ def entry_update(settings_file: pathlib.Path, extensions: pathlib.Path = None):
     type=int,
     envvar='Sb.RedirectPolicy',
     allow_from_autoenv=True,
-    default=QtNetwork.QNetworkRequest.NoLessSafeRedirectPolicy,
-    help="How the application will handle redirects.  For more information "
+    help="How the application will handle redirects.  Defaults to "
+         "NoLessSafeRedirectPolicy.  For more information "
          "about redirect policies, visit Qt5's documentation page on them: "
          "https://doc.qt.io/qt-5/qnetworkrequest.html#RedirectPolicy-enum"
 )
+@click.option(
+    '--profile-startup',
+    is_flag=True,
+    envvar='Sb.ProfileStartup',
+    allow_from_autoenv=True,
+    help="Whether or not the application's startup tasks will be timed.  The "
+         "resulting timeline is written to the log directory as JSON, and in "
+         "Chrome's trace event format."
+)
+@click.option(
+    '--headless',
+    is_flag=True,
+    envvar='Sb.Headless',
+    allow_from_autoenv=True,
+    help="Whether or not the application will run without a display.  While "
+         "headless, settings are loaded from the settings file, and the bot "
+         "is started as soon as its extensions are set up."
+)
 @click.argument('extra', nargs=-1, type=click.UNPROCESSED)
-def entry_run(debug: bool, disable_updater: bool, redirect_policy: int, extra):
+def entry_run(debug: bool, disable_updater: bool, redirect_policy: typing.Optional[int], profile_startup: bool,
+              headless: bool, extra):
+    from PySide6 import QtCore, QtNetwork
+    from QtUtilities.utils import qmessage_handler
+
+    application = get_application(headless=headless, profile_startup=profile_startup)
+
+    if redirect_policy is None:
+        redirect_policy = QtNetwork.QNetworkRequest.NoLessSafeRedirectPolicy
+
     # Populate the application's attributes
     application.debug_mode = debug
     application.disable_updater = disable_updater
@@ -281,8 +370,11 @@ def entry_run(debug: bool, disable_updater: bool, redirect_policy: int, extra):
     application.set_redirect_policy(redirect_policy)
 
     # Set up the logging module
+    log_file = pathlib.Path(f'{application.applicationName()}.log').absolute()
+    application.log_directory = log_file.parent
+
     level = logging.INFO
-    handlers = [logging.FileHandler(f'{application.applicationName()}.log', mode='w')]
+    handlers = [logging.FileHandler(log_file, mode='w')]
 
     if debug:
         level = logging.DEBUG
@@ -301,30 +393,52 @@ def entry_run(debug: bool, disable_updater: bool, redirect_policy: int, extra):
     return application.exec()
 
 
+def qt_version() -> typing.Optional[str]:
+    """Returns the installed version of PySide6, without importing any of
+    its Qt modules.  PySide6 can be installed through its metapackage, or
+    through PySide6-Essentials and PySide6-Addons directly."""
+    for distribution in ('PySide6', 'PySide6-Essentials', 'PySide6-Addons'):
+        try:
+            return importlib.metadata.version(distribution)
+
+        except importlib.metadata.PackageNotFoundError:
+            pass
+
+    # PySide6 may have been installed without metadata, like from source
+    if importlib.util.find_spec('PySide6') is None:
+        return None
+
+    import PySide6
+
+    return getattr(PySide6, '__version__', None)
+
+
 @entry.command(
     name='info',
-    short_help=f'Shows information about {application.applicationDisplayName()}'
+    short_help=f'Shows information about {metadata.DISPLAY_NAME}'
 )
 def entry_info():
+    pyside_version = qt_version() or 'Not installed'
+
     click.echo_via_pager(
-        f'{application.client.__doc__}\n'
+        f'{metadata.DESCRIPTION}\n'
         f'\n'
-        f'Created by {", ".join(application.client.AUTHORS)}\n'
+        f'Created by {", ".join(metadata.AUTHORS)}\n'
         f'\n'
-        f"This software is licensed under {application.client.LICENSE}.  You're free to modify and "
+        f"This software is licensed under {metadata.LICENSE}.  You're free to modify and "
         f"redistribute it under the conditions of the aforementioned license.  If you want to read "
         f"more about it, you can read the LICENSE file you should've received along side your "
         f"download.  Alternatively, you can read more about it on its website at "
-        f"{application.client.LICENSE_URL.toDisplayString()}\n"
+        f"{metadata.LICENSE_URL}\n"
         f"\n"
-        f"The application's source code can be found at {application.client.REPOSITORY.toDisplayString()}\n"
+        f"The application's source code can be found at {metadata.REPOSITORY}\n"
         f'\n'
-        f"You're currently running version {application.applicationVersion()}.  You can view the "
+        f"You're currently running version {metadata.VERSION}.  You can view the "
         f"changelog for this release at "
-        f"{application.client.REPOSITORY.toDisplayString()}/releases/tag/v{application.applicationVersion()}\n"
+        f"{metadata.REPOSITORY}/releases/tag/v{metadata.VERSION}\n"
         f'\n'
-        f'Version: {application.applicationVersion()}\n'
-        f'Qt Version: {PySide6.__version__}'
+        f'Version: {metadata.VERSION}\n'
+        f'Qt Version: {pyside_version}'
     )
 
 
@@ -18,8 +18,9 @@ from .command import Command
 from .context import Context
 from .group import Group
 from .manager import Manager
+from .permissions import Permission
 
-__all__ = ['command', 'group', 'errors', 'Command', 'Group', 'Manager', 'Context']
+__all__ = ['command', 'group', 'errors', 'Command', 'Group', 'Manager', 'Context', 'Permission']
 
 
 def command(**kwargs):
@@ -13,9 +13,11 @@ PARTICULAR PURPOSE.  See the GNU General Public License for more details.
 You should have received a copy of the GNU General Public License along with
 ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
+import inspect
 import typing
 
 from . import errors
+from .permissions import Check, Permission
 
 if typing.TYPE_CHECKING:
     from .group import Group
@@ -35,6 +37,18 @@ class Command:
         self.enabled: bool = kwargs.get('enabled', True)
         self.description: str = kwargs.get('description')
         self.parent: typing.Union['Group'] = kwargs.get('parent', None)
+        self.instance: typing.Optional[object] = kwargs.get('instance', None)
+        self.permission: typing.Optional[Permission] = kwargs.get('permission', None)
+
+        # The compiled permission check;  set by the manager when the command
+        # is registered.  None means anyone may invoke the command.
+        self.check: typing.Optional[Check] = None
+        self.compiled: bool = False
+
+        # Commands whose first argument (after `self`) is named "ctx" are passed
+        # the invocation's Context object.
+        parameters = [] if self.func is None else [p for p in inspect.signature(self.func).parameters if p != 'self']
+        self.wants_context: bool = bool(parameters) and parameters[0] == 'ctx'
 
     @property
     def qualified_name(self):
@@ -42,8 +56,11 @@ class Command:
 
     # Magic Methods #
     def __call__(self, *args, **kwargs):
-        if self.func is not None:
-            self.func(*args, **kwargs)
+        if self.func is not None and self.instance is not None:
+            return self.func(self.instance, *args, **kwargs)
+
+        elif self.func is not None:
+            return self.func(*args, **kwargs)
 
         else:
             raise errors.CommandsError("No callable specified!")
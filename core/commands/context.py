@@ -35,3 +35,7 @@ class Context:
     @property
     def invoker(self) -> dataclassez.User:
         return self.message.user
+
+    def reply(self, text: str):
+        """Sends `text` to the channel the command was invoked in."""
+        self.platform.send_message(text, channel=self.message.channel)
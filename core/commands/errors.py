@@ -15,7 +15,7 @@ ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
-__all__ = ['CommandNotFound', 'CommandsError', 'ConverterError', 'InvalidArgument']
+__all__ = ['CommandNotFound', 'CommandsError', 'ConverterError', 'InvalidArgument', 'PermissionDenied']
 
 
 class CommandsError(Exception):
@@ -26,6 +26,11 @@ class CommandNotFound(CommandsError):
     """This is exception is raised when a command could not be found."""
 
 
+class PermissionDenied(CommandsError):
+    """This exception is raised when a user invokes a command they aren't
+    permitted to."""
+
+
 class ConverterError(CommandsError):
     """The base class for all converter related exceptions."""
 
@@ -25,11 +25,12 @@ from PySide2 import QtCore
 from . import converters, errors
 from .abstract import Converter
 from .group import Group
+from .permissions import compile_permission, effective_permission
 
 __all__ = ['Manager']
 
 # noinspection PyTypeChecker
-ParseResult = namedtuple('ParseResult', {'command', 'arguments'})
+ParseResult = namedtuple('ParseResult', ['command', 'arguments'])
 
 
 class Manager(QtCore.QObject):
@@ -51,6 +52,29 @@ class Manager(QtCore.QObject):
             if inspect.isclass(inst) and any([c == Converter for c in inspect.getmro(inst)])
         ]
 
+    def register(self, *commands):
+        for command in commands:
+            self.compile(command)
+            self.commands.append(command)
+
+    def unregister(self, command):
+        self.commands.remove(command)
+
+    def compile(self, command):
+        command.check = compile_permission(effective_permission(command))
+        command.compiled = True
+
+        if isinstance(command, Group):
+            for child in command.children:
+                self.compile(child)
+
+    def authorize(self, command, user, channel = None):
+        if not command.compiled:
+            self.compile(command)
+
+        check = command.check
+        return check is None or check(user, channel)
+
     def parse(self, content, *, ignore_case = None):
         if ignore_case is None:
             ignore_case = False
@@ -114,7 +138,7 @@ class Manager(QtCore.QObject):
 
     def convert_args(self, command, *args, **kwargs):
         argspec = inspect.getfullargspec(command)
-        positionals = [a for a in argspec.args if a != 'self']
+        positionals = [a for a in argspec.args if a not in ('self', 'ctx')]
         arguments = {}
         originals = {}
 
@@ -137,10 +161,19 @@ class Manager(QtCore.QObject):
                     for conv in self.converters:
                         if arg_type == conv.result():
                             arguments[positional] = conv.convert(arg)
+                            break
+
+                    else:
+                        arguments[positional] = arg
 
                 originals[positional] = arg
 
+        accepted = {a for a in argspec.args + argspec.kwonlyargs if a not in ('self', 'ctx')}
+
         for k, v in kwargs.items():
+            if k not in accepted and argspec.varkw is None:
+                raise errors.InvalidArgument(f'Unexpected keyword argument "{k}"!')
+
             try:
                 arg_type = argspec.annotations[k]
 
@@ -151,30 +184,31 @@ class Manager(QtCore.QObject):
                 for conv in self.converters:
                     if arg_type == conv.result():
                         arguments[k] = conv.convert(v)
+                        break
+
+                else:
+                    arguments[k] = v
 
         return arguments, originals
 
     @staticmethod
     def is_kv_pair(content):
-        try:
-            key: str
-            key, _ = content.split('=')
+        key, separator, _ = content.partition('=')
 
-        except ValueError:
-            return False
+        return bool(separator) and key.isidentifier()
 
-        else:
-            return key[0].isalpha() or key[0] == '_'
-
-    def invoke(self, content, *, ignore_case = None):
+    def invoke(self, content, *, ignore_case = None, user = None, channel = None):
         result = self.parse(content, ignore_case=ignore_case)
 
-        argspec = inspect.getfullargspec(result.command)
+        if user is not None and not self.authorize(result.command, user, channel):
+            raise errors.PermissionDenied(f'{user.username} may not invoke "{result.command.qualified_name}"')
+
+        argspec = inspect.getfullargspec(result.command.func)
         key_arguments = {}
 
         for a in result.arguments.copy():
             if '=' in a and self.is_kv_pair(a):
-                k, v = a.split('=')
+                k, v = a.split('=', 1)
                 key_arguments[k] = v if v else None
 
                 result.arguments.pop(result.arguments.index(a))
@@ -191,4 +225,4 @@ class Manager(QtCore.QObject):
         else:
             final_positionals = result.arguments
 
-        result.command.func(*final_positionals, **args)
+        return result.command(*final_positionals, **args)
@@ -31,6 +31,7 @@ from .command import Command
 from .group import Group
 from .context import Context
 from .abstract import Converter
+from ..dataclassez import User
 
 any_command: typing.Union[Command, Group]
 
@@ -72,6 +73,23 @@ class Manager(QtCore.QObject):
     def __init__(self, parent: QtCore.QObject = None):
         super(Manager, self).__init__()
     
+    def register(self, *commands: any_command):
+        """Registers top-level commands, compiling their permissions and the
+        permissions of their subcommands."""
+    
+    def unregister(self, command: any_command):
+        """Unregisters a top-level command.
+        
+        :raises ValueError: The command was never registered.
+        """
+    
+    def compile(self, command: any_command):
+        """Compiles the permission check of `command` and its subcommands.
+        Commands without a permission inherit their parent's."""
+    
+    def authorize(self, command: any_command, user: User, channel: typing.Optional[str] = None) -> bool:
+        """Whether or not `user` may invoke `command` in `channel`."""
+    
     def parse(self, content: str, *, ignore_case: bool = None) -> ParseResult:
         """Parses a string `content` into a valid command.
         
@@ -82,6 +100,8 @@ class Manager(QtCore.QObject):
     def convert_args(self, command: typing.Callable, *args, **kwargs) -> typing.Tuple[typing.Dict[object], typing.Dict[str]]:
         """Converts any arguments into the command's expected arguments.
         
+        :raises InvalidArgument: A keyword argument was passed that the
+                                 command doesn't accept.
         :returns: A tuple containing the transformed arguments, and the
                     untransformed, original arguments."""
     
@@ -90,5 +110,8 @@ class Manager(QtCore.QObject):
         """Validates the input `content` passed to ensure it is a proper Python
         identifier."""
     
-    def invoke(self, content: str, *, ignore_case: bool = None):
-        """Invokes a command with the arguments passed."""
+    def invoke(self, content: str, *, ignore_case: bool = None, user: User = None, channel: str = None):
+        """Invokes a command with the arguments passed.
+        
+        :raises PermissionDenied: `user` isn't permitted to invoke the command.
+        """
@@ -0,0 +1,113 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import dataclasses
+import typing
+
+from core.utils.enums import Roles
+
+if typing.TYPE_CHECKING:
+    from core import dataclassez
+    from .command import Command
+
+__all__ = ['Permission', 'Check', 'compile_permission', 'effective_permission']
+
+# Passed the invoking user and the channel the command was invoked in;
+# returns whether or not the user may invoke the command.
+Check = typing.Callable[['dataclassez.User', typing.Optional[str]], bool]
+
+# IntFlag's operators build a new flag member on every call;  the checks only
+# need the raw bits.
+_and = int.__and__
+
+
+@dataclasses.dataclass(frozen=True)
+class Permission:
+    """Who may invoke a command.
+
+    Users in `deny` may never invoke the command, and users in `allow` always
+    may.  Everyone else must hold at least one of `roles`, unless `roles` is
+    empty.  `channels` maps channel names, in lowercase without a leading
+    "#", to permissions that replace this one in those channels."""
+    roles: Roles = Roles.NONE
+    allow: typing.FrozenSet[str] = frozenset()
+    deny: typing.FrozenSet[str] = frozenset()
+    channels: typing.Mapping[str, 'Permission'] = dataclasses.field(default_factory=dict)
+
+    @property
+    def is_public(self) -> bool:
+        return not self.roles and not self.deny and not self.channels
+
+
+def _allow_all(user: 'dataclassez.User', channel: typing.Optional[str]) -> bool:
+    return True
+
+
+def _compile_one(permission: Permission) -> Check:
+    mask = int(permission.roles)
+    allow = frozenset(u.lower() for u in permission.allow)
+    deny = frozenset(u.lower() for u in permission.deny)
+
+    if not allow and not deny:
+        if not mask:
+            return _allow_all
+
+        return lambda user, channel: _and(user.roles, mask) != 0
+
+    if not mask:
+        return lambda user, channel: user.username.lower() not in deny
+
+    def check(user: 'dataclassez.User', channel: typing.Optional[str]) -> bool:
+        if _and(user.roles, mask):
+            return user.username.lower() not in deny if deny else True
+
+        username = user.username.lower()
+        return username in allow and username not in deny
+
+    return check
+
+
+def compile_permission(permission: typing.Optional[Permission]) -> typing.Optional[Check]:
+    """Compiles `permission` into a check.  Returns None if everyone may
+    invoke the command, so callers can skip the check entirely."""
+    if permission is None or permission.is_public:
+        return None
+
+    default = _compile_one(permission)
+
+    if not permission.channels:
+        return default
+
+    overrides = {c.lstrip('#').lower(): _compile_one(p) for c, p in permission.channels.items()}
+
+    def check(user: 'dataclassez.User', channel: typing.Optional[str]) -> bool:
+        if channel is None:
+            return default(user, channel)
+
+        return overrides.get(channel.lstrip('#').lower(), default)(user, channel)
+
+    return check
+
+
+def effective_permission(command: 'Command') -> typing.Optional[Permission]:
+    """Returns the permission of `command`, or the permission of its nearest
+    ancestor if it doesn't declare one."""
+    while command is not None:
+        if command.permission is not None:
+            return command.permission
+
+        command = command.parent
+
+    return None
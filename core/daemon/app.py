@@ -0,0 +1,144 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import dataclasses
+import logging
+import pathlib
+import signal
+import socket
+import typing
+
+from PySide6 import QtCore, QtNetwork
+
+from core.utils import Tracer, metadata
+from .daemon import Daemon
+
+__all__ = ['QCoreApp']
+
+
+@dataclasses.dataclass()
+class QCoreApp(QtCore.QCoreApplication):
+    """The application used when ShovelBot runs without a display.  It
+    provides the same resources as `QApp`, so extensions can't tell the
+    difference, but it never loads the widget modules."""
+    logger: typing.ClassVar[logging.Logger] = logging.getLogger('core.app')
+
+    client: Daemon = dataclasses.field(init=False)
+    network_access_manager: QtNetwork.QNetworkAccessManager = dataclasses.field(init=False)
+
+    debug_mode: bool = dataclasses.field(init=False)
+    disable_updater: bool = dataclasses.field(init=False)
+    redirect_policy: int = dataclasses.field(init=False)
+    log_directory: pathlib.Path = dataclasses.field(init=False)
+    tracer: Tracer = dataclasses.field(init=False)
+
+    _signal_sockets: typing.Optional[typing.Tuple[socket.socket, socket.socket]] = dataclasses.field(init=False)
+    _signal_notifier: typing.Optional[QtCore.QSocketNotifier] = dataclasses.field(init=False)
+    _signal_handlers: typing.Dict[int, typing.Any] = dataclasses.field(init=False)
+
+    args: dataclasses.InitVar[typing.List[str]]
+    profile_startup: dataclasses.InitVar[bool] = False
+
+    def __post_init__(self, args: typing.List[str], profile_startup: bool):
+        # noinspection PySuperArguments
+        super(QCoreApp, self).__init__(args)
+
+        self.log_directory = pathlib.Path.cwd()
+        self.tracer = Tracer(enabled=profile_startup)
+        self._signal_sockets = None
+        self._signal_notifier = None
+        self._signal_handlers = {}
+
+        with self.tracer.span('Daemon', 'client'):
+            self.client = Daemon()
+
+        self.network_access_manager = QtNetwork.QNetworkAccessManager()
+
+        self.setApplicationName(metadata.NAME)
+        self.setApplicationVersion(metadata.VERSION)
+        self.setOrganizationName(metadata.ORGANIZATION)
+        self.setOrganizationDomain(self.client.REPOSITORY.toDisplayString())
+
+    def set_redirect_policy(self, value: QtNetwork.QNetworkRequest.RedirectPolicy):
+        self.network_access_manager.setRedirectPolicy(value)
+        self.redirect_policy = value
+
+    # Signal methods
+    def install_signal_handlers(self):
+        """Quits the application when the process receives SIGINT or SIGTERM,
+        so the daemon's closing operations run when a service manager stops
+        it.
+
+        Python only runs signal handlers between bytecodes, and Qt's event
+        loop doesn't execute any while it waits.  The interpreter writes each
+        signal to a socket watched by a notifier, which wakes the event loop
+        so the handler can run."""
+        reader, writer = socket.socketpair()
+        reader.setblocking(False)
+        writer.setblocking(False)
+
+        signal.set_wakeup_fd(writer.fileno())
+        self._signal_sockets = reader, writer
+        self._signal_notifier = QtCore.QSocketNotifier(reader.fileno(), QtCore.QSocketNotifier.Read, self)
+        self._signal_notifier.activated.connect(self._drain_signals)
+
+        def handler(signum: int, frame):
+            self.logger.info(f'Received {signal.Signals(signum).name};  quitting...')
+            self.quit()
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            self._signal_handlers[signum] = signal.signal(signum, handler)
+
+    def remove_signal_handlers(self):
+        """Restores the signal handlers replaced by
+        `install_signal_handlers`."""
+        if self._signal_sockets is None:
+            return
+
+        for signum, previous in self._signal_handlers.items():
+            signal.signal(signum, previous)
+
+        self._signal_handlers.clear()
+
+        signal.set_wakeup_fd(-1)
+        self._signal_notifier.setEnabled(False)
+        self._signal_notifier.deleteLater()
+        self._signal_notifier = None
+
+        for sock in self._signal_sockets:
+            sock.close()
+
+        self._signal_sockets = None
+
+    def _drain_signals(self):
+        # Reading the socket is enough to hand control back to the
+        # interpreter;  the handlers themselves run afterwards.
+        try:
+            while self._signal_sockets[0].recv(64):
+                pass
+
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def exec(self):
+        QtCore.QTimer.singleShot(1, self.client.setup)
+        self.install_signal_handlers()
+
+        try:
+            # noinspection PySuperArguments
+            return super(QCoreApp, self).exec()
+
+        finally:
+            self.remove_signal_handlers()
@@ -0,0 +1,96 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+
+from PySide6 import QtCore
+
+from QtUtilities import requests
+from core.utils import Tracer, metadata
+from core.utils.client import ClientMixin
+from .settings import SettingsTree
+
+__all__ = ['Daemon']
+
+
+class Daemon(QtCore.QObject, ClientMixin):
+    """A client without a display.
+
+    The daemon loads settings, extensions, and platforms the same way the
+    windowed client does, and exposes the same signals, but never creates a
+    widget.  Since there's no one to press "Start ShovelBot", the bot is
+    started as soon as extensions are set up."""
+    LOGGER = logging.getLogger('core')
+
+    REPOSITORY = QtCore.QUrl(metadata.REPOSITORY)
+    RESOURCES = QtCore.QDir('resources')
+    ASSETS = QtCore.QDir(RESOURCES.filePath('assets'))
+    AUTHORS = metadata.AUTHORS
+    LICENSE = metadata.LICENSE
+    LICENSE_URL = QtCore.QUrl(metadata.LICENSE_URL)
+
+    aboutToStart = QtCore.Signal()
+    aboutToHalt = QtCore.Signal()
+    aboutToStop = QtCore.Signal()
+
+    started = QtCore.Signal()
+    halted = QtCore.Signal()
+    stopped = QtCore.Signal()
+
+    onCommandExecuteRequested = QtCore.Signal(object)
+    onCommandExecute = QtCore.Signal(object)
+    denyCommandExecute = QtCore.Signal(object)
+
+    def __init__(self, parent: QtCore.QObject = None):
+        # Super call
+        super(Daemon, self).__init__(parent=parent)
+
+        # "Public" declarations
+        self.settings = SettingsTree()
+
+        # Shared declarations
+        self._init_client()
+
+    def setup(self):
+        """Performs set up tasks, then starts the bot."""
+        app = QtCore.QCoreApplication.instance()
+        tracer: Tracer = app.tracer
+        self.request_factory = requests.Factory(manager=app.network_access_manager)
+
+        tasks = [
+            ('Loading settings...', self.load_settings),
+            ('Loading extensions...', self.load_extensions),
+            ('Setting up extensions...', self.setup_extensions)
+        ]
+
+        for label, func in tasks:
+            self.LOGGER.info(label)
+            tracer.wrap(label.rstrip('.'), func)()
+
+        app.aboutToQuit.connect(self.close)
+
+        self.dump()
+        self.start_bot()
+
+    def close(self):
+        """Stops the bot and saves the user's settings."""
+        self.LOGGER.info('Performing closing operations...')
+
+        self.stop_bot()
+        self.save_settings()
+        self.settings.close()
+        self.database.close()
+        self.event_log.close()
+        self.LOGGER.info('Done!')
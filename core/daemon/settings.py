@@ -0,0 +1,77 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+import typing
+
+from QtUtilities import settings
+
+__all__ = ['SettingsTree']
+
+
+class SettingsTree:
+    """A stand-in for the settings dialog when ShovelBot is running without a
+    display.  Settings are stored and serialized the same way the dialog does,
+    but nothing is ever shown.  `converters` and `view` are provided so
+    extensions that register converters, or look up views, don't need to
+    care which one they were given;  `view` is always empty.
+
+    Top-level settings loaded from the settings snapshot are deferred, and
+    only built the first time they're looked up."""
+    LOGGER = logging.getLogger('core.daemon.settings')
+
+    def __init__(self):
+        self.settings: typing.Dict[str, settings.Setting] = {}
+        self.converters: typing.Dict[str, typing.Callable] = {}
+        self.view: typing.Dict[str, typing.Any] = {}
+
+        self._deferred: typing.Dict[str, typing.Callable[[], typing.Any]] = {}
+
+    def register_setting(self, setting: settings.Setting):
+        """Registers a top-level setting."""
+        self._deferred.pop(setting.key, None)
+        self.settings[setting.key] = setting
+
+    def defer(self, key: str, loader: typing.Callable[[], typing.Any]):
+        """Registers a top-level setting that hasn't been built yet.
+        `loader` is expected to build the setting and register it."""
+        self._deferred[key] = loader
+
+    def to_data(self) -> typing.List[dict]:
+        """Returns every top-level setting as a json serializable list."""
+        for key in list(self._deferred):
+            self._load(key)
+
+        return [s.to_data() for s in self.settings.values()]
+
+    def _load(self, key: str):
+        loader = self._deferred.pop(key, None)
+
+        if loader is not None:
+            loader()
+
+    def show(self):
+        self.LOGGER.warning("Settings can't be displayed while running headless!")
+
+    def close(self):
+        pass
+
+    def __getitem__(self, key: str) -> settings.Setting:
+        self._load(key)
+
+        return self.settings[key]
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.settings or key in self._deferred
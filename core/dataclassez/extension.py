@@ -84,7 +84,7 @@ class Extension(QtCore.QObject):
         super(QtCore.QObject, self).__init__(parent=parent)
 
         # Assignments
-        self.client = QtWidgets.QApplication.instance().client
+        self.client = QtCore.QCoreApplication.instance().client
 
         # Validation
         self.NAME = self.__class__.__name__.lower()
@@ -172,7 +172,7 @@ class Extension(QtCore.QObject):
         """Unloads the extension."""
         # Declarations
         # noinspection PyTypeChecker
-        app: 'QApp' = QtWidgets.QApplication.instance()
+        app: 'QApp' = QtCore.QCoreApplication.instance()
         imports = getattr(self, f'_{self.__class__.__name__}__imports', [])
         path = getattr(self, f'_{self.__class__.__name__}__path')
 
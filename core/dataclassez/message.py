@@ -14,6 +14,7 @@ You should have received a copy of the GNU General Public License along with
 ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
 import dataclasses
+import typing
 
 from .user import User
 
@@ -26,3 +27,4 @@ class Message:
     defining the bare minimum all platforms are expected to provide."""
     content: str
     user: User
+    channel: typing.Optional[str] = None  # For platforms that support more than one channel
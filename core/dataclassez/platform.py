@@ -64,8 +64,9 @@ class Platform(Extension):
     emitted object should be an instance of the User dataclass."""
 
     # Message methods
-    def send_message(self, message: str):
-        """Sends a message to the channel."""
+    def send_message(self, message: str, *, channel: str = None):
+        """Sends a message to `channel`.  Platforms that only support one
+        channel may ignore it."""
 
     # Moderation methods
     def ban_user(self, user: User, duration: float):
@@ -18,6 +18,8 @@ import typing
 
 from PySide2 import QtGui
 
+from utils import enums
+
 __all__ = ['User']
 
 
@@ -29,3 +31,8 @@ class User:
     display_name: str
     color: typing.Optional[QtGui.QColor] = dataclasses.field(default_factory=QtGui.QColor)
     moderator: bool = dataclasses.field(default=False)
+    roles: enums.Roles = dataclasses.field(default=enums.Roles.NONE)
+
+    def has_role(self, roles: enums.Roles) -> bool:
+        """Whether or not this user holds any of `roles`."""
+        return self.roles & roles != 0
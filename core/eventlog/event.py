@@ -0,0 +1,50 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import dataclasses
+import enum
+import time
+import typing
+
+__all__ = ['Event', 'EventKinds']
+
+
+class EventKinds(enum.Enum):
+    """The kinds of events the event log records."""
+    MESSAGE = 'message'
+    COMMAND = 'command'
+    JOIN = 'join'
+    LEAVE = 'leave'
+    BAN = 'ban'
+    UNBAN = 'unban'
+    PROMOTE = 'promote'
+    DEMOTE = 'demote'
+
+
+@dataclasses.dataclass(frozen=True)
+class Event:
+    """A single entry in the event log."""
+    kind: EventKinds
+    platform: str
+    user: str
+    data: typing.Dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+    time: float = dataclasses.field(default_factory=time.time)  # Seconds since the epoch
+
+    def to_data(self) -> dict:
+        return {'t': self.time, 'k': self.kind.value, 'p': self.platform, 'u': self.user, 'd': self.data}
+
+    @classmethod
+    def from_data(cls, data: dict) -> 'Event':
+        return cls(EventKinds(data['k']), data['p'], data['u'], data.get('d', {}), data['t'])
@@ -0,0 +1,66 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import dataclasses
+import json
+import os
+import pathlib
+import typing
+
+__all__ = ['Segment', 'read_index', 'write_index', 'segment_name', 'INDEX_NAME']
+
+INDEX_NAME = 'index.json'
+
+
+@dataclasses.dataclass()
+class Segment:
+    """An entry in the event log's index."""
+    name: str
+    start: float
+    end: float
+    count: int
+
+    def overlaps(self, start: typing.Optional[float], end: typing.Optional[float]) -> bool:
+        return (start is None or self.end >= start) and (end is None or self.start <= end)
+
+
+def segment_name(start: float, suffix: int = 0) -> str:
+    """Returns the file name of a segment whose first event happened at
+    `start`.  Names sort in chronological order.  `suffix` distinguishes
+    segments that start in the same millisecond."""
+    if suffix:
+        return f'events-{int(start * 1000):015d}-{suffix}.jsonl.gz'
+
+    return f'events-{int(start * 1000):015d}.jsonl.gz'
+
+
+def read_index(directory: pathlib.Path) -> typing.List[Segment]:
+    """Returns every sealed segment in the index, oldest first."""
+    try:
+        data = json.loads(directory.joinpath(INDEX_NAME).read_text(encoding='UTF-8'))
+
+    except (OSError, ValueError):
+        return []
+
+    return sorted((Segment(**s) for s in data), key=lambda s: s.start)
+
+
+def write_index(directory: pathlib.Path, segments: typing.List[Segment]):
+    """Atomically rewrites the index."""
+    path = directory.joinpath(INDEX_NAME)
+    temp = path.with_name(f'{path.name}.tmp')
+
+    temp.write_text(json.dumps([dataclasses.asdict(s) for s in segments]), encoding='UTF-8')
+    os.replace(temp, path)
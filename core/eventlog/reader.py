@@ -0,0 +1,83 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import gzip
+import json
+import logging
+import pathlib
+import typing
+import zlib
+
+from .event import Event, EventKinds
+from .index import Segment, read_index
+
+__all__ = ['EventReader']
+
+
+class EventReader:
+    """Streams events from an event log's directory.
+
+    Sealed segments are selected through the index, so only segments that
+    overlap the requested time range are decompressed.  Segments that
+    haven't been sealed yet, like the one currently being written, are
+    always read."""
+    LOGGER = logging.getLogger('core.eventlog.reader')
+
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+
+    def segments(self, start: float = None, end: float = None) -> typing.List[Segment]:
+        """Returns the segments that may contain events between `start` and
+        `end`, oldest first."""
+        sealed = read_index(self.directory)
+        names = {s.name for s in sealed}
+        selected = [s for s in sealed if s.overlaps(start, end)]
+
+        for path in self.directory.glob('events-*.jsonl.gz'):
+            if path.name not in names:
+                first = int(path.name[7:22]) / 1000
+                selected.append(Segment(path.name, first, float('inf'), -1))
+
+        return sorted((s for s in selected if s.overlaps(start, end)), key=lambda s: s.start)
+
+    def events(self, start: float = None, end: float = None, *,
+               kinds: typing.Collection[EventKinds] = None) -> typing.Iterator[Event]:
+        """Yields every event between `start` and `end`, in the order they
+        were written.  If `kinds` is passed, only events of those kinds are
+        yielded."""
+        for segment in self.segments(start, end):
+            for data in self._read(self.directory.joinpath(segment.name)):
+                if (start is not None and data['t'] < start) or (end is not None and data['t'] > end):
+                    continue
+
+                event = Event.from_data(data)
+
+                if kinds is None or event.kind in kinds:
+                    yield event
+
+    def _read(self, path: pathlib.Path) -> typing.Iterator[dict]:
+        try:
+            with gzip.open(path, 'rt', encoding='UTF-8') as infile:
+                for line in infile:
+                    try:
+                        yield json.loads(line)
+
+                    except ValueError:
+                        return  # The last line of a segment that's still being written
+
+        except (EOFError, OSError, zlib.error):
+            # Segments that are still open, or were open during a crash, end
+            # without a gzip trailer;  everything before that was flushed.
+            self.LOGGER.debug(f'Reached the end of unsealed segment {path.name}')
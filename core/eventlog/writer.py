@@ -0,0 +1,160 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import gzip
+import itertools
+import json
+import logging
+import pathlib
+import queue
+import threading
+import time
+import typing
+import zlib
+
+from .event import Event
+from .index import Segment, read_index, segment_name, write_index
+
+__all__ = ['EventLog']
+
+
+class EventLog:
+    """An append-only log of chat, command, and moderation events.
+
+    Events are written by a background thread to gzip compressed JSON lines
+    segment files.  A segment is sealed, and recorded in the directory's
+    index alongside the time range it covers, once it holds `segment_size`
+    uncompressed bytes or has been open for `segment_age` seconds.  The open
+    segment is flushed every `flush_interval` seconds, so a crash loses at
+    most that much."""
+    LOGGER = logging.getLogger('core.eventlog')
+
+    def __init__(self, directory: pathlib.Path, *, segment_size: int = 8 * 1024 * 1024,
+                 segment_age: float = 60 * 60, flush_interval: float = 1.0):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.segment_age = segment_age
+        self.flush_interval = flush_interval
+
+        self._queue: 'queue.SimpleQueue[typing.Optional[Event]]' = queue.SimpleQueue()
+        self._thread: typing.Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+        # Writer thread state
+        self._file: typing.Optional[gzip.GzipFile] = None
+        self._segment: typing.Optional[Segment] = None
+        self._opened = 0.0
+        self._size = 0
+
+    # Writing methods
+    def append(self, event: Event):
+        """Queues `event` to be written.  This method can be called from any
+        thread."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='eventlog', daemon=True)
+                    self._thread.start()
+
+        self._queue.put(event)
+
+    def close(self):
+        """Writes every queued event, then seals the open segment."""
+        if self._thread is None:
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    # Writer thread methods
+    def _run(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        last_flush = time.monotonic()
+
+        while True:
+            try:
+                event = self._queue.get(timeout=self.flush_interval)
+
+            except queue.Empty:
+                event = ...
+
+                # Segments on a quiet channel still need to be sealed on time
+                if self._file is not None and time.monotonic() - self._opened >= self.segment_age:
+                    self._seal()
+
+            if event is None:
+                break
+
+            if event is not ...:
+                try:
+                    self._write(event)
+
+                except (OSError, TypeError, ValueError) as e:
+                    self.LOGGER.warning(f'Could not write {event.kind.value} event!  Reason: {e!s}')
+
+            if self._file is not None and time.monotonic() - last_flush >= self.flush_interval:
+                self._file.flush(zlib.Z_SYNC_FLUSH)
+                last_flush = time.monotonic()
+
+        self._seal()
+
+    def _write(self, event: Event):
+        if self._file is not None and (self._size >= self.segment_size
+                                       or time.monotonic() - self._opened >= self.segment_age):
+            self._seal()
+
+        if self._file is None:
+            self._open(event.time)
+
+        line = (json.dumps(event.to_data(), separators=(',', ':')) + '\n').encode('UTF-8')
+        self._file.write(line)
+        self._size += len(line)
+
+        self._segment.start = min(self._segment.start, event.time)
+        self._segment.end = max(self._segment.end, event.time)
+        self._segment.count += 1
+
+    def _open(self, start: float):
+        # Events can carry any time, like when they're replayed, so a sealed
+        # segment may already start in the same millisecond;  it's never
+        # overwritten.
+        for suffix in itertools.count():
+            name = segment_name(start, suffix)
+
+            try:
+                self._file = gzip.open(self.directory.joinpath(name), 'xb')
+
+            except FileExistsError:
+                continue
+
+            self._segment = Segment(name, start, start, 0)
+            self._opened = time.monotonic()
+            self._size = 0
+
+            return
+
+    def _seal(self):
+        if self._file is None:
+            return
+
+        self._file.close()
+        self._file = None
+
+        segments = [s for s in read_index(self.directory) if s.name != self._segment.name]
+        write_index(self.directory, segments + [self._segment])
+
+        self.LOGGER.debug(f'Sealed segment {self._segment.name} with {self._segment.count} events')
+        self._segment = None
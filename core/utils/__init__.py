@@ -16,3 +16,5 @@ ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 from .enums import BanBehaviors, DatabaseTypes, ExtensionStates
 from .funcs import (get_callable_default_args, get_callable_default_kwargs, get_callable_defaults, invoke,
                     recolor_html_links)
+from .handles import SettingHandle
+from .tracer import Span, Tracer
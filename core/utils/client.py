@@ -0,0 +1,829 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import importlib
+import inspect
+import json
+import logging
+import pathlib
+import typing
+from typing import List
+
+import sys
+from PySide6 import QtCore
+
+from QtUtilities import settings, themes
+from core import commands, dataclassez, eventlog
+from core.utils import SettingHandle, Tracer, snapshot
+from core.utils.database import Database
+from core.utils.persistence import SettingsStore
+
+__all__ = ['ClientMixin']
+
+
+class ClientMixin:
+    """The parts of the client that don't need a display.
+
+    Classes using this mixin are expected to be QObjects that declare the
+    client's signals, and assign a settings container to `settings` before
+    calling `_init_client`.  The windowed client and the headless daemon both
+    use this mixin, so extensions behave the same regardless of which one
+    they're loaded into."""
+    LOGGER = logging.getLogger('core')
+
+    def _init_client(self):
+        """Declares the attributes shared by every client."""
+        # "Public" declarations
+        self.request_factory = None
+        self.extensions = {}
+        self.themes = [themes.dark, themes.high_contrast]
+        self.command_manager = commands.Manager()
+        self.database = Database('data/shovelbot.db', parent=self)
+        self.event_log = eventlog.EventLog(pathlib.Path('data', 'events'))
+        self.settings_store: typing.Optional[SettingsStore] = None
+        self.prefix: typing.Optional[SettingHandle] = None
+
+        # "Private" attributes
+        self._settings_file = None
+        self._announcing: typing.Dict[int, bool] = {}  # Context id -> denied
+
+        self.onCommandExecute.connect(self.log_command)
+        self.denyCommandExecute.connect(self.deny_command)
+
+    # Hooks
+    def window_geometry(self) -> typing.Tuple[int, int, int, int]:
+        """Returns the x, y, width, and height the client's window should be
+        saved with."""
+        return 0, 0, 800, 600
+
+    def extension_loaded(self, extension: dataclassez.Extension):
+        """Invoked when an extension is loaded, but before it's set up."""
+
+    def extension_state_changed(self, extension: dataclassez.Extension):
+        """Invoked after an extension was set up, torn down, or unloaded."""
+
+    def defer_setting(self, key: str, tree: typing.Any, values: typing.Dict[str, typing.Any]):
+        """Registers the top-level setting `key` from the settings snapshot
+        without building it;  it's built from its serialized `tree` the first
+        time it's looked up.  `values` maps every path in the tree to its
+        value."""
+        def load() -> settings.Setting:
+            setting = settings.Setting.from_data(tree)
+            self.register_setting(setting)
+
+            return setting
+
+        self.settings_store.defer(key, tree, values, load)
+        self.settings.defer(key, load)
+
+    # Settings methods
+    def load_settings(self):
+        """Loads ShovelBot's settings."""
+        if self._settings_file is None:
+            app = QtCore.QCoreApplication.instance()
+            self._settings_file = QtCore.QFile(f'{app.applicationName()}.settings')
+
+        if self.settings_store is None:
+            self.settings_store = SettingsStore(pathlib.Path(self._settings_file.fileName()), parent=self)
+
+        if self.load_snapshot():
+            self.LOGGER.debug('Loaded settings from the settings snapshot.')
+
+        elif self._settings_file.exists():
+            if not self._settings_file.isOpen():
+                self._settings_file.open(self._settings_file.ReadOnly | self._settings_file.Text)
+
+            if self._settings_file.isReadable():
+                raw_text: QtCore.QByteArray = self._settings_file.readAll()
+
+                if not raw_text.isNull():
+                    raw_text: str = raw_text.data().decode()
+
+                    try:
+                        decoded_text = json.loads(raw_text)
+
+                    except ValueError as e:
+                        self.LOGGER.warning('Could not decode file settings.json!')
+                        self.LOGGER.warning(f'Exception Type: {e.__class__.__name__}')
+                        self.LOGGER.warning(f'Exception Cause: {e.__cause__}')
+
+                    else:
+                        for raw_setting in decoded_text:
+                            try:
+                                setting = settings.Setting.from_data(raw_setting)
+
+                            except ValueError as e:
+                                self.LOGGER.warning('Could not decode file settings.json!')
+                                self.LOGGER.warning(f'Exception Type: {e.__class__.__name__}')
+                                self.LOGGER.warning(f'Exception Cause: {e.__cause__}')
+
+                            else:
+                                self.register_setting(setting)
+
+                    finally:
+                        if self._settings_file.isOpen():
+                            self._settings_file.close()
+
+                        self.validate_settings()
+
+                else:
+                    self.LOGGER.warning('Settings file contains no data!')
+                    self.LOGGER.warning('Was this an error?')
+
+                    for s in self.generate_settings():
+                        self.register_setting(s)
+
+        else:
+            self.LOGGER.warning('Settings file does not exist!')
+            self.LOGGER.info('Is this a first run?')
+
+            for s in self.generate_settings():
+                self.register_setting(s)
+
+        # Recover changes made after the settings file was last written
+        self.settings_store.replay()
+
+        self.prefix = self.setting_handle('system/prefix')
+
+    def load_snapshot(self) -> bool:
+        """Loads ShovelBot's settings from the binary snapshot of the settings
+        file.  Returns False if the snapshot doesn't exist, or is older than
+        the settings file.  Settings aren't built until they're used;  see
+        `defer_setting`."""
+        try:
+            with snapshot.Snapshot.open(self.settings_store.snapshot_path, source=self.settings_store.path) as s:
+                loaded = [(key, s.subtree(key), s.values(key)) for key in s.keys()]
+
+        except (OSError, ValueError) as e:
+            self.LOGGER.debug(f'Settings snapshot could not be loaded!  Reason: {e!s}')
+            return False
+
+        for key, tree, values in loaded:
+            self.defer_setting(key, tree, values)
+
+        self.validate_settings()
+        return True
+
+    def register_setting(self, setting: settings.Setting):
+        """Registers a top-level setting, and tracks its changes."""
+        self.settings.register_setting(setting)
+        self.settings_store.track(setting)
+
+    def setting_handle(self, path: str) -> SettingHandle:
+        """Returns a handle to the setting at `path`, like
+        `extensions/twitch/channel`.  Raises KeyError if the setting doesn't
+        exist."""
+        return self.settings_store.handle(path)
+
+    def generate_settings(self) -> List[settings.Setting]:
+        """Generates a blank config for ShovelBot."""
+        # Declarations
+        x, y, width, height = self.window_geometry()
+
+        # Top-Level settings
+        top = {
+            'appearance': settings.Setting('appearance', tooltip='Settings related the visual display of the client.'),
+            'extensions': settings.Setting('extensions', tooltip='Settings related to the extension framework.'),
+            'system': settings.Setting('system', tooltip='Settings related to ShovelBot as a whole.')
+        }
+
+        # appearance settings
+        top['appearance'].add_children(
+            settings.Setting('theme', 0, converter='qcombobox',
+                             data={
+                                 'choices': ['Light'] + [t.__name__.replace('_', ' ').title()
+                                                         for t in self.themes]
+                             },
+                             tooltip='The overall theme of the application as a whole.  '
+                                     'Extensions should add support for this option.'),
+
+            settings.Setting('stream', tooltip='Settings related to the stream settings.')
+        )
+
+        # appearance.stream settings
+        top['appearance']['stream'].add_children(
+            settings.Setting('sync', True, tooltip='Automatically sync stream metadata across all platforms.')
+        )
+
+        # extensions settings
+        top['extensions'].add_children(
+            settings.Setting('platforms', tooltip='Settings related to platform extensions.'),
+
+            settings.Setting('directory', 'extensions', display_name='Extensions Directory',
+                             tooltip='The directory extensions are contained in.'
+                                     '\n'
+                                     'The directory cannot contain...'
+                                     '<ul>'
+                                     '<li>symbols</li>'
+                                     '<li>start with a number</li>'
+                                     '<li>contain spaces</li>'
+                                     '</ul>', converter='qdir'),
+            settings.Setting('auto_start', False, display_name='Start on Startup',
+                             tooltip='Whether or not the bot will simulate a user pressing "Start ShovelBot" when the '
+                                     'client finishes its startup tasks.'),
+            settings.Setting('auto_load', True, display_name='Load Extensions on Startup',
+                             tooltip='Whether or not the bot will automatically load all extensions in the specified '
+                                     'directory.  If this is unchecked, extensions will have to be manually loaded in '
+                                     'the extensions panel.')
+        )
+
+        # extensions.platforms settings
+
+        # system settings
+        top['system'].add_children(
+            settings.Setting('debug', False, display_name='Debug Mode?',
+                             tooltip='Whether or not ShovelBot is in debug mode.'),
+            settings.Setting('prefix', '!',
+                             tooltip='The prefix to use for system (built-in) commands.',
+                             display_name='System Prefix'),
+
+            settings.Setting('updates', None, display_name='Updates',
+                             tooltip='Settings related to the update checker.'),
+
+            settings.Setting('web_idle', 300, display_name='Release web views after',
+                             tooltip='How long, in seconds, every web view must be hidden before their browser '
+                                     'engine is released from memory.  Set to -1 to never release it.'),
+
+            settings.Setting('window', tooltip='Settings related to the literal window of ShovelBot.', hidden=True)
+        )
+
+        # system.updates settings
+        top['system']['updates'].add_children(
+            settings.Setting('channel', 0, display_name='Release channel',
+                             tooltip='The type of releases to update to.',
+                             converter='qcombobox', data={'choices': ['Release', 'Beta']}),
+            settings.Setting('auto', True, display_name='Automatic update checks?',
+                             tooltip='Whether or not ShovelBot will automatically check for updates on startup.')
+        )
+
+        # settings.window settings
+        top['system']['window'].add_children(
+            settings.Setting('x', x, display_name='Window X', read_only=True,
+                             tooltip='The top-left position the main window will be along the X axis.'),
+            settings.Setting('y', y, display_name='Window Y', read_only=True,
+                             tooltip='The top-left position the main window will be along the Y axis.'),
+            settings.Setting('width', width, display_name='Window Width', read_only=True,
+                             tooltip='The width of the main window.'),
+            settings.Setting('height', height, display_name='Window Height', read_only=True,
+                             tooltip='The height of the main window.')
+        )
+
+        # Returning
+        return list(top.values())
+
+    def validate_settings(self):
+        """Validates a config for ShovelBot."""
+
+    def save_settings(self):
+        """Writes every pending settings change to the settings file."""
+        if self.settings_store is None:
+            return
+
+        self.LOGGER.info('Saving settings...')
+        self.settings_store.save()
+
+    # Extension methods
+    def load_extensions(self):
+        """Loads all extensions in the specified extensions directory."""
+        # Declarations
+        path: str = self.settings['extensions']['directory'].value
+        directory = pathlib.Path(path)
+
+        # Directory validation
+        if not directory.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+
+        for path in directory.iterdir():  # type: pathlib.Path
+            if path.name.startswith('_'):
+                self.LOGGER.debug(f'Skipping {path!s}...')
+                continue
+
+            self.LOGGER.info(f'Attempting to load extension @ {path!s}')
+
+            try:
+                extensions = self.load_extension(path)
+
+            except ModuleNotFoundError:
+                self.LOGGER.warning(f'Cannot load a non-existent extension @ {path!s}!')
+
+            except ImportError as e:
+                self.LOGGER.warning(f'Could not load extension @ {path!s}!  Reason: {e!s}')
+
+            except LookupError:
+                self.LOGGER.warning(f'Extension @ {path!s} does not contain an Extension subclass!')
+
+            else:
+                for extension in extensions:
+                    self.extension_loaded(extension)
+                    self.extensions[extension.NAME] = extension
+
+    def setup_extensions(self):
+        """Sets up all loaded extensions."""
+        self.LOGGER.info(f'Setting up {len(self.extensions)} extensions...')
+
+        for ext in self.extensions.values():
+            if isinstance(ext, dataclassez.ExtensionStub):
+                continue  # Since we can't set up a stub
+
+            self.LOGGER.debug(f'Setting up {ext.DISPLAY_NAME}...')
+
+            try:
+                with QtCore.QCoreApplication.instance().tracer.span(f'{ext.NAME}.setup', 'extension'):
+                    ext.setup()
+
+            except NotImplementedError:
+                self.LOGGER.debug(f'{ext.DISPLAY_NAME} does not implement a setup method!')
+
+            else:
+                self.LOGGER.debug(f'{ext.DISPLAY_NAME} was successfully set up!')
+
+            finally:
+                self.extension_state_changed(ext)
+
+        # Track the settings extensions registered
+        if self.settings_store is not None:
+            self.settings_store.rescan()
+
+    def teardown_extensions(self):
+        """Tears down all loaded extensions."""
+        self.LOGGER.warning(f'Tearing down {len(self.extensions)} extensions...')
+
+        for ext in self.extensions.values():
+            if isinstance(ext, dataclassez.ExtensionStub):
+                continue  # Since we can't tear down a stub
+
+            self.LOGGER.debug(f'Tearing down {ext.DISPLAY_NAME}...')
+
+            try:
+                ext.teardown()
+
+            except NotImplementedError:
+                self.LOGGER.debug(f'{ext.DISPLAY_NAME} does not implement a teardown method!')
+
+            else:
+                self.LOGGER.debug(f'{ext.DISPLAY_NAME} was successfully torn down!')
+
+            finally:
+                self.extension_state_changed(ext)
+
+    def unload_extensions(self):
+        """Unloads all extensions."""
+        self.LOGGER.warning(f'Unloading {len(self.extensions)} extensions...')
+
+        for name, value in self.extensions.copy().items():
+            if isinstance(value, dataclassez.ExtensionStub):
+                continue  # Since we can't unload a stub
+
+            try:
+                stub = value.unload()
+
+            except NotImplementedError:
+                self.LOGGER.debug(f'{value.DISPLAY_NAME} does not implement an unload method!')
+
+            else:
+                self.LOGGER.debug(f'{value.DISPLAY_NAME} successfully unloaded!')
+                self.extensions[name] = stub
+
+            finally:
+                self.LOGGER.info(f'Unregistering commands for {value.DISPLAY_NAME}...')
+                before = len(self.command_manager.commands)
+
+                for attr, inst in inspect.getmembers(value):
+                    if isinstance(inst, commands.Command) and inst.parent is None:
+                        try:
+                            self.command_manager.unregister(inst)
+
+                        except ValueError:
+                            self.LOGGER.warning(f'Command {value.__class__.__name__}.{inst.name} was not previously '
+                                                f'registered!')
+
+                        else:
+                            self.LOGGER.debug(f'Unregistered command {value.__class__.__name__}.{inst.name}!')
+
+                self.LOGGER.info(f'Unregistered {before - len(self.command_manager.commands)} commands!')
+
+                self.extension_state_changed(value)
+
+        self.LOGGER.warning(f'Unloaded {len(self.extensions)} extensions!')
+        self.extensions.clear()
+
+    def load_extension(self, path: pathlib.Path) -> typing.List[dataclassez.Extension]:
+        """Loads an extension in the specified directory."""
+        # Existence check
+        if not path.exists():
+            raise ModuleNotFoundError
+
+        # Declarations
+        prior = list(sys.modules.keys())
+        import_path = '.'.join(path.parts).rstrip('.py')
+        logger = logging.getLogger(f'{self.LOGGER.name}.loader')
+        tracer: Tracer = QtCore.QCoreApplication.instance().tracer
+        extensions = []
+
+        # Loading sequence
+        logger.info(f'Loading extensions @ {path!s}...')
+
+        try:
+            with tracer.span(f'import {import_path}', 'extension'):
+                p = importlib.import_module(import_path)
+
+        except ImportError as e:
+            logger.warning(f'Extension loading failed!  Reason: {e!s}')
+
+            logger.warning(f'Attempting to clean up environment...')
+            for key, value in sys.modules.copy().items():
+                if key not in prior and not inspect.isbuiltin(value) and key not in sys.builtin_module_names:
+                    logger.debug(f'Removing {key} from loading modules...')
+                    del sys.modules[key]
+
+            raise ImportError from e
+
+        else:
+            logger.info('Extension imported!')
+            query = []
+
+            try:
+                for attr in p.__all__:
+                    inst = getattr(p, attr)
+
+                    if not inspect.isclass(inst):
+                        continue
+
+                    query.append((attr, inst))
+
+            except AttributeError:
+                logger.debug(f'Extension does not define __all__!')
+                logger.debug(f'Falling back to inspect.getmembers...')
+
+                query = [(n, i) for n, i in inspect.getmembers(p) if inspect.isclass(i)]
+
+            # Dump the namespace
+            self.dump_extension_namespace(prior, list(sys.modules.keys()))
+
+            # Scan the module for an Extension class
+            logger.info('Searching for Extension class...')
+            for attr, inst in query:
+                # Dump the current classes inheritance list
+                self.dump_extension_inheritance(inst)
+
+                # Ensure we don't reload already loaded extensions
+                if any([isinstance(e, inst) for e in self.extensions]):
+                    continue
+
+                # Check to see if an inherited class is the Extension class
+                if any([c == dataclassez.Extension for c in inspect.getmro(inst)]):
+                    logger.debug(f'Found class {attr}!  Creating a new instance...')
+                    with tracer.span(f'{import_path}.{attr}', 'extension'):
+                        instance: dataclassez.Extension = inst()
+
+                    instance.__package = import_path
+                    setattr(instance, f'_{attr}__package', import_path)
+                    setattr(instance, f'_{attr}__path', path)
+
+                    logger.debug(f'Storing imported modules to {attr}.__imports...')
+                    setattr(instance, f'_{attr}__imports', [key for key in sys.modules.copy() if key not in prior])
+                    logger.debug(f'Stored {len(getattr(instance, f"_{attr}__imports", []))} values.')
+
+                    if isinstance(instance, dataclassez.Platform):
+                        logger.debug(f"Binding platform {instance.DISPLAY_NAME}'s signals...")
+
+                        logger.debug(f'Binding {inst}.onMessage to {self.__class__.__name__}.'
+                                     f'{self.process_chat_message.__name__}...')
+                        instance.onMessage.connect(lambda x, i = instance: self.process_chat_message(i, x))
+                        self.bind_event_log(instance)
+
+                        logger.debug(f"Bound platform {instance.DISPLAY_NAME}'s signals.")
+
+                    logger.debug(f'Storing extension "{instance.DISPLAY_NAME}"')
+                    extensions.append(instance)
+
+            if extensions:
+                logger.info('Adding extension commands...')
+                logger.info('Indexing extension(s) for commands...')
+
+                for extension in extensions:
+                    logger.info(f'Indexing extension "{extension.NAME}"...')
+                    temp = []
+
+                    for attr, inst in inspect.getmembers(extension):
+                        if isinstance(inst, commands.Command):
+                            logger.debug(f'Found {extension.__class__.__name__}.{attr}#{inst.__class__.__name__}')
+                            inst.instance = extension
+
+                            # Subcommands are reached through their group
+                            if inst.parent is None:
+                                temp.append(inst)
+
+                    logger.info(f'Found {len(temp)} commands!')
+                    self.command_manager.register(*temp)
+
+                    logger.debug('{} objects, {} commands, and {} groups'.format(
+                        len(temp),
+                        sum([1 for c in temp if isinstance(c, commands.Command) and not isinstance(c, commands.Group)]),
+                        sum([1 for c in temp if isinstance(c, commands.Group)])
+                    ))
+
+                return extensions
+
+            raise LookupError(f"Extension @ {import_path} doesn't have an Extension class!")
+
+    def load_from_stub(self, stub: dataclassez.ExtensionStub) -> typing.List[dataclassez.Extension]:
+        """Loads an extension from an extension stub."""
+        # Instance validation
+        if not isinstance(stub, dataclassez.ExtensionStub):
+            raise ValueError(f'Expected ExtensionStub;  received Extension!')
+
+        # Load extension
+        self.LOGGER.info(f'Attempting to load extension @ {stub.PATH!s}')
+
+        try:
+            ext = self.load_extension(stub.PATH)
+
+        except ModuleNotFoundError:
+            self.LOGGER.warning(f'Cannot load a non-existent extension @ {stub.PATH!s}!')
+
+        except ImportError as e:
+            self.LOGGER.warning(f'Could not load extension @ {stub.PATH!s}!  Reason: {e!s}')
+
+        except LookupError:
+            self.LOGGER.warning(f'Extension @ {stub.PATH!s} does not contain an Extension subclass!')
+
+        else:
+            return ext
+
+    # Chat methods
+    def process_chat_message(self, platform: dataclassez.Platform, message: dataclassez.Message):
+        """Processes a raw chat message into a command."""
+        if not message.content.startswith(self.prefix.value):
+            if self.command_manager.PARSER_DEBUG:
+                self.LOGGER.debug(f'Message "{message}" '
+                                  f'does not start with the user\'s '
+                                  f'requested prefix of '
+                                  f'"{self.prefix.value}"!')
+
+            return
+
+        try:
+            command, arguments = self.command_manager.parse(message.content[len(self.prefix.value):],
+                                                            ignore_case=True)
+
+        except commands.errors.CommandNotFound:
+            return
+
+        if command is not None:
+            if self.command_manager.PARSER_DEBUG:
+                self.LOGGER.debug(f'Located command "{command.qualified_name}"!')
+
+            if not self.command_manager.authorize(command, message.user, message.channel):
+                return self.LOGGER.debug(f'{message.user.username} may not invoke "{command.qualified_name}"!')
+
+            # Re-implement commands.Manager to tie into the signals defined above.
+            argspec = inspect.getfullargspec(command.func)
+            key_arguments = {}
+
+            for argument in arguments.copy():
+                if '=' in argument and self.command_manager.is_kv_pair(argument):
+                    k, v = argument.split('=', 1)
+                    key_arguments[k] = v if v else None
+
+                    arguments.pop(arguments.index(argument))
+
+            try:
+                args, originals = self.command_manager.convert_args(command.func, *arguments, **key_arguments)
+
+            except commands.errors.CommandsError as e:
+                return self.LOGGER.debug(f'Could not convert the arguments for "{command.qualified_name}"!  '
+                                         f'Reason: {e!s}')
+
+            if not argspec.varargs:
+                final_positionals = []
+
+                for key, value in originals.items():
+                    if key not in args:
+                        final_positionals.append(value)
+
+            else:
+                final_positionals = arguments
+
+            # Build a context object
+            try:
+                # noinspection PyUnresolvedReferences
+                prefix = command.prefix
+
+            except AttributeError:
+                prefix = self.prefix.value
+
+            context = commands.Context(
+                prefix=prefix,
+                message=message,
+                platform=platform,
+                command=command,
+                arguments=final_positionals,
+                kwarguments=args
+            )
+
+            # Inform listeners that a command is about to be executed.  Listeners
+            # deny the execution by emitting `denyCommandExecute` with the
+            # context while they're being notified.
+            self._announcing[id(context)] = False
+
+            try:
+                self.onCommandExecuteRequested.emit(context)
+
+            finally:
+                denied = self._announcing.pop(id(context))
+
+            if denied:
+                return self.LOGGER.debug(f'Command execution of "{command.qualified_name}" was denied!')
+
+            try:
+                if command.wants_context:
+                    command(context, *final_positionals, **args)
+
+                else:
+                    command(*final_positionals, **args)
+
+            except commands.errors.CommandsError:
+                self.LOGGER.warning(f'Command "{command.qualified_name}" does not contain a callable!')
+
+            except Exception:
+                # Commands are invoked by chat, so a broken command mustn't
+                # reach the excepthook, which quits the application.
+                self.LOGGER.exception(f'Command "{command.qualified_name}" raised an exception!')
+
+            else:
+                self.onCommandExecute.emit(context)
+
+    def deny_command(self, context: commands.Context):
+        """Marks `context` as denied.  Only contexts that are currently being
+        announced through `onCommandExecuteRequested` can be denied."""
+        if id(context) in self._announcing:
+            self._announcing[id(context)] = True
+
+    # Event log methods
+    def bind_event_log(self, platform: dataclassez.Platform):
+        """Records the chat and moderation activity `platform` emits in the
+        event log."""
+        kinds = eventlog.EventKinds
+        name = platform.NAME
+
+        def record(kind: eventlog.EventKinds, user: dataclassez.User, **data):
+            self.event_log.append(eventlog.Event(kind, name, user.username, data))
+
+        platform.onMessage.connect(lambda m: record(kinds.MESSAGE, m.user, content=m.content))
+        platform.onUserJoin.connect(lambda u: record(kinds.JOIN, u))
+        platform.onUserLeave.connect(lambda u: record(kinds.LEAVE, u))
+        platform.onUserBanned.connect(lambda u, d: record(kinds.BAN, u, duration=d))
+        platform.onUserUnbanned.connect(lambda u: record(kinds.UNBAN, u))
+        platform.onUserPromoted.connect(lambda u: record(kinds.PROMOTE, u))
+        platform.onUserDemoted.connect(lambda u: record(kinds.DEMOTE, u))
+
+    def log_command(self, context: commands.Context):
+        """Records a command invocation in the event log."""
+        self.event_log.append(eventlog.Event(
+            eventlog.EventKinds.COMMAND,
+            context.platform.NAME,
+            context.invoker.username,
+            {
+                'command': context.command.qualified_name,
+                'arguments': list(context.arguments),
+                'kwarguments': dict(context.kwarguments)
+            }
+        ))
+
+    # File menu slots
+    def start_bot(self):
+        """Starts ShovelBot.
+
+        When ShovelBot starts, all extensions that listen to `aboutToStart` or
+        `started` are expected to call their starting procedures.  If your
+        extension allows ShovelBot to connect to a streaming platform, you
+        should generally attach your connection logic to one of those signals."""
+        self.LOGGER.info('Performing starting operations...')
+        self.aboutToStart.emit()
+        self.started.emit()
+
+        self.LOGGER.info('ShovelBot started!')
+
+    def halt_bot(self):
+        """Halts ShovelBot.
+
+        When ShovelBot halts, all extension that listen to `aboutToHalt` or `
+        halted` are expected to call their halting procedures.
+
+        When ShovelBot is "halted" the bot should maintain connections to
+        streaming platforms, but all functionality is lost.  If an extension
+        contains commands, only critical commands should be invoked.
+
+        - Halt support is optional"""
+        self.LOGGER.warning('Performing halt operations...')
+        self.aboutToHalt.emit()
+        self.halted.emit()
+
+        self.LOGGER.warning('ShovelBot halted!')
+
+    def stop_bot(self):
+        """Stops ShovelBot.
+
+        When ShovelBot stops, all extensions that listen to `aboutToStop` or
+        `stopped` are expected to call their stopping procedures.
+
+        When ShovelBot is "stopped" the bot should close all connections to
+        streaming platforms."""
+        self.LOGGER.warning('Performing stopping operations...')
+        self.aboutToStop.emit()
+        self.stopped.emit()
+
+        self.LOGGER.warning('ShovelBot stopped!')
+
+
+    # Debug methods
+    def dump(self):
+        """A utility method for calling all debug methods."""
+        for name, inst in inspect.getmembers(self):
+            if name.startswith('dump_') and inspect.ismethod(inst):
+                # Get the method's signature
+                s = inspect.signature(inst)
+
+                # If the method has parameters, ignore it.
+                if s.parameters:
+                    self.LOGGER.debug(f'Ignoring debug method {self.__class__.__name__}.{name}.')
+                    continue
+
+                # Try to invoke the function.  If it fails,
+                # log any exception that it generated.
+                try:
+                    inst()
+
+                except Exception as e:
+                    self.LOGGER.debug(f'Debug method {self.__class__.__name__}.{name} failed with exception '
+                                      f'{e.__class__.__name__}!  ({e!s})')
+
+    def dump_startup_profile(self):
+        """Dumps the startup tracer's timeline into the log directory."""
+        # Declarations
+        app = QtCore.QCoreApplication.instance()
+
+        # Dump check
+        if not app.tracer.enabled:
+            return
+
+        # Dump timeline
+        app.tracer.dump(app.log_directory, f'{app.applicationName()}.startup')
+
+    def dump_extension_inheritance(self, ext: object):
+        """Dumps the extension's inheritance tree into the log file."""
+        # Declarations
+        app = QtCore.QCoreApplication.instance()
+        logger = logging.getLogger(f'{self.LOGGER.name}.loader')
+
+        # Dump check
+        if not app.debug_mode or '--dump-extension-inheritance' not in sys.argv:
+            return
+
+        # Dump inheritance
+        for attr, inst in inspect.getmembers(ext):
+            logger.debug(f'{ext.__class__.__name__} inheritance')
+
+            for c in inspect.getmro(inst):
+                # Get the module the class belongs to
+                m = inspect.getmodule(c)
+                package: typing.Optional[str] = None
+
+                # Get the module's package (namespace)
+                if m is not None:
+                    package = m.__package__
+
+                # Log it
+                logger.debug(f'  - {package!s}.{c.__name__}')
+
+    def dump_extension_namespace(self, before: typing.List[str], after: typing.List[str]):
+        """Dumps the namespace before and after an extension load."""
+        # Declarations
+        app = QtCore.QCoreApplication.instance()
+        logger = logging.getLogger(f'{self.LOGGER.name}.loader')
+
+        # Dump check
+        if not app.debug_mode or '--dump-extension-namespace' not in sys.argv:
+            return
+
+        # Dump namespace before extension was loaded
+        logger.debug(f'Before: {", ".join(before)}')
+
+        # Dump namespace after extension was loaded
+        logger.debug(f'After: {", ".join(after)}')
+
+        # Dump newly loaded modules
+        logger.debug('Extension modules: {}'.format(', '.join([m for m in after if m not in before])))
@@ -15,10 +15,12 @@ ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
 import dataclasses
 import logging
+import pathlib
 import typing
 
 from PySide2 import QtCore, QtGui, QtNetwork, QtWidgets
 
+from utils import Tracer, metadata
 from widgets import Client
 
 __all__ = ['QApp']
@@ -34,21 +36,33 @@ class QApp(QtWidgets.QApplication):
     debug_mode: bool = dataclasses.field(init=False)
     disable_updater: bool = dataclasses.field(init=False)
     redirect_policy: int = dataclasses.field(init=False)
+    log_directory: pathlib.Path = dataclasses.field(init=False)
+    tracer: Tracer = dataclasses.field(init=False)
 
     args: dataclasses.InitVar[typing.List[str]]
+    profile_startup: dataclasses.InitVar[bool] = False
+
+    def __post_init__(self, args: typing.List[str], profile_startup: bool):
+        # Web views create their engine on demand, which requires contexts to
+        # be shared before the application exists.
+        QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
 
-    def __post_init__(self, args: typing.List[str]):
         # noinspection PySuperArguments
         super(QApp, self).__init__(args)
 
-        self.client = Client()
+        self.log_directory = pathlib.Path.cwd()
+        self.tracer = Tracer(enabled=profile_startup)
+
+        with self.tracer.span('Client', 'widget'):
+            self.client = Client()
+
         self.network_access_manager = QtNetwork.QNetworkAccessManager()
 
-        self.setApplicationName('shovelbot')
-        self.setApplicationDisplayName('ShovelBot: Portable')
-        self.setApplicationVersion('0.2.0')
+        self.setApplicationName(metadata.NAME)
+        self.setApplicationDisplayName(metadata.DISPLAY_NAME)
+        self.setApplicationVersion(metadata.VERSION)
         self.setWindowIcon(QtGui.QIcon(self.client.ASSETS.filePath('icon.png')))
-        self.setOrganizationName('SirRandoo')
+        self.setOrganizationName(metadata.ORGANIZATION)
         self.setOrganizationDomain(self.client.REPOSITORY.toDisplayString())
 
     def set_redirect_policy(self, value: QtNetwork.QNetworkRequest.RedirectPolicy):
@@ -24,10 +24,12 @@
 # see <https://www.gnu.org/licenses/>.
 import dataclasses
 import logging
+import pathlib
 import typing
 
 from PyQt5 import QtNetwork, QtWidgets
 
+from core.utils import Tracer
 from core.widgets import ShovelBot
 
 
@@ -46,6 +48,14 @@ class QApp(QtWidgets.QApplication):
     disable_updater: bool
     redirect_policy: int
     
+    log_directory: pathlib.Path
+    """The directory the application's log file, and any other diagnostic
+    files, are written to."""
+    
+    tracer: Tracer
+    """The startup tracer.  The tracer is only enabled when the application
+    was launched with `--profile-startup`."""
+    
     args: dataclasses.InitVar[typing.List[str]]
     
     def __post_init__(self, args: typing.List[str]): ...
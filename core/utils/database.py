@@ -0,0 +1,310 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import contextlib
+import dataclasses
+import logging
+import pathlib
+import threading
+import typing
+
+from PySide6 import QtCore, QtSql
+
+__all__ = ['Database', 'DatabaseError']
+
+
+class DatabaseError(Exception):
+    """Raised when a connection couldn't be opened, or a statement couldn't
+    be prepared or executed."""
+
+
+@dataclasses.dataclass()
+class _Connection:
+    """A thread's connection, and the statements prepared on it.  `name` is
+    None once the connection has been closed."""
+    name: typing.Optional[str]
+    statements: typing.Dict[str, QtSql.QSqlQuery] = dataclasses.field(default_factory=dict)
+    depth: int = 0  # The number of open transactions
+
+
+class Database(QtCore.QObject):
+    """Owns every connection to ShovelBot's SQLite database.
+
+    QSqlDatabase connections can only be used by the thread that opened
+    them, so each thread is given its own named connection, alongside its
+    own cache of prepared statements.  Inserts that don't need to be written
+    immediately can be queued with `enqueue`;  queued inserts are written in
+    batches, inside a single transaction, by the thread that owns the
+    database.
+
+    Threads that used the database should call `close_connection` before
+    they exit.  `close` closes every thread's connection;  a thread that uses
+    the database afterwards is given a new one."""
+    LOGGER = logging.getLogger('core.database')
+    FLUSH_INTERVAL = 1000
+    PRAGMAS = [
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA foreign_keys=ON',
+        'PRAGMA busy_timeout=5000'
+    ]
+
+    def __init__(self, path: str, parent: QtCore.QObject = None):
+        super(Database, self).__init__(parent=parent)
+
+        self.path = path
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: typing.Dict[str, _Connection] = {}
+        self._queue: typing.Deque[typing.Tuple[str, tuple]] = collections.deque()
+
+        self._flush_timer = QtCore.QTimer(parent=self)
+        self._flush_timer.setInterval(self.FLUSH_INTERVAL)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+
+    # Connection methods
+    def connection(self) -> QtSql.QSqlDatabase:
+        """Returns the calling thread's connection, opening it if it hasn't
+        been opened yet."""
+        state: typing.Optional[_Connection] = getattr(self._local, 'state', None)
+
+        if state is not None and state.name is not None:
+            return QtSql.QSqlDatabase.database(state.name, open=False)
+
+        name = f'shovelbot-{threading.get_ident()}'
+        pathlib.Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        db = QtSql.QSqlDatabase.addDatabase('QSQLITE', name)
+        db.setDatabaseName(self.path)
+
+        if not db.open():
+            error = db.lastError().text()
+            QtSql.QSqlDatabase.removeDatabase(name)
+
+            raise DatabaseError(f'Could not open {self.path}!  Reason: {error}')
+
+        for pragma in self.PRAGMAS:
+            QtSql.QSqlQuery(pragma, db)
+
+        state = _Connection(name)
+        self._local.state = state
+
+        with self._lock:
+            self._connections[name] = state
+
+        self.LOGGER.debug(f'Opened connection {name} to {self.path}')
+        return db
+
+    def close_connection(self):
+        """Closes the calling thread's connection.  Threads that used the
+        database should call this before they exit."""
+        state: typing.Optional[_Connection] = getattr(self._local, 'state', None)
+
+        if state is None or state.name is None:
+            return
+
+        with self._lock:
+            self._connections.pop(state.name, None)
+
+        self._release(state)
+
+    @staticmethod
+    def _release(state: _Connection):
+        name, state.name = state.name, None
+        state.statements.clear()
+        state.depth = 0
+
+        # Connections can only be closed by the thread that opened them;
+        # removing another thread's connection closes it regardless.
+        if QtSql.QSqlDatabase.contains(name) and name == f'shovelbot-{threading.get_ident()}':
+            QtSql.QSqlDatabase.database(name, open=False).close()
+
+        QtSql.QSqlDatabase.removeDatabase(name)
+
+    # Statement methods
+    def prepare(self, sql: str) -> QtSql.QSqlQuery:
+        """Returns a prepared query for `sql` on the calling thread's
+        connection.  Queries are cached, so the statement is only prepared
+        the first time it's used by each thread."""
+        db = self.connection()
+        statements = self._local.state.statements
+        query = statements.get(sql)
+
+        if query is None:
+            query = QtSql.QSqlQuery(db)
+
+            if not query.prepare(sql):
+                raise DatabaseError(f'Could not prepare "{sql}"!  Reason: {query.lastError().text()}')
+
+            statements[sql] = query
+
+        return query
+
+    def execute(self, sql: str, *values) -> QtSql.QSqlQuery:
+        """Executes `sql` with `values` bound to its placeholders, in order."""
+        query = self.prepare(sql)
+
+        for index, value in enumerate(values):
+            query.bindValue(index, value)
+
+        if not query.exec():
+            raise DatabaseError(f'Could not execute "{sql}"!  Reason: {query.lastError().text()}')
+
+        return query
+
+    @staticmethod
+    def _exec(db: QtSql.QSqlDatabase, sql: str):
+        query = QtSql.QSqlQuery(db)
+
+        if not query.exec(sql):
+            raise DatabaseError(f'Could not execute "{sql}"!  Reason: {query.lastError().text()}')
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Executes the body of the `with` statement inside a transaction on
+        the calling thread's connection.  The transaction is rolled back if
+        the body raises.
+
+        Transactions can be nested;  inner transactions are savepoints, so
+        rolling one back leaves the enclosing transaction intact, and nothing
+        is committed until the outermost transaction ends.
+
+        :raises DatabaseError: The transaction couldn't be started or
+                               committed.
+        """
+        db = self.connection()
+        state: _Connection = self._local.state
+        depth = state.depth
+        savepoint = f'shovelbot_{depth}'
+
+        if depth == 0:
+            if not db.transaction():
+                raise DatabaseError(f'Could not begin a transaction!  Reason: {db.lastError().text()}')
+
+        else:
+            self._exec(db, f'SAVEPOINT {savepoint}')
+
+        state.depth += 1
+
+        try:
+            yield db
+
+        except BaseException:
+            state.depth = depth
+
+            if depth == 0:
+                db.rollback()
+
+            else:
+                self._exec(db, f'ROLLBACK TO {savepoint}')
+                self._exec(db, f'RELEASE {savepoint}')
+
+            raise
+
+        state.depth = depth
+
+        if depth > 0:
+            self._exec(db, f'RELEASE {savepoint}')
+
+        elif not db.commit():
+            error = db.lastError().text()
+            db.rollback()
+
+            raise DatabaseError(f'Could not commit a transaction!  Reason: {error}')
+
+    # Write-behind methods
+    def enqueue(self, sql: str, *values):
+        """Queues `sql` to be executed in the next batch.  This method can be
+        called from any thread."""
+        with self._lock:
+            self._queue.append((sql, values))
+
+    def flush(self) -> int:
+        """Executes every queued statement inside a single transaction.
+        Statements that fail are logged and dropped;  the rest are still
+        written.  If the transaction itself fails, the statements are queued
+        again for the next flush.  Returns the number of statements
+        executed."""
+        with self._lock:
+            if not self._queue:
+                return 0
+
+            queued, self._queue = self._queue, collections.deque()
+
+        written = 0
+
+        try:
+            with self.transaction():
+                written = self._write(queued)
+
+        except DatabaseError as e:
+            self.LOGGER.warning(f'Could not write {len(queued)} queued statements;  retrying on the next flush.  '
+                                f'Reason: {e!s}')
+
+            with self._lock:
+                self._queue.extendleft(reversed(queued))
+
+            return 0
+
+        return written
+
+    def _write(self, queued: typing.Deque[typing.Tuple[str, tuple]]) -> int:
+        # Each statement is executed individually, since QSQLITE emulates
+        # execBatch by converting the bound lists for every row, which is far
+        # slower than reusing the prepared statement.
+        try:
+            with self.transaction():
+                for sql, values in queued:
+                    self.execute(sql, *values)
+
+            return len(queued)
+
+        except DatabaseError:
+            pass
+
+        # Something in the batch failed, so the batch was rolled back to its
+        # savepoint;  replay it one statement at a time to find the culprits.
+        written = 0
+
+        for sql, values in queued:
+            try:
+                with self.transaction():
+                    self.execute(sql, *values)
+
+            except DatabaseError as e:
+                self.LOGGER.warning(f'Dropping queued statement "{sql}" with values {values!r}!  Reason: {e!s}')
+
+            else:
+                written += 1
+
+        return written
+
+    def close(self):
+        """Writes the queue, then closes every connection."""
+        self._flush_timer.stop()
+        self.flush()
+
+        with self._lock:
+            connections, self._connections = self._connections, {}
+
+        for state in connections.values():
+            self._release(state)
+
+        if self._queue:
+            self.LOGGER.warning(f'Discarding {len(self._queue)} queued statements that could not be written!')
+            self._queue.clear()
@@ -0,0 +1,232 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import concurrent.futures
+import dataclasses
+import importlib.metadata
+import logging
+import os
+import pathlib
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+__all__ = ['Requirement', 'Timing', 'Updater', 'parse_requirement', 'read_requirements', 'collect_requirements']
+
+LOGGER = logging.getLogger('core.dependencies')
+NAME_PATTERN = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(\[[^\]]*\])?\s*(.*)$')
+PIN_PATTERN = re.compile(r'^==\s*([^\s,;*]+)$')
+
+
+@dataclasses.dataclass(frozen=True)
+class Requirement:
+    """A single line of a requirements file."""
+    line: str
+    name: str
+    pin: typing.Optional[str] = None  # Only set for exact (==) specifiers
+
+    @property
+    def is_vcs(self) -> bool:
+        return '://' in self.line
+
+    def is_satisfied(self) -> bool:
+        """Whether or not this requirement is pinned, and the pinned version
+        is already installed.  Unpinned requirements are never considered
+        satisfied, since the updater's job is to upgrade them."""
+        if self.pin is None or self.is_vcs:
+            return False
+
+        try:
+            return importlib.metadata.version(self.name) == self.pin
+
+        except importlib.metadata.PackageNotFoundError:
+            return False
+
+
+@dataclasses.dataclass()
+class Timing:
+    """How long a single pip invocation took."""
+    name: str
+    seconds: float
+    okay: bool
+    output: str = ''
+
+
+def normalize_name(name: str) -> str:
+    """Normalizes a distribution name as described by PEP 503."""
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def parse_requirement(line: str) -> typing.Optional[Requirement]:
+    """Parses a line from a requirements file.  Blank lines, comments, and
+    pip options return None."""
+    line = line.strip()
+
+    if not line or line.startswith('#') or line.startswith('-'):
+        return None
+
+    if '://' in line:
+        _, _, fragment = line.partition('#')
+        egg = dict(p.split('=', 1) for p in fragment.split('&') if '=' in p).get('egg')
+
+        return Requirement(line, normalize_name(egg or line))
+
+    line = line.split(' #', 1)[0].strip()
+    match = NAME_PATTERN.match(line)
+
+    if match is None:
+        return None
+
+    name, _, specifier = match.groups()
+    pin = PIN_PATTERN.match(specifier.strip())
+
+    return Requirement(line, normalize_name(name), pin.group(1) if pin else None)
+
+
+def read_requirements(path: pathlib.Path) -> typing.List[Requirement]:
+    """Reads all requirements from a requirements file."""
+    with path.open() as infile:
+        return [r for r in map(parse_requirement, infile) if r is not None]
+
+
+def collect_requirements(*paths: pathlib.Path) -> typing.List[Requirement]:
+    """Returns the union of the requirements in all `paths`.  When the same
+    distribution is listed more than once, pinned and VCS requirements take
+    precedence over bare names."""
+    union: typing.Dict[str, Requirement] = {}
+
+    for path in paths:
+        for requirement in read_requirements(path):
+            existing = union.get(requirement.name)
+
+            if existing is None or (not existing.pin and not existing.is_vcs):
+                union[requirement.name] = requirement
+
+            elif existing.line != requirement.line and (requirement.pin or requirement.is_vcs):
+                LOGGER.warning(f'Conflicting requirements for {requirement.name}: "{existing.line}" and '
+                               f'"{requirement.line}" ({path!s});  using the former.')
+
+    return list(union.values())
+
+
+class Updater:
+    """Updates a set of requirements with pip.
+
+    Each requirement's own wheel is downloaded (or built) by a bounded pool of
+    workers, one pip process per requirement, into its own staging directory
+    before being moved into `cache`.  Their dependencies are then fetched into
+    `cache` by a single resolver run, and everything is installed from that
+    directory in another."""
+
+    def __init__(self, requirements: typing.List[Requirement], *, cache: pathlib.Path, workers: int = 4):
+        self.requirements = requirements
+        self.cache = cache
+        self.workers = max(workers, 1)
+
+        # The wheels fetched for each requirement, by name
+        self.wheels: typing.Dict[str, typing.List[pathlib.Path]] = {}
+
+    def _pip(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            [sys.executable, '-m', 'pip', *args, '--disable-pip-version-check',
+             '--cache-dir', str(self.cache.joinpath('http'))],
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+        )
+
+    def _fetch(self, requirement: Requirement) -> Timing:
+        start = time.perf_counter()
+
+        # Workers never write to the same directory;  finished wheels are
+        # moved into the cache, which is atomic, and distinct requirements
+        # never produce wheels with the same name.
+        staging = self.cache.joinpath('.staging', requirement.name)
+        shutil.rmtree(staging, ignore_errors=True)
+
+        try:
+            result = self._pip('wheel', '--no-deps', '--wheel-dir', str(staging), requirement.line)
+            wheels = []
+
+            for wheel in staging.glob('*.whl'):
+                target = self.cache.joinpath(wheel.name)
+                os.replace(wheel, target)
+                wheels.append(target)
+
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        if result.returncode == 0:
+            self.wheels[requirement.name] = wheels
+
+        return Timing(requirement.name, time.perf_counter() - start, result.returncode == 0, result.stdout)
+
+    def fetch(self) -> typing.Iterator[Timing]:
+        """Downloads a wheel for every requirement, without its dependencies,
+        into the cache directory.  Timings are yielded as each download
+        finishes."""
+        self.cache.mkdir(parents=True, exist_ok=True)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = [executor.submit(self._fetch, r) for r in self.requirements]
+
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+
+        shutil.rmtree(self.cache.joinpath('.staging'), ignore_errors=True)
+
+    def _run(self, name: str, *args: str, fallback: typing.Sequence[str] = ()) -> Timing:
+        """Runs pip against a requirements file listing every requirement.
+        Requirements that were fetched are replaced by their wheels, so VCS
+        requirements aren't built again.  If pip fails and `fallback` is
+        given, pip is run once more with those arguments instead."""
+        start = time.perf_counter()
+        lines = []
+
+        for requirement in self.requirements:
+            wheels = self.wheels.get(requirement.name)
+            lines.extend([str(w) for w in wheels] if wheels else [requirement.line])
+
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as outfile:
+            outfile.write('\n'.join(lines))
+
+        try:
+            result = self._pip(*args, '-r', outfile.name)
+            output = result.stdout
+
+            if result.returncode != 0 and fallback:
+                LOGGER.warning(f'{name.capitalize()} from the wheel cache failed;  retrying against the package '
+                               f'index...')
+                result = self._pip(*fallback, '-r', outfile.name)
+                output = f'{output}\n--- Retrying against the package index ---\n{result.stdout}'
+
+        finally:
+            pathlib.Path(outfile.name).unlink()
+
+        return Timing(name, time.perf_counter() - start, result.returncode == 0, output)
+
+    def resolve(self) -> Timing:
+        """Downloads the dependencies of every requirement into the cache
+        directory in a single resolver run.  Wheels that are already cached
+        aren't downloaded again."""
+        return self._run('dependencies', 'wheel', '--wheel-dir', str(self.cache), '--find-links', str(self.cache))
+
+    def install(self) -> Timing:
+        """Installs every requirement in a single pip run, preferring the
+        wheels in the cache directory."""
+        return self._run('install', 'install', '-U', '--no-index', '--find-links', str(self.cache),
+                         fallback=('install', '-U', '--find-links', str(self.cache)))
@@ -15,7 +15,7 @@ ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
 import enum
 
-__all__ = ['BanBehaviors', 'DatabaseTypes', 'ExtensionStates']
+__all__ = ['BanBehaviors', 'DatabaseTypes', 'ExtensionStates', 'Roles']
 
 
 class BanBehaviors(enum.IntFlag):
@@ -39,3 +39,18 @@ class ExtensionStates(enum.Enum):
     STARTED = enum.auto()
     HALTED = enum.auto()
     STOPPED = enum.auto()
+
+
+class Roles(enum.IntFlag):
+    NONE = 0
+
+    SUBSCRIBER = 1
+    TIER_2 = 2
+    TIER_3 = 4
+
+    VIP = 8
+    MODERATOR = 16
+    BROADCASTER = 32
+    STAFF = 64
+
+    MODERATION = MODERATOR | BROADCASTER | STAFF
@@ -24,7 +24,7 @@
 # see <https://www.gnu.org/licenses/>.
 import enum
 
-__all__ = ['BanBehaviors', 'DatabaseTypes', 'ExtensionStates']
+__all__ = ['BanBehaviors', 'DatabaseTypes', 'ExtensionStates', 'Roles']
 
 
 class BanBehaviors(enum.IntFlag):
@@ -62,3 +62,26 @@ class ExtensionStates(enum.Enum):
     STARTED: ExtensionStates
     HALTED: ExtensionStates
     STOPPED: ExtensionStates
+
+
+class Roles(enum.IntFlag):
+    """The roles a user holds in a channel.  Platforms set these on every
+    User they create, so permission checks are integer operations."""
+    NONE: int
+
+    SUBSCRIBER: int
+    """The user is subscribed to the channel, at any tier."""
+    TIER_2: int
+    """The user's subscription is tier 2.  Always set with `SUBSCRIBER`."""
+    TIER_3: int
+    """The user's subscription is tier 3.  Always set with `SUBSCRIBER`."""
+
+    VIP: int
+    MODERATOR: int
+    BROADCASTER: int
+    STAFF: int
+    """The user is a member of the platform's staff, or one of its global
+    moderators."""
+
+    MODERATION: int
+    """Every role that can moderate the channel."""
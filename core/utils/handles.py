@@ -0,0 +1,56 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import typing
+
+__all__ = ['SettingHandle']
+
+
+class SettingHandle:
+    """A setting resolved from its path once.
+
+    The handle caches the setting's value, and updates it whenever the
+    setting emits `value_changed`, so code that reads a setting on every
+    message can read `handle.value` instead of walking the settings tree."""
+    __slots__ = ('path', 'node', 'value')
+
+    def __init__(self, path: str, node):
+        self.path = path
+        self.node = None
+        self.value: typing.Any = None
+
+        self.bind(node)
+
+    def bind(self, node):
+        """Binds the handle to `node`, like when the setting at the handle's
+        path was replaced."""
+        if self.node is node:
+            return
+
+        self.node = node
+        self.value = node.value
+
+        node.value_changed.connect(lambda *_, n=node: self._update(n))
+
+    def set_value(self, value: typing.Any):
+        """Sets the setting's value."""
+        self.node.value = value
+
+    def _update(self, node):
+        if node is self.node:
+            self.value = node.value
+
+    def __repr__(self) -> str:
+        return f'<SettingHandle {self.path}={self.value!r}>'
@@ -0,0 +1,165 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+# This module intentionally doesn't import Qt, so it can be used by the
+# benchmarks and stand-ins without a QCoreApplication.
+import array
+import typing
+
+__all__ = ['IntSet']
+
+EMPTY = 0
+DELETED = 0xFFFFFFFFFFFFFFFF
+MULTIPLIER = 0x9E3779B97F4A7C15  # 2**64 / golden ratio
+MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class IntSet:
+    """A set of unsigned 64-bit integers, stored in an open addressed hash
+    table backed by a single array.
+
+    Each member costs 8 bytes per slot, and the table is kept at most half
+    full, so large sets (like a channel's followers) take a fraction of the
+    memory a set of ints would.  Membership checks are O(1) on average.
+    0 and 2**64 - 1 are reserved, and can't be members."""
+    MIN_BITS = 4
+    MAX_LOAD = 0.5
+
+    def __init__(self, values: typing.Iterable[int] = ()):
+        self._bits = self.MIN_BITS
+        self._slots = array.array('Q', bytes(8 << self._bits))
+        self._size = 0
+        self._used = 0  # Members and tombstones
+
+        self.update(values)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> typing.Iterator[int]:
+        for value in self._slots:
+            if value != EMPTY and value != DELETED:
+                yield value
+
+    def __contains__(self, value: int) -> bool:
+        if not EMPTY < value < DELETED:
+            return False
+
+        return self._slots[self._find(value)] == value
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, IntSet):
+            return NotImplemented
+
+        return len(self) == len(other) and all(v in other for v in self)
+
+    def __repr__(self) -> str:
+        return f'<IntSet size={self._size} capacity={len(self._slots)}>'
+
+    @property
+    def nbytes(self) -> int:
+        """The number of bytes used by the table."""
+        return self._slots.itemsize * len(self._slots)
+
+    # Table methods
+    def _find(self, value: int) -> int:
+        """Returns the slot `value` occupies, or the slot it should be
+        inserted into."""
+        slots = self._slots
+        mask = len(slots) - 1
+        index = ((value * MULTIPLIER) & MASK) >> (64 - self._bits)
+        tombstone = -1
+
+        while True:
+            current = slots[index]
+
+            if current == value:
+                return index
+
+            if current == EMPTY:
+                return index if tombstone < 0 else tombstone
+
+            if current == DELETED and tombstone < 0:
+                tombstone = index
+
+            index = (index + 1) & mask
+
+    def _resize(self, bits: int):
+        old = self._slots
+
+        self._bits = bits
+        self._slots = array.array('Q', bytes(8 << bits))
+        self._size = self._used = 0
+
+        for value in old:
+            if value != EMPTY and value != DELETED:
+                self._slots[self._find(value)] = value
+                self._size += 1
+
+        self._used = self._size
+
+    # Set methods
+    def add(self, value: int) -> bool:
+        """Adds `value` to the set.  Returns False if it was already a
+        member."""
+        if not EMPTY < value < DELETED:
+            raise ValueError(f'{value} can not be stored in an IntSet')
+
+        index = self._find(value)
+        current = self._slots[index]
+
+        if current == value:
+            return False
+
+        self._slots[index] = value
+        self._size += 1
+
+        if current == EMPTY:
+            self._used += 1
+
+            if self._used > len(self._slots) * self.MAX_LOAD:
+                # Only grow if the table is full of members;  tombstones are
+                # cleared by rebuilding at the same size.
+                self._resize(self._bits + 1 if self._size > len(self._slots) * self.MAX_LOAD / 2 else self._bits)
+
+        return True
+
+    def discard(self, value: int) -> bool:
+        """Removes `value` from the set.  Returns False if it wasn't a
+        member."""
+        if value not in self:
+            return False
+
+        self._slots[self._find(value)] = DELETED
+        self._size -= 1
+
+        return True
+
+    def update(self, values: typing.Iterable[int]):
+        for value in values:
+            self.add(value)
+
+    def clear(self):
+        self._bits = self.MIN_BITS
+        self._slots = array.array('Q', bytes(8 << self._bits))
+        self._size = self._used = 0
+
+    def difference(self, other: typing.Container[int]) -> typing.Iterator[int]:
+        """Yields every member that isn't in `other`."""
+        return (v for v in self if v not in other)
+
+    def intersection(self, other: typing.Container[int]) -> typing.Iterator[int]:
+        """Yields every member that's also in `other`."""
+        return (v for v in self if v in other)
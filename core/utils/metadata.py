@@ -0,0 +1,30 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+# This module intentionally doesn't import Qt, so commands that only need to
+# describe the application don't have to pay for a QApplication.
+
+__all__ = ['NAME', 'DISPLAY_NAME', 'VERSION', 'ORGANIZATION', 'DESCRIPTION', 'REPOSITORY', 'AUTHORS', 'LICENSE',
+           'LICENSE_URL']
+
+NAME = 'shovelbot'
+DISPLAY_NAME = 'ShovelBot: Portable'
+VERSION = '0.2.0'
+ORGANIZATION = 'SirRandoo'
+DESCRIPTION = 'An open source, modular bot to help streamers interact with their audience.'
+REPOSITORY = 'https://github.com/sirrandoo/shovelbot'
+AUTHORS = {'SirRandoo'}
+LICENSE = 'GNU General Public License 3 or later'
+LICENSE_URL = 'https://www.gnu.org/licenses/quick-guide-gplv3.html'
@@ -0,0 +1,315 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import concurrent.futures
+import json
+import logging
+import os
+import pathlib
+import threading
+import typing
+
+from PySide6 import QtCore
+
+from QtUtilities import settings
+from core.utils import SettingHandle, snapshot
+
+__all__ = ['SettingsStore', 'iter_settings']
+
+
+def iter_settings(setting: settings.Setting, prefix: str = '') -> typing.Iterator[typing.Tuple[str, settings.Setting]]:
+    """Yields every setting in `setting`'s tree, including itself, alongside
+    its slash-separated path."""
+    path = f'{prefix}/{setting.key}' if prefix else setting.key
+    yield path, setting
+
+    for child in setting.children:
+        yield from iter_settings(child, path)
+
+
+class SettingsStore(QtCore.QObject):
+    """Persists a settings tree to disk without stalling the event loop.
+
+    Changes are coalesced by path, and appended to a journal once they've
+    settled for `DEBOUNCE` milliseconds.  Periodically, every top-level
+    setting whose tree changed is re-serialized, and the settings file is
+    rewritten in the background by writing a temporary file and renaming it
+    over the old one.  Top-level settings that didn't change reuse the
+    serialization from the previous write.  A binary snapshot of the same
+    data is written next to the settings file for faster startups.  Once the
+    settings file is written, the journal entries it includes are
+    discarded.
+
+    If the application crashes, the journal will still contain every change
+    made since the last write, which `replay` applies on the next start."""
+    LOGGER = logging.getLogger('core.settings')
+    DEBOUNCE = 500
+    SNAPSHOT_INTERVAL = 30 * 1000
+
+    def __init__(self, path: pathlib.Path, parent: QtCore.QObject = None):
+        super(SettingsStore, self).__init__(parent=parent)
+
+        self.path = path
+        self.journal_path = path.with_name(f'{path.name}.journal')
+        self.snapshot_path = snapshot.snapshot_path(path)
+        self.roots: typing.Dict[str, settings.Setting] = {}
+        self.nodes: typing.Dict[str, settings.Setting] = {}
+        self.handles: typing.Dict[str, SettingHandle] = {}
+
+        self._pending: typing.Dict[str, typing.Any] = {}
+        self._unresolved: typing.Dict[str, typing.Any] = {}
+        self._dirty: typing.Set[str] = set()
+        self._fragments: typing.Dict[str, str] = {}
+        self._trees: typing.Dict[str, typing.Any] = {}
+        self._values: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._deferred: typing.Dict[str, typing.Callable[[], typing.Any]] = {}
+        self._lock = threading.Lock()
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='settings')
+        self._write: typing.Optional[concurrent.futures.Future] = None
+
+        self._debounce_timer = QtCore.QTimer(parent=self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(self.DEBOUNCE)
+        self._debounce_timer.timeout.connect(self.flush_journal)
+
+        self._snapshot_timer = QtCore.QTimer(parent=self)
+        self._snapshot_timer.setSingleShot(True)
+        self._snapshot_timer.setInterval(self.SNAPSHOT_INTERVAL)
+        self._snapshot_timer.timeout.connect(self.write_snapshot)
+
+    # Tracking methods
+    def track(self, setting: settings.Setting):
+        """Tracks a top-level setting, and every setting in its tree."""
+        self.roots[setting.key] = setting
+        self._deferred.pop(setting.key, None)
+        self._fragments.pop(setting.key, None)
+        self._dirty.add(setting.key)
+
+        self.rescan()
+
+    def defer(self, key: str, tree: typing.Any, values: typing.Dict[str, typing.Any],
+              loader: typing.Callable[[], typing.Any]):
+        """Tracks a top-level setting that hasn't been built yet.  `tree` and
+        `values` are written to the settings file as-is until `loader` is
+        called, which is expected to build the setting and track it;  it's
+        called the first time a setting in its tree is needed."""
+        self._trees[key] = tree
+        self._values[key] = values
+        self._deferred[key] = loader
+
+    def rescan(self):
+        """Tracks settings added to the tracked trees since they were last
+        scanned, like settings registered by extensions."""
+        for key, root in self.roots.items():
+            for path, node in iter_settings(root):
+                if self.nodes.get(path) is node:
+                    continue
+
+                self.nodes[path] = node
+                self._dirty.add(key)
+                node.value_changed.connect(lambda *_, p=path: self._value_changed(p))
+
+                if path in self.handles:
+                    self.handles[path].bind(node)
+
+                if path in self._unresolved:
+                    node.value = self._unresolved.pop(path)
+
+    def node(self, path: str) -> settings.Setting:
+        """Returns the setting at `path`, like `extensions/twitch/channel`.
+        Settings that haven't been tracked yet are found by rescanning."""
+        if path not in self.nodes:
+            self._load(path)
+            self.rescan()
+
+        return self.nodes[path]
+
+    def keys(self) -> typing.List[str]:
+        """Returns the key of every top-level setting, including those that
+        haven't been built yet."""
+        return [*self.roots, *(k for k in self._deferred if k not in self.roots)]
+
+    def _load(self, path: str):
+        loader = self._deferred.pop(path.split('/', 1)[0], None)
+
+        if loader is not None:
+            loader()
+
+    def handle(self, path: str) -> SettingHandle:
+        """Returns a handle to the setting at `path`.  Handles are shared,
+        and are rebound if the setting at their path is replaced."""
+        if path not in self.handles:
+            self.handles[path] = SettingHandle(path, self.node(path))
+
+        return self.handles[path]
+
+    def _value_changed(self, path: str):
+        node = self.nodes.get(path)
+
+        if node is None:
+            return
+
+        self._pending[path] = node.value
+        self._dirty.add(path.split('/', 1)[0])
+        self._debounce_timer.start()
+
+    # Journal methods
+    def flush_journal(self):
+        """Appends every pending change to the journal."""
+        self._debounce_timer.stop()
+
+        if not self._pending:
+            return
+
+        lines = ''.join(json.dumps({'path': p, 'value': v}) + '\n' for p, v in self._pending.items())
+        self._pending.clear()
+
+        with self._lock:
+            with self.journal_path.open('a', encoding='UTF-8') as outfile:
+                outfile.write(lines)
+                outfile.flush()
+                os.fsync(outfile.fileno())
+
+        if not self._snapshot_timer.isActive():
+            self._snapshot_timer.start()
+
+    def replay(self) -> int:
+        """Applies changes left in the journal by a previous session.
+        Changes to settings that don't exist yet are applied once they're
+        tracked.  Returns the number of changes applied."""
+        if not self.journal_path.exists():
+            return 0
+
+        changes: typing.Dict[str, typing.Any] = {}
+
+        with self.journal_path.open(encoding='UTF-8') as infile:
+            for line in infile:
+                try:
+                    entry = json.loads(line)
+
+                except ValueError:
+                    self.LOGGER.warning('Discarding a partially written journal entry!')
+                    break
+
+                changes[entry['path']] = entry['value']
+
+        for path, value in changes.items():
+            # Changes to a setting that hasn't been built would be lost once
+            # the journal is discarded, so its tree is built now.
+            self._load(path)
+            node = self.nodes.get(path)
+
+            if node is None:
+                self._unresolved[path] = value
+
+            else:
+                node.value = value
+
+        self.LOGGER.info(f'Recovered {len(changes)} setting changes from the journal.')
+        return len(changes)
+
+    # Snapshot methods
+    def write_snapshot(self, *, wait: bool = False):
+        """Rewrites the settings file in the background.  If `wait` is True,
+        this method blocks until the file was written."""
+        self._snapshot_timer.stop()
+        self.flush_journal()
+
+        if not self._dirty and self.path.exists() and not self.journal_path.exists():
+            return  # Nothing changed since the last write
+
+        if self._write is not None and not self._write.done():
+            if not wait:
+                return self._snapshot_timer.start()  # Try again once the current write finished
+
+            self._write.result()
+
+        for key in self._dirty:
+            root = self.roots[key]
+
+            try:
+                tree = root.to_data()
+                self._fragments[key] = json.dumps(tree)
+
+            except ValueError as e:
+                self.LOGGER.warning(f'Setting "{key}" could not be serialized!')
+                self.LOGGER.warning(f'Reason: {e.__cause__}')
+
+            else:
+                self._trees[key] = tree
+                self._values[key] = {p: n.value for p, n in iter_settings(root)}
+
+        self._dirty.clear()
+
+        for key in self._deferred:
+            if key not in self._fragments:
+                self._fragments[key] = json.dumps(self._trees[key])
+
+        with self._lock:
+            offset = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+
+        keys = self.keys()
+        data = '[' + ','.join(self._fragments[k] for k in keys if k in self._fragments) + ']'
+        entries = [(k, self._trees[k], self._values[k]) for k in keys if k in self._trees]
+        self._write = self._writer.submit(self._write_snapshot, data, entries, offset)
+
+        if wait:
+            self._write.result()
+
+    def _write_snapshot(self, data: str, entries: list, offset: int):
+        temp = self.path.with_name(f'{self.path.name}.tmp')
+
+        try:
+            with temp.open('w', encoding='UTF-8') as outfile:
+                outfile.write(data)
+                outfile.flush()
+                os.fsync(outfile.fileno())
+
+            os.replace(temp, self.path)
+
+        except OSError as e:
+            return self.LOGGER.warning(f'Settings could not be saved!  Reason: {e!s}')
+
+        # The binary snapshot is only a cache of the settings file, so failing
+        # to write it isn't fatal;  it'll be ignored on the next start.
+        try:
+            snapshot.Snapshot.write(self.snapshot_path, self.path, entries)
+
+        except (OSError, ValueError) as e:
+            self.LOGGER.warning(f'Settings snapshot could not be saved!  Reason: {e!s}')
+
+        # Discard the journal entries the settings file now contains
+        with self._lock:
+            if not self.journal_path.exists():
+                return
+
+            with self.journal_path.open('rb') as infile:
+                infile.seek(offset)
+                remaining = infile.read()
+
+            if remaining:
+                temp = self.journal_path.with_name(f'{self.journal_path.name}.tmp')
+                temp.write_bytes(remaining)
+                os.replace(temp, self.journal_path)
+
+            else:
+                self.journal_path.unlink()
+
+        self.LOGGER.debug(f'Saved settings to {self.path!s}')
+
+    def save(self):
+        """Writes every change to the settings file, and blocks until the
+        file was written."""
+        self.write_snapshot(wait=True)
@@ -0,0 +1,188 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+# This module intentionally doesn't import Qt, so the updater can read the
+# extensions directory without constructing the settings tree.
+import marshal
+import mmap
+import os
+import pathlib
+import struct
+import typing
+
+__all__ = ['Snapshot', 'SnapshotError', 'snapshot_path']
+
+MAGIC = b'SBST'
+VERSION = 1
+
+# magic, format version, marshal version, source size, source mtime, entries
+HEADER = struct.Struct('<4sHHqqI')
+
+# key length, values offset, values length, tree offset, tree length
+ENTRY = struct.Struct('<HQIQI')
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is malformed, was written by an incompatible
+    version, or is older than the settings file it was taken from."""
+
+
+def snapshot_path(source: pathlib.Path) -> pathlib.Path:
+    """Returns the path of the snapshot for the settings file `source`."""
+    return source.with_name(f'{source.name}.bin')
+
+
+class Snapshot:
+    """A binary copy of the settings file.
+
+    Every top-level setting is stored as two independently decodable blocks:
+    its serialized tree, as returned by `Setting.to_data`, and a flat table
+    of every path in the tree to its value.  Blocks are only decoded when
+    they're asked for, so reading a single value doesn't require decoding,
+    or building, the rest of the tree.
+
+    The header records the size and modification time of the settings file
+    the snapshot was taken from;  if the settings file changed since, the
+    snapshot is considered stale and refuses to open."""
+
+    def __init__(self, path: pathlib.Path, buffer: mmap.mmap,
+                 index: typing.Dict[str, typing.Tuple[int, int, int, int]]):
+        self.path = path
+        self.index = index
+
+        self._buffer = buffer
+        self._values: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+
+    # Reading methods
+    @classmethod
+    def open(cls, path: pathlib.Path, *, source: pathlib.Path = None) -> 'Snapshot':
+        """Opens the snapshot at `path`.  If `source` is passed, the
+        snapshot must've been taken from its current contents."""
+        with path.open('rb') as infile:
+            buffer = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if len(buffer) < HEADER.size:
+                raise SnapshotError(f'{path!s} is too small to be a snapshot!')
+
+            magic, version, marshal_version, size, mtime, count = HEADER.unpack_from(buffer, 0)
+
+            if magic != MAGIC:
+                raise SnapshotError(f"{path!s} isn't a settings snapshot!")
+
+            if version != VERSION or marshal_version != marshal.version:
+                raise SnapshotError(f'{path!s} was written by an incompatible version!')
+
+            if source is not None:
+                stat = source.stat()
+
+                if stat.st_size != size or stat.st_mtime_ns != mtime:
+                    raise SnapshotError(f'{path!s} is older than {source!s}!')
+
+            index = {}
+            offset = HEADER.size
+
+            for _ in range(count):
+                length, *entry = ENTRY.unpack_from(buffer, offset)
+                offset += ENTRY.size
+
+                index[buffer[offset:offset + length].decode('UTF-8')] = tuple(entry)
+                offset += length
+
+        except (SnapshotError, struct.error, UnicodeDecodeError) as e:
+            buffer.close()
+
+            if isinstance(e, SnapshotError):
+                raise
+
+            raise SnapshotError(f'{path!s} is malformed!') from e
+
+        return cls(path, buffer, index)
+
+    def keys(self) -> typing.List[str]:
+        """Returns the keys of every top-level setting in the snapshot."""
+        return list(self.index)
+
+    def subtree(self, key: str) -> typing.Any:
+        """Returns the serialized tree of the top-level setting `key`."""
+        _, _, offset, length = self.index[key]
+
+        return self._load(offset, length)
+
+    def values(self, key: str) -> typing.Dict[str, typing.Any]:
+        """Returns every path in the top-level setting `key`'s tree mapped to
+        its value."""
+        if key not in self._values:
+            offset, length, _, _ = self.index[key]
+            self._values[key] = self._load(offset, length)
+
+        return self._values[key]
+
+    def value(self, path: str) -> typing.Any:
+        """Returns the value of the setting at `path`, like
+        `extensions/directory`."""
+        return self.values(path.split('/', 1)[0])[path]
+
+    def _load(self, offset: int, length: int) -> typing.Any:
+        try:
+            return marshal.loads(self._buffer[offset:offset + length])
+
+        except (EOFError, TypeError, ValueError) as e:
+            raise SnapshotError(f'{self.path!s} is malformed!') from e
+
+    def close(self):
+        self._buffer.close()
+
+    def __enter__(self) -> 'Snapshot':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # Writing methods
+    @staticmethod
+    def write(path: pathlib.Path, source: pathlib.Path,
+              entries: typing.Iterable[typing.Tuple[str, typing.Any, typing.Dict[str, typing.Any]]]):
+        """Writes a snapshot of the settings file `source` to `path`.  Each
+        entry is a top-level setting's key, its serialized tree, and its
+        flat table of values."""
+        blocks = []
+
+        for key, tree, values in entries:
+            blocks.append((key.encode('UTF-8'), marshal.dumps(values), marshal.dumps(tree)))
+
+        stat = source.stat()
+        header = HEADER.pack(MAGIC, VERSION, marshal.version, stat.st_size, stat.st_mtime_ns, len(blocks))
+        offset = HEADER.size + sum(ENTRY.size + len(k) for k, _, _ in blocks)
+        index = []
+
+        for key, values, tree in blocks:
+            index.append(ENTRY.pack(len(key), offset, len(values), offset + len(values), len(tree)) + key)
+            offset += len(values) + len(tree)
+
+        temp = path.with_name(f'{path.name}.tmp')
+
+        with temp.open('wb') as outfile:
+            outfile.write(header)
+            outfile.writelines(index)
+
+            for _, values, tree in blocks:
+                outfile.write(values)
+                outfile.write(tree)
+
+            outfile.flush()
+            os.fsync(outfile.fileno())
+
+        os.replace(temp, path)
@@ -0,0 +1,155 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import contextlib
+import dataclasses
+import functools
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+import typing
+
+__all__ = ['Span', 'Tracer']
+
+
+@dataclasses.dataclass()
+class Span:
+    """A single timed section of the timeline."""
+    name: str
+    category: str
+    start: int  # Nanoseconds since the tracer's origin
+    thread: int
+    depth: int
+    duration: typing.Optional[int] = None
+    args: typing.Dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+
+    def to_data(self) -> dict:
+        return {
+            'name': self.name,
+            'category': self.category,
+            'start_ms': self.start / 1e6,
+            'duration_ms': None if self.duration is None else self.duration / 1e6,
+            'thread': self.thread,
+            'depth': self.depth,
+            'args': self.args
+        }
+
+    def to_trace_event(self, pid: int) -> dict:
+        return {
+            'name': self.name,
+            'cat': self.category,
+            'ph': 'X',
+            'ts': self.start / 1e3,
+            'dur': (self.duration or 0) / 1e3,
+            'pid': pid,
+            'tid': self.thread,
+            'args': self.args
+        }
+
+
+class Tracer:
+    """Records a timeline of named spans.  When the tracer is disabled, all
+    of its methods are effectively no-ops."""
+    LOGGER = logging.getLogger('core.tracer')
+
+    def __init__(self, *, enabled: bool = False):
+        self.enabled = enabled
+        self.spans: typing.List[Span] = []
+
+        self._origin = time.perf_counter_ns()
+        self._depth = threading.local()
+
+    # Recording methods
+    def begin(self, name: str, category: str = 'task', **args) -> typing.Optional[Span]:
+        """Starts a new span.  The returned span must be passed to `end` once
+        the section being timed has finished."""
+        if not self.enabled:
+            return None
+
+        depth = getattr(self._depth, 'value', 0)
+        span = Span(name, category, time.perf_counter_ns() - self._origin, threading.get_ident(), depth, args=args)
+
+        self._depth.value = depth + 1
+        self.spans.append(span)
+
+        return span
+
+    def end(self, span: typing.Optional[Span]):
+        """Ends a span previously returned by `begin`."""
+        if span is None or span.duration is not None:
+            return
+
+        span.duration = time.perf_counter_ns() - self._origin - span.start
+        self._depth.value = max(getattr(self._depth, 'value', 1) - 1, 0)
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = 'task', **args):
+        """Times the body of the `with` statement."""
+        s = self.begin(name, category, **args)
+
+        try:
+            yield s
+
+        finally:
+            self.end(s)
+
+    def wrap(self, name: str, func: typing.Callable, category: str = 'task') -> typing.Callable:
+        """Returns a callable that times every invocation of `func`."""
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.span(name, category):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    # Serialization methods
+    def to_data(self) -> dict:
+        """Returns the timeline as a structured, json serializable object."""
+        finished = [s for s in self.spans if s.duration is not None]
+
+        return {
+            'total_ms': max([(s.start + s.duration) / 1e6 for s in finished], default=0),
+            'spans': [s.to_data() for s in sorted(self.spans, key=lambda s: s.start)]
+        }
+
+    def to_chrome_trace(self) -> dict:
+        """Returns the timeline in Chrome's trace event format.  The resulting
+        file can be opened in chrome://tracing or Perfetto."""
+        pid = os.getpid()
+
+        return {
+            'displayTimeUnit': 'ms',
+            'traceEvents': [s.to_trace_event(pid) for s in self.spans if s.duration is not None]
+        }
+
+    def dump(self, directory: pathlib.Path, name: str) -> typing.Tuple[pathlib.Path, pathlib.Path]:
+        """Writes the timeline to `directory` as `{name}.json` and
+        `{name}.trace.json`."""
+        directory.mkdir(parents=True, exist_ok=True)
+
+        timeline = directory.joinpath(f'{name}.json')
+        trace = directory.joinpath(f'{name}.trace.json')
+
+        timeline.write_text(json.dumps(self.to_data(), indent=2), encoding='UTF-8')
+        trace.write_text(json.dumps(self.to_chrome_trace()), encoding='UTF-8')
+
+        self.LOGGER.info(f'Wrote {len(self.spans)} spans to {timeline!s} and {trace!s}')
+        return timeline, trace
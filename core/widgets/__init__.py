@@ -13,8 +13,30 @@ PARTICULAR PURPOSE.  See the GNU General Public License for more details.
 You should have received a copy of the GNU General Public License along with
 ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
-from .about import About
-from .client import Client
-from .info import Info
+import importlib
+import typing
 
-__all__ = ['Info', 'Client', 'About']
+if typing.TYPE_CHECKING:
+    from .about import About
+    from .client import Client
+    from .info import Info
+    from .webview import WebEngineHost, WebView
+
+__all__ = ['Info', 'Client', 'About', 'WebView', 'WebEngineHost']
+
+# Widgets are imported the first time they're used, so importing a single
+# module, like `core.widgets.webview`, doesn't import the client along with
+# every Qt module it needs.
+_MODULES = {'About': 'about', 'Client': 'client', 'Info': 'info', 'WebView': 'webview', 'WebEngineHost': 'webview'}
+
+
+def __getattr__(name: str):
+    module = _MODULES.get(name)
+
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    value = getattr(importlib.import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+
+    return value
@@ -15,9 +15,10 @@ ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
 import typing
 
-from PySide6 import QtCore, QtWebEngineWidgets, QtWidgets
+from PySide6 import QtCore, QtWidgets
 
 from QtUtilities import widgets
+from .webview import WebView
 
 
 class Chat(widgets.QPopoutCapable):
@@ -30,7 +31,7 @@ class Chat(widgets.QPopoutCapable):
         # Ui Attributes #
         self.central: typing.Optional[QtWidgets.QMainWindow] = None
         self.layout: typing.Optional[QtWidgets.QVBoxLayout] = None
-        self.display: typing.Optional[QtWebEngineWidgets.QWebEngineView] = None
+        self.display: typing.Optional[WebView] = None
         self.container: typing.Optional[QtWidgets.QWidget] = None
         self.input: typing.Optional[QtWidgets.QLineEdit] = None
         self.send: typing.Optional[QtWidgets.QPushButton] = None
@@ -50,7 +51,7 @@ class Chat(widgets.QPopoutCapable):
             self.setWidget(self.central)
 
         if self.display is None:
-            self.display = QtWebEngineWidgets.QWebEngineView()
+            self.display = WebView()
             self.display.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
 
             if self.layout.indexOf(self.display) == -1:
@@ -25,9 +25,13 @@
 import logging
 import typing
 
-from PyQt5 import QtCore, QtWidgets, QtGui, QtHelp, QtSql
+from PyQt5 import QtCore, QtWidgets, QtGui, QtHelp
 
-from core import commands, dataclassez
+from core import commands, dataclassez, eventlog
+from core.utils import SettingHandle
+from core.utils.client import ClientMixin
+from core.utils.database import Database
+from core.utils.persistence import SettingsStore
 from .uis import Client as ClientUi
 from .help import Help
 
@@ -36,7 +40,7 @@ from QtUtilities import requests, settings
 __all__ = ['Client']
 
 
-class Client(QtWidgets.QMainWindow):
+class Client(QtWidgets.QMainWindow, ClientMixin):
     """An open source, modular bot to help streamers interact with their audience."""
     LOGGER: typing.ClassVar[logging.Logger]
     """The base logger for the client.  Any logger that branches off of 'core'
@@ -110,6 +114,9 @@ class Client(QtWidgets.QMainWindow):
     base_theme: QtGui.QPalette
     help_engine: QtHelp.QHelpEngine
     command_manager: commands.Manager
-    database: QtSql.QSqlDatabase
+    database: Database
+    event_log: eventlog.EventLog
+    settings_store: typing.Optional[SettingsStore]
+    prefix: typing.Optional[SettingHandle]
     
     _settings_file: typing.Optional[QtCore.QFile]
@@ -15,7 +15,9 @@ ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
 import logging
 
-from PySide6 import QtCore, QtGui, QtWebEngineWidgets, QtWidgets
+from PySide6 import QtCore, QtGui, QtWidgets
+
+from .webview import WebView
 
 
 class Info(QtWidgets.QDialog):
@@ -30,7 +32,7 @@ class Info(QtWidgets.QDialog):
 
         self._stack = QtWidgets.QStackedWidget(parent=self)
         self._text_display = QtWidgets.QTextBrowser(parent=self)
-        self._web_display = QtWebEngineWidgets.QWebEngineView(parent=self)
+        self._web_display = WebView(parent=self)
 
         self._button_container = QtWidgets.QWidget(parent=self)
         self._positive_button = QtWidgets.QPushButton("OK", self._button_container)
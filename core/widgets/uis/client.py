@@ -30,7 +30,7 @@ import typing
 from PySide6 import QtCore, QtWidgets
 
 from QtUtilities.widgets import QTable
-from core.utils import enums
+from core.utils import Tracer, enums
 from core import dataclassez
 from ..chat import Chat
 
@@ -82,22 +82,27 @@ class Client:
     # Setup methods
     def setup(self, parent: QtWidgets.QMainWindow):
         """Sets up the client's UI"""
+        tracer: Tracer = QtWidgets.QApplication.instance().tracer
         parent.statusBar()
 
         # Menubar elements
-        self.setup_menubar(parent)
-        self.setup_file_menu()
-        self.setup_help_menu()
+        with tracer.span('menubar', 'widget'):
+            self.setup_menubar(parent)
+            self.setup_file_menu()
+            self.setup_help_menu()
 
         # Tabs
-        self.setup_central_widget(parent)
-        self.setup_central_tabs()
+        with tracer.span('central tabs', 'widget'):
+            self.setup_central_widget(parent)
+            self.setup_central_tabs()
 
         # Stream elements
-        self.setup_stream_tab()
+        with tracer.span('stream tab', 'widget'):
+            self.setup_stream_tab()
 
         # Extension elements
-        self.setup_extensions_tab()
+        with tracer.span('extensions tab', 'widget'):
+            self.setup_extensions_tab()
 
     def setup_central_widget(self, parent: QtWidgets.QMainWindow):
         """Sets up the client's UI elements."""
@@ -671,4 +676,4 @@ class Client:
         background = p.color(p.Active, p.Background)
         text = p.color(p.Active, p.Text)
 
-        self.stream_chat.display.page().setBackgroundColor(background)
+        self.stream_chat.display.set_background_color(background)
@@ -0,0 +1,218 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+import typing
+import weakref
+
+from PySide6 import QtCore, QtGui, QtWidgets
+
+if typing.TYPE_CHECKING:
+    from PySide6 import QtWebEngineCore, QtWebEngineWidgets
+
+__all__ = ['WebView', 'WebEngineHost']
+
+
+class WebEngineHost(QtCore.QObject):
+    """Owns the web engine profile shared by every `WebView`.  Once every view
+    has been hidden for `idle_timeout` milliseconds, the views' engines and the
+    profile are released.  A negative timeout disables releasing."""
+    LOGGER = logging.getLogger('core.webengine')
+    IDLE_TIMEOUT = 5 * 60 * 1000
+    OBJECT_NAME = 'shovelbot-web-engine-host'
+
+    _instance: typing.ClassVar[typing.Optional['WebEngineHost']] = None
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super(WebEngineHost, self).__init__(parent=parent)
+
+        self.views: typing.MutableSet['WebView'] = weakref.WeakSet()
+        self.idle_timeout = self.IDLE_TIMEOUT
+
+        self._profile: typing.Optional['QtWebEngineCore.QWebEngineProfile'] = None
+        self._idle_timer = QtCore.QTimer(parent=self)
+        self._idle_timer.setSingleShot(True)
+        self._idle_timer.timeout.connect(self.release)
+
+    @classmethod
+    def instance(cls) -> 'WebEngineHost':
+        """Returns the host shared by the application.  The host is looked
+        up by name, so it's still shared when this module is imported as both
+        `widgets.webview` and `core.widgets.webview`."""
+        if cls._instance is None:
+            app = QtCore.QCoreApplication.instance()
+            host = app.findChild(QtCore.QObject, cls.OBJECT_NAME, QtCore.Qt.FindDirectChildrenOnly)
+
+            if host is None:
+                host = cls(parent=app)
+                host.setObjectName(cls.OBJECT_NAME)
+
+            cls._instance = host
+
+        return cls._instance
+
+    def profile(self) -> 'QtWebEngineCore.QWebEngineProfile':
+        """Returns the shared profile, creating it if it was released."""
+        if self._profile is None:
+            from PySide6 import QtWebEngineCore
+
+            self.LOGGER.debug('Creating shared web engine profile...')
+            self._profile = QtWebEngineCore.QWebEngineProfile(parent=self)
+
+        return self._profile
+
+    def set_idle_timeout(self, milliseconds: int):
+        """Sets how long every view must be hidden before the engine is
+        released."""
+        self.idle_timeout = milliseconds
+        self.view_hidden()
+
+    # View slots
+    def view_shown(self):
+        """Invoked when a view is shown."""
+        self._idle_timer.stop()
+
+    def view_hidden(self):
+        """Invoked when a view is hidden."""
+        self._idle_timer.stop()
+
+        if self.idle_timeout < 0 or any(v.isVisible() for v in self.views):
+            return
+
+        if self._profile is not None or any(v.is_created() for v in self.views):
+            self._idle_timer.start(self.idle_timeout)
+
+    def release(self):
+        """Releases every hidden view's engine, and the shared profile if no
+        view still uses it."""
+        for view in list(self.views):
+            if not view.isVisible():
+                view.release()
+
+        if self._profile is not None and not any(v.is_created() for v in self.views):
+            self.LOGGER.debug('Releasing shared web engine profile...')
+            self._profile.deleteLater()
+            self._profile = None
+
+
+class WebView(QtWidgets.QWidget):
+    """A stand-in for QWebEngineView that only creates the engine the first
+    time it's shown.  Content set before then is applied once the engine
+    exists, and is restored if the engine is released and created again."""
+    urlChanged = QtCore.Signal(QtCore.QUrl)
+    loadFinished = QtCore.Signal(bool)
+
+    def __init__(self, parent: QtWidgets.QWidget = None):
+        super(WebView, self).__init__(parent=parent)
+
+        self._view: typing.Optional['QtWebEngineWidgets.QWebEngineView'] = None
+        self._html: typing.Optional[typing.Tuple[str, QtCore.QUrl]] = None
+        self._url: typing.Optional[QtCore.QUrl] = None
+        self._background: typing.Optional[QtGui.QColor] = None
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        WebEngineHost.instance().views.add(self)
+
+    # Engine methods
+    def is_created(self) -> bool:
+        """Whether or not the engine currently exists."""
+        return self._view is not None
+
+    def view(self) -> 'QtWebEngineWidgets.QWebEngineView':
+        """Returns the underlying QWebEngineView, creating it if necessary."""
+        if self._view is None:
+            from PySide6 import QtWebEngineCore, QtWebEngineWidgets
+
+            view = QtWebEngineWidgets.QWebEngineView(self)
+            view.setPage(QtWebEngineCore.QWebEnginePage(WebEngineHost.instance().profile(), view))
+            view.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+
+            view.urlChanged.connect(self._track_url)
+            view.urlChanged.connect(self.urlChanged.emit)
+            view.loadFinished.connect(self.loadFinished.emit)
+
+            self.layout().addWidget(view)
+            self._view = view
+
+            # Restore the view's content
+            if self._background is not None:
+                view.page().setBackgroundColor(self._background)
+
+            if self._html is not None:
+                view.setHtml(*self._html)
+
+            elif self._url is not None:
+                view.load(self._url)
+
+        return self._view
+
+    def release(self):
+        """Destroys the engine.  Its content will be restored the next time
+        the view is shown."""
+        if self._view is None:
+            return
+
+        self.layout().removeWidget(self._view)
+        self._view.deleteLater()
+        self._view = None
+
+    # Content methods
+    def setHtml(self, html: str, base_url: QtCore.QUrl = QtCore.QUrl()):
+        self._html = (html, base_url)
+        self._url = None
+
+        if self._view is not None:
+            self._view.setHtml(html, base_url)
+
+    def load(self, url: typing.Union[QtCore.QUrl, str]):
+        self._url = QtCore.QUrl(url)
+        self._html = None
+
+        if self._view is not None:
+            self._view.load(self._url)
+
+    def setUrl(self, url: typing.Union[QtCore.QUrl, str]):
+        self.load(url)
+
+    def url(self) -> QtCore.QUrl:
+        if self._view is not None:
+            return self._view.url()
+
+        return QtCore.QUrl(self._url) if self._url is not None else QtCore.QUrl()
+
+    def set_background_color(self, color: QtGui.QColor):
+        """Sets the background color of the view's page."""
+        self._background = QtGui.QColor(color)
+
+        if self._view is not None:
+            self._view.page().setBackgroundColor(self._background)
+
+    def _track_url(self, url: QtCore.QUrl):
+        if self._html is None:
+            self._url = url
+
+    # Events
+    def showEvent(self, event: QtGui.QShowEvent):
+        self.view()
+        WebEngineHost.instance().view_shown()
+
+        super(WebView, self).showEvent(event)
+
+    def hideEvent(self, event: QtGui.QHideEvent):
+        super(WebView, self).hideEvent(event)
+
+        WebEngineHost.instance().view_hidden()
@@ -13,17 +13,27 @@ PARTICULAR PURPOSE.  See the GNU General Public License for more details.
 You should have received a copy of the GNU General Public License along with
 ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
+import collections
+import functools
+import math
+import pathlib
 import typing
 
-from PySide2 import QtCore, QtWidgets, QtSql
+from PySide2 import QtCore, QtWidgets
+
 import commands
+from QtUtilities.widgets import progress
 from core import dataclassez
+from core.utils import enums
+from . import transfer
+from .storage import Quote, QuoteStore
+from .widget import QuotesWidget
 
 if typing.TYPE_CHECKING:
     from core.utils import custom
 
 
-__all__ = ['Quotes']
+__all__ = ['Quotes', 'Quote', 'QuoteStore', 'QuotesWidget']
 
 
 class Quotes(dataclassez.Extension):
@@ -45,13 +55,103 @@ class Quotes(dataclassez.Extension):
         super(Quotes, self).__post_init__(parent=parent)
 
         # Public attributes
-        self.database = QtSql.QSqlDatabase.addDatabase('QSQLITE')
+        self.database = self.client.database
+        self.store = QuoteStore(self.database)
+        self.widget: typing.Optional[QuotesWidget] = None
+
+    # Ui methods
+    def generate_dialog(self):
+        # There's nothing to display the widget on while running headless
+        if isinstance(QtCore.QCoreApplication.instance(), QtWidgets.QApplication):
+            self.widget = QuotesWidget(self)
+
+    # Transfer methods
+    def import_quotes(self, path: pathlib.Path, *, chunk_size: int = 1000):
+        """Imports the quotes in `path`, a CSV or JSON lines file, displaying
+        the import's progress."""
+        importer = transfer.Importer(self.database, chunk_size=chunk_size)
+        steps = importer.run(path)
+        estimate = transfer.count_records(path)
+
+        with progress.Context() as p:
+            for index in range(math.ceil(estimate / chunk_size)):
+                p.task(f'Importing quotes ({index * chunk_size}/{estimate})...', functools.partial(next, steps, None))
+
+            # Ensure nothing is left behind if the estimate was short
+            p.task('Finishing import...', functools.partial(collections.deque, steps, maxlen=0))
+
+            if self.widget is not None:
+                p.finished.connect(self.widget.update_count)
+
+    def export_quotes(self, path: pathlib.Path, *, chunk_size: int = 1000):
+        """Exports every quote to `path`, a CSV or JSON lines file,
+        displaying the export's progress."""
+        exporter = transfer.Exporter(self.database, chunk_size=chunk_size)
+        steps = exporter.run(path)
+        total = self.store.count()
+
+        with progress.Context() as p:
+            for index in range(math.ceil(total / chunk_size)):
+                p.task(f'Exporting quotes ({index * chunk_size}/{total})...', functools.partial(next, steps, None))
+
+            p.task('Finishing export...', functools.partial(collections.deque, steps, maxlen=0))
+
+    # Extension overrides
+    def setup(self):
+        """Sets up the Quotes extension."""
+        self.LOGGER.info(f'Setting up {self.DISPLAY_NAME}...')
+
+        self.store.create()
+        self.LOGGER.info(f'{self.store.count()} quotes available.')
+
+        self.set_state(enums.ExtensionStates.SET_UP)
 
     # Commands
     @commands.group(
         name='quotes',
-        description='The root command for quotes.',
+        description='Displays a random quote.',
         aliases=['quote']
     )
-    def quotes(self):
-        raise NotImplementedError
+    def quotes(self, ctx: commands.Context):
+        quote = self.store.random()
+        ctx.reply(str(quote) if quote is not None else 'There are no quotes yet!')
+
+    @quotes.command(
+        name='add',
+        description='Adds a new quote.  The quote can be attributed to someone with "author=name".',
+        usage='quote add <text> [author=name]'
+    )
+    def quote_add(self, ctx: commands.Context, *text: str, author: str = None):
+        if not text:
+            return ctx.reply('You need to specify what the quote says!')
+
+        quote = self.store.add(' '.join(text), author or '', ctx.invoker.username)
+        self.QUOTE_ADDED.emit(quote)
+
+        ctx.reply(f'Added quote #{quote.id}!')
+
+    @quotes.command(
+        name='get',
+        description='Displays the quote with the specified id.',
+        usage='quote get <id>'
+    )
+    def quote_get(self, ctx: commands.Context, quote_id: int):
+        quote = self.store.get(quote_id)
+        ctx.reply(str(quote) if quote is not None else f"Quote #{quote_id} doesn't exist!")
+
+    @quotes.command(
+        name='random',
+        description='Displays a random quote.'
+    )
+    def quote_random(self, ctx: commands.Context):
+        quote = self.store.random()
+        ctx.reply(str(quote) if quote is not None else 'There are no quotes yet!')
+
+    @quotes.command(
+        name='search',
+        description='Displays the quote that best matches the specified text.',
+        usage='quote search <text>'
+    )
+    def quote_search(self, ctx: commands.Context, *text: str):
+        quotes = self.store.search(' '.join(text), limit=1)
+        ctx.reply(str(quotes[0]) if quotes else 'No quotes matched your search!')
@@ -0,0 +1,173 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import dataclasses
+import random
+import time
+import typing
+
+if typing.TYPE_CHECKING:
+    from core.utils.database import Database
+
+__all__ = ['Quote', 'QuoteStore']
+
+
+@dataclasses.dataclass(frozen=True)
+class Quote:
+    """A single quote."""
+    id: int
+    text: str
+    author: str = ''
+    added_by: str = ''
+    added_at: int = 0  # Seconds since the epoch
+
+    def __str__(self):
+        return f'#{self.id}: "{self.text}"' + (f' - {self.author}' if self.author else '')
+
+
+class QuoteStore:
+    """Stores quotes in the client's database.
+
+    Quotes are indexed by an FTS5 table over their text and author, which is
+    kept in sync by triggers.  Random quotes are picked by sampling an id
+    between 1 and the largest id, then taking the first quote at or after it,
+    so picking one never scans the table.  Recently used quotes are kept in
+    a small LRU cache."""
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS quotes ('
+        '  id INTEGER PRIMARY KEY,'
+        '  text TEXT NOT NULL,'
+        "  author TEXT NOT NULL DEFAULT '',"
+        "  added_by TEXT NOT NULL DEFAULT '',"
+        '  added_at INTEGER NOT NULL'
+        ')',
+        'CREATE VIRTUAL TABLE IF NOT EXISTS quotes_fts USING fts5('
+        "  text, author, content='quotes', content_rowid='id'"
+        ')',
+        'CREATE TRIGGER IF NOT EXISTS quotes_ai AFTER INSERT ON quotes BEGIN'
+        '  INSERT INTO quotes_fts(rowid, text, author) VALUES (new.id, new.text, new.author);'
+        ' END',
+        'CREATE TRIGGER IF NOT EXISTS quotes_ad AFTER DELETE ON quotes BEGIN'
+        "  INSERT INTO quotes_fts(quotes_fts, rowid, text, author) VALUES ('delete', old.id, old.text, old.author);"
+        ' END',
+        'CREATE TRIGGER IF NOT EXISTS quotes_au AFTER UPDATE ON quotes BEGIN'
+        "  INSERT INTO quotes_fts(quotes_fts, rowid, text, author) VALUES ('delete', old.id, old.text, old.author);"
+        '  INSERT INTO quotes_fts(rowid, text, author) VALUES (new.id, new.text, new.author);'
+        ' END'
+    ]
+    COLUMNS = 'id, text, author, added_by, added_at'
+    INSERT = 'INSERT INTO quotes (text, author, added_by, added_at) VALUES (?, ?, ?, ?)'
+
+    def __init__(self, database: 'Database', *, cache_size: int = 256):
+        self.database = database
+        self.cache_size = cache_size
+
+        self._cache: typing.OrderedDict[int, Quote] = collections.OrderedDict()
+
+    # Schema methods
+    def create(self):
+        """Creates the quote tables, if they don't exist."""
+        with self.database.transaction():
+            for statement in self.SCHEMA:
+                self.database.execute(statement).finish()
+
+    # Cache methods
+    def _remember(self, quote: Quote) -> Quote:
+        self._cache[quote.id] = quote
+        self._cache.move_to_end(quote.id)
+
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+        return quote
+
+    def _rows(self, sql: str, *values) -> typing.List[Quote]:
+        query = self.database.execute(sql, *values)
+        quotes = []
+
+        while query.next():
+            quotes.append(Quote(*[query.value(i) for i in range(5)]))
+
+        query.finish()
+        return quotes
+
+    def _scalar(self, sql: str, *values) -> typing.Any:
+        query = self.database.execute(sql, *values)
+        value = query.value(0) if query.next() else None
+
+        query.finish()
+        return value
+
+    # Quote methods
+    def add(self, text: str, author: str = '', added_by: str = '') -> Quote:
+        """Adds a new quote."""
+        added_at = int(time.time())
+        query = self.database.execute(self.INSERT, text, author or '', added_by or '', added_at)
+
+        return self._remember(Quote(int(query.lastInsertId()), text, author or '', added_by or '', added_at))
+
+    def get(self, quote_id: int) -> typing.Optional[Quote]:
+        """Returns the quote with the id `quote_id`."""
+        quote = self._cache.get(quote_id)
+
+        if quote is not None:
+            self._cache.move_to_end(quote_id)
+            return quote
+
+        quotes = self._rows(f'SELECT {self.COLUMNS} FROM quotes WHERE id = ?', quote_id)
+        return self._remember(quotes[0]) if quotes else None
+
+    def remove(self, quote_id: int) -> bool:
+        """Removes the quote with the id `quote_id`.  Returns False if it
+        didn't exist."""
+        self._cache.pop(quote_id, None)
+        query = self.database.execute('DELETE FROM quotes WHERE id = ?', quote_id)
+
+        return query.numRowsAffected() > 0
+
+    def random(self) -> typing.Optional[Quote]:
+        """Returns a random quote.  Quotes that follow a gap left by removed
+        quotes are slightly more likely to be picked."""
+        largest = self._scalar('SELECT MAX(id) FROM quotes')
+
+        if not largest:
+            return None
+
+        quote_id = self._scalar('SELECT id FROM quotes WHERE id >= ? ORDER BY id LIMIT 1',
+                                random.randint(1, int(largest)))
+
+        return self.get(int(quote_id)) if quote_id is not None else None
+
+    def search(self, text: str, *, limit: int = 5) -> typing.List[Quote]:
+        """Returns the quotes whose text or author best match `text`."""
+        # Every term is quoted, so chat can't use FTS5's query syntax
+        terms = ' '.join('"{}"'.format(t.replace('"', '""')) for t in text.split())
+
+        if not terms:
+            return []
+
+        quotes = self._rows(
+            'SELECT q.id, q.text, q.author, q.added_by, q.added_at '
+            'FROM quotes_fts JOIN quotes q ON q.id = quotes_fts.rowid '
+            'WHERE quotes_fts MATCH ? ORDER BY rank LIMIT ?',
+            terms, limit
+        )
+
+        return [self._remember(q) for q in quotes]
+
+    def count(self) -> int:
+        """Returns the number of quotes."""
+        return int(self._scalar('SELECT COUNT(*) FROM quotes') or 0)
@@ -0,0 +1,215 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import csv
+import itertools
+import json
+import logging
+import pathlib
+import time
+import typing
+
+from .storage import QuoteStore
+
+if typing.TYPE_CHECKING:
+    from core.utils.database import Database
+
+__all__ = ['Importer', 'Exporter', 'FORMATS', 'count_records']
+
+LOGGER = logging.getLogger('extensions.quotes.transfer')
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+FIELDS = ['id', 'text', 'author', 'added_by', 'added_at']
+Row = typing.Tuple[str, str, str, int]  # text, author, added_by, added_at
+
+
+def file_format(path: pathlib.Path) -> str:
+    """Returns the format of `path`, based on its extension."""
+    try:
+        return FORMATS[path.suffix.lower()]
+
+    except KeyError:
+        raise ValueError(f'Unsupported quote file "{path.name}";  expected one of {", ".join(FORMATS)}') from None
+
+
+def count_records(path: pathlib.Path) -> int:
+    """Counts the records in `path` without parsing them.  For CSV files, this
+    assumes quotes don't span multiple lines, so it's only suitable for
+    progress estimates."""
+    with path.open('rb') as infile:
+        lines = sum(chunk.count(b'\n') for chunk in iter(lambda: infile.read(1 << 20), b''))
+
+    return max(lines - 1, 0) if file_format(path) == 'csv' else lines
+
+
+def _to_row(record: typing.Any) -> typing.Optional[Row]:
+    if not isinstance(record, dict):
+        return None
+
+    # Other bots name their columns differently
+    text = record.get('text') or record.get('quote') or record.get('message')
+
+    if not text:
+        return None
+
+    try:
+        added_at = int(float(record.get('added_at') or record.get('timestamp') or 0))
+
+    except (TypeError, ValueError):
+        added_at = 0
+
+    return (str(text), str(record.get('author') or ''), str(record.get('added_by') or record.get('user') or ''),
+            added_at or int(time.time()))
+
+
+def read_records(path: pathlib.Path) -> typing.Iterator[typing.Optional[dict]]:
+    """Yields every record in `path` one at a time.  Records that can't be
+    decoded, or aren't objects, are yielded as None so they can be counted."""
+    with path.open(encoding='UTF-8', newline='') as infile:
+        if file_format(path) == 'csv':
+            yield from csv.DictReader(infile)
+            return
+
+        for number, line in enumerate(infile, start=1):
+            if not line.strip():
+                continue
+
+            try:
+                record = json.loads(line)
+
+            except ValueError:
+                record = None
+
+            if not isinstance(record, dict):
+                LOGGER.warning(f'Skipping malformed record on line {number} of {path.name}!')
+                record = None
+
+            yield record
+
+
+class Importer:
+    """Imports quotes from CSV or JSON lines files.
+
+    Files are read a chunk at a time, and each chunk is inserted inside its
+    own transaction with a single prepared statement, so importing never
+    requires the whole file to be in memory.  Records that are malformed,
+    or don't contain a quote, are skipped and counted in `skipped`."""
+
+    def __init__(self, database: 'Database', *, chunk_size: int = 1000):
+        self.database = database
+        self.chunk_size = chunk_size
+        self.skipped = 0
+
+    def rows(self, path: pathlib.Path) -> typing.Iterator[Row]:
+        """Yields the row for every valid record in `path`."""
+        for record in read_records(path):
+            row = _to_row(record)
+
+            if row is None:
+                self.skipped += 1
+
+            else:
+                yield row
+
+    def chunks(self, path: pathlib.Path) -> typing.Iterator[typing.List[Row]]:
+        """Yields the rows in `path` in chunks of `chunk_size`."""
+        rows = self.rows(path)
+
+        while True:
+            chunk = list(itertools.islice(rows, self.chunk_size))
+
+            if not chunk:
+                return
+
+            yield chunk
+
+    def insert(self, rows: typing.List[Row]) -> int:
+        """Inserts a chunk of rows in a single transaction."""
+        with self.database.transaction():
+            for row in rows:
+                self.database.execute(QuoteStore.INSERT, *row)
+
+        return len(rows)
+
+    def run(self, path: pathlib.Path) -> typing.Iterator[int]:
+        """Imports every quote in `path`, yielding the running total after
+        each chunk was inserted."""
+        total = 0
+        self.skipped = 0
+
+        for chunk in self.chunks(path):
+            total += self.insert(chunk)
+            yield total
+
+        LOGGER.info(f'Imported {total} quotes from {path.name}')
+
+        if self.skipped:
+            LOGGER.warning(f'Skipped {self.skipped} records in {path.name} that were malformed or had no quote!')
+
+
+class Exporter:
+    """Exports quotes to CSV or JSON lines files.
+
+    Quotes are read a chunk at a time in id order, starting after the last
+    id of the previous chunk, so exporting never requires every quote to be
+    in memory."""
+
+    def __init__(self, database: 'Database', *, chunk_size: int = 1000):
+        self.database = database
+        self.chunk_size = chunk_size
+
+    def chunks(self) -> typing.Iterator[typing.List[tuple]]:
+        """Yields every quote in chunks of `chunk_size`."""
+        last = 0
+
+        while True:
+            query = self.database.execute(
+                f'SELECT {QuoteStore.COLUMNS} FROM quotes WHERE id > ? ORDER BY id LIMIT ?', last, self.chunk_size
+            )
+            chunk = []
+
+            while query.next():
+                chunk.append(tuple(query.value(i) for i in range(len(FIELDS))))
+
+            query.finish()
+
+            if not chunk:
+                return
+
+            last = chunk[-1][0]
+            yield chunk
+
+    def run(self, path: pathlib.Path) -> typing.Iterator[int]:
+        """Exports every quote to `path`, yielding the running total after
+        each chunk was written."""
+        fmt = file_format(path)
+        total = 0
+
+        with path.open('w', encoding='UTF-8', newline='') as outfile:
+            writer = csv.writer(outfile) if fmt == 'csv' else None
+
+            if writer is not None:
+                writer.writerow(FIELDS)
+
+            for chunk in self.chunks():
+                if writer is not None:
+                    writer.writerows(chunk)
+
+                else:
+                    outfile.writelines(json.dumps(dict(zip(FIELDS, row))) + '\n' for row in chunk)
+
+                total += len(chunk)
+                yield total
+
+        LOGGER.info(f'Exported {total} quotes to {path.name}')
@@ -0,0 +1,76 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import pathlib
+import typing
+
+from PySide2 import QtWidgets
+
+from .transfer import FORMATS
+
+if typing.TYPE_CHECKING:
+    from . import Quotes
+
+__all__ = ['QuotesWidget']
+
+
+class QuotesWidget(QtWidgets.QWidget):
+    """The display for the Quotes extension."""
+
+    def __init__(self, extension: 'Quotes', parent: QtWidgets.QWidget = None):
+        super(QuotesWidget, self).__init__(parent=parent)
+
+        self.extension = extension
+        self.count_label = QtWidgets.QLabel()
+        self.import_button = QtWidgets.QPushButton('Import...')
+        self.export_button = QtWidgets.QPushButton('Export...')
+
+        buttons = QtWidgets.QHBoxLayout()
+        buttons.addWidget(self.import_button)
+        buttons.addWidget(self.export_button)
+
+        layout = QtWidgets.QVBoxLayout(self)
+        layout.addWidget(self.count_label)
+        layout.addLayout(buttons)
+
+        self.import_button.clicked.connect(self.request_import)
+        self.export_button.clicked.connect(self.request_export)
+
+        self.setWindowTitle(extension.DISPLAY_NAME)
+
+    @property
+    def file_filter(self) -> str:
+        return 'Quote files ({})'.format(' '.join(f'*{s}' for s in FORMATS))
+
+    def update_count(self):
+        self.count_label.setText(f'{self.extension.store.count()} quotes')
+
+    # Slots
+    def request_import(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, 'Import quotes', '', self.file_filter)
+
+        if path:
+            self.extension.import_quotes(pathlib.Path(path))
+
+    def request_export(self):
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Export quotes', 'quotes.csv', self.file_filter)
+
+        if path:
+            self.extension.export_quotes(pathlib.Path(path))
+
+    # Events
+    def showEvent(self, event):
+        self.update_count()
+        super(QuotesWidget, self).showEvent(event)
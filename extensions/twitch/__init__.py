@@ -15,15 +15,22 @@ ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
 import inspect
 import typing
-from typing import Dict, List, Tuple
 
 from PySide2 import QtCore, QtGui, QtWidgets
 
-from QtTwitch import gateway, http, parser
+from QtTwitch import http, parser
 from QtUtilities import settings as qsettings
 from core import dataclassez
-from core.utils import enums as core_enums
+from core.utils import SettingHandle, enums as core_enums
 from . import dataclasses as twitch_dataclasses, enums as twitch_enums
+from .audience import AudienceStore, AudienceSync
+from .badges import BadgeCache
+from .eventsub import EventSub
+from .helix import Helix
+from .outbound import OutboundScheduler
+from .pool import GatewayPool
+from .scopes import ScopeRegistry
+from .validation import TokenValidator, Validation as TokenValidation
 from .settings import converters
 
 __all__ = ['Twitch']
@@ -41,6 +48,8 @@ class Twitch(dataclassez.Platform, dataclassez.Modifier):
     WEBSITE = QtCore.QUrl('https://github.com/sirrandoo/twitch-for-shovelbot')
     DOCUMENTATION = QtCore.QUrl('https://sirrandoo.github.io/projects/twitch-for-shovelbot')
 
+    DEFAULT_PORT = 6667  # The port used when the "server" setting doesn't have one
+
     def __post_init__(self, parent: QtCore.QObject = None):
         # Super Call #
         super(Twitch, self).__post_init__(parent=parent)
@@ -49,105 +58,138 @@ class Twitch(dataclassez.Platform, dataclassez.Modifier):
         # noinspection PyTypeChecker
 
         # Public attributes
-        self.irc = gateway.Gateway()
+        self.irc = GatewayPool(parent=self)
         self.http: typing.Optional[http.Http] = None
-
-        # Internal attributes
-        self._scopes: Dict[str, List[Tuple[twitch_enums.Scopes, str]]] = {}
-        self._scope_timer: QtCore.QTimer = QtCore.QTimer(parent=self)
+        self.helix: typing.Optional[Helix] = None
+        self.audience: typing.Optional[AudienceSync] = None
+        self.eventsub: typing.Optional[EventSub] = None
+        self.validator: typing.Optional[TokenValidator] = None
+        self.outbound = OutboundScheduler(lambda c, m: self.irc.send_priv_message(c, m), parent=self)
+        self.scope_registry = ScopeRegistry(parent=self)
+        self.badges = BadgeCache()
+
+        self.channel: typing.Optional[SettingHandle] = None
+        self.token: typing.Optional[SettingHandle] = None
+        self.client_id: typing.Optional[SettingHandle] = None
+        self.server: typing.Optional[SettingHandle] = None
 
         # Stitching
         self.client.aboutToStart.connect(self.prepare_connection)
         self.client.aboutToStop.connect(self.destroy_connection)
         self.irc.on_message.connect(self.transform_message)
+        self.scope_registry.authorizationRequired.connect(self.request_authorization)
         # self.irc.on_message.connect(functools.partial(print, 'IRC DEBUG >'))
 
     # Token methods
     def process_token(self):
         """Handles new tokens."""
 
+    def request_authorization(self, missing: int):
+        """Invoked when extensions registered scopes the current token
+        wasn't granted.  The scopes every extension needs are preselected the
+        next time the user generates a token."""
+        for scope, reasons in self.scope_registry.reasons(missing).items():
+            self.LOGGER.warning(f'The Twitch token is missing the {scope.value} scope, needed by {", ".join(reasons)}')
+
+        requested = self.scope_registry.union | self.scope_registry.granted
+        self.token.node.data['requested_scopes'] = [s.value for s in twitch_enums.Scopes.unpack(requested)]
+
     # Connection methods
+    def server_address(self) -> typing.Optional[typing.Tuple[str, int]]:
+        """Returns the host and port of the "server" setting, or None if the
+        bot should connect to Twitch."""
+        server = (self.server.value or '').strip()
+
+        if not server:
+            return None
+
+        host, separator, port = server.rpartition(':')
+
+        if not separator or (':' in host and not host.endswith(']')):
+            return server.strip('[]'), self.DEFAULT_PORT  # No port, or a bare IPv6 address
+
+        if not host:
+            self.LOGGER.warning(f'The IRC server "{server}" is missing a host;  connecting to Twitch instead.')
+            return None
+
+        try:
+            number = int(port)
+
+        except ValueError:
+            number = 0
+
+        if not 0 < number < 65536:
+            self.LOGGER.warning(f'The IRC server "{server}" has an invalid port;  using {self.DEFAULT_PORT} instead.')
+            number = self.DEFAULT_PORT
+
+        return host.strip('[]'), number
+
     def prepare_connection(self):
-        """Prepares the IRC connection to Twitch's servers."""
+        """Prepares the IRC connections to Twitch's servers."""
         self.LOGGER.info("Preparing connection to Twitch's IRC servers...")
-        channel = self.client.settings['extensions']['twitch']['channel'].value
 
         if not self.irc.is_connected():
-            self.irc.channels.clear()
+            address = self.server_address()
+
+            if address is not None:
+                host, port = address
 
-            if channel:
-                self.irc.channels = [channel]
+                self.LOGGER.info(f'Establishing connection to {host}:{port}...')
+                self.irc.connect(host, port)
 
-            self.LOGGER.info('Establishing connection...')
-            self.irc.connect()
+            else:
+                self.LOGGER.info('Establishing connection...')
+                self.irc.connect()
 
         else:
             self.LOGGER.warning("Already connected to Twitch's IRC servers!")
 
-            if channel:
-                self.LOGGER.warning('Leaving all channels...')
-
-                for c in [c for c in self.irc.channels if c.lower() != channel.lower()]:
-                    self.irc.part(c)
-
-                if channel.lower() not in self.irc.channels:
-                    self.LOGGER.info(f'Connecting to #{channel}...')
-                    self.irc.join(channel)
+        channels = self.channels()
+        self.LOGGER.info(f'Joining {len(channels)} channels...')
+        self.irc.set_channels(channels)
 
     def destroy_connection(self):
-        """Destroys the connection to Twitch's IRC servers."""
+        """Destroys the connections to Twitch's IRC servers."""
         if self.irc.is_connected():
             self.LOGGER.warning("Disconnecting from Twitch's IRC servers...")
 
             self.irc.disconnect()
-            self.irc.channels.clear()
 
-    def send_message(self, message: str):
-        """Sends a message to Twitch's IR servers."""
-        self.irc.send_priv_message(self.client.settings['extensions']['twitch']['channel'].value, message)
+        self.irc.supervisor.dump()
+        self.outbound.dump()
+        self.outbound.clear()
 
-    # Generator methods
-    def register_scope(self, extension_name: str, scope: str, reason: str = None):
-        """Registers `scope` to `extension_name` for `reason`.  This method
-        automatically prompts the user to authorize your scopes.  If the user
-        accepts, they will be redirected to the OAuth flow again."""
-        # Conversion
-        s = twitch_enums.Scopes(scope)
-
-        # Validation
-        if extension_name not in self._scopes:
-            self._scopes[extension_name] = []
+    def channels(self) -> typing.List[str]:
+        """Returns the channels the bot should be in.  The first channel is
+        the bot's primary channel."""
+        return [c.lstrip('#') for c in self.channel.value.replace(',', ' ').split()]
 
-        # Insertion
-        self._scopes[extension_name].append((s, reason))
+    def send_message(self, message: str, priority: twitch_enums.Priority = twitch_enums.Priority.REPLY, *,
+                     channel: str = None):
+        """Sends a message to `channel`, or the primary channel if one isn't
+        passed.  Messages are queued while the account is being rate limited;
+        moderation messages are sent before command replies, and command
+        replies before timers."""
+        if channel is None:
+            channels = self.channels()
 
-        # Timer refresh
-        if self._scope_timer.isActive():
-            self._scope_timer.stop()
+            if not channels:
+                return self.LOGGER.warning('Cannot send a message without a channel!')
 
-        self._scope_timer.start(5 * 1000)  # Inform the user after 5 seconds
-
-    def unregister_scope(self, extension_name: str, scope: str):
-        """Unregisters `scope` from `extension_name`.  This method automatically
-        prompts the user to generate a new token without the scope specified.
-        If the user accepts, they will be redirected to the OAuth flow again."""
-        # Conversion
-        s = twitch_enums.Scopes(scope)
+            channel = channels[0]
 
-        # Validation
-        if extension_name not in self._scopes:
-            self._scopes[extension_name] = []
+        self.outbound.send(channel, message, priority)
 
-        for index, scope, reason in enumerate(self._scopes[extension_name].copy()):
-            if s.name == scope.name:
-                self._scopes[extension_name].pop(index)
-                break
-
-        # Timer refresh
-        if self._scope_timer.isActive():
-            self._scope_timer.stop()
+    # Generator methods
+    def register_scope(self, extension_name: str, scope: str, reason: str = None):
+        """Registers `scope` to `extension_name` for `reason`.  If the current
+        token wasn't granted the scope, the user is prompted to authorize it
+        once the current batch of registrations is finished."""
+        self.scope_registry.register(extension_name, scope, reason)
 
-        self._scope_timer.start(5 * 1000)  # Inform the user after 5 seconds
+    def unregister_scope(self, extension_name: str, scope: str):
+        """Unregisters `scope` from `extension_name`."""
+        self.scope_registry.unregister(extension_name, scope)
 
     # Settings methods
     def register_converters(self):
@@ -196,15 +238,27 @@ class Twitch(dataclassez.Platform, dataclassez.Modifier):
 
     def stitch_settings(self):
         """Stitches the settings' signals to their respective slots."""
+        # Handles
+        self.channel = self.client.setting_handle('extensions/twitch/channel')
+        self.token = self.client.setting_handle('extensions/twitch/token')
+        self.client_id = self.client.setting_handle('extensions/twitch/client_id')
+        self.server = self.client.setting_handle('extensions/twitch/server')
+
         # Account settings
-        self.client.settings['extensions']['twitch']['token'].value_changed.connect(self.TOKEN_CHANGED.emit)
+        self.token.node.value_changed.connect(self.TOKEN_CHANGED.emit)
 
-        self.client.settings['extensions']['twitch']['token'].value_changed.connect(self.sync_settings)
-        self.client.settings['extensions']['twitch']['client_id'].value_changed.connect(self.sync_settings)
-        self.client.settings['extensions']['twitch']['channel'].value_changed.connect(self.sync_settings)
+        self.token.node.value_changed.connect(self.sync_settings)
+        self.client_id.node.value_changed.connect(self.sync_settings)
+        self.channel.node.value_changed.connect(self.sync_settings)
 
     def validate_settings(self):
         """Validates the extension's settings."""
+        twitch = self.client.settings['extensions']['twitch']
+
+        for setting in self.generate_settings():
+            if setting.key not in twitch:
+                self.LOGGER.warning(f'Setting "{setting.key}" does not exist!  Adding default...')
+                twitch.add_child(setting)
 
     @staticmethod
     def generate_settings() -> typing.List[qsettings.Setting]:
@@ -214,11 +268,17 @@ class Twitch(dataclassez.Platform, dataclassez.Modifier):
             # Settings
             'client_id': qsettings.Setting('client_id', '', display_name='Client ID',
                                            tooltip='The client id the Twitch extension will use for API requests.'),
-            'channel': qsettings.Setting('channel', '', tooltip='The channel to connect to.'),
+            'channel': qsettings.Setting('channel', '', display_name='Channels',
+                                         tooltip='The channels to connect to, separated by commas.  Messages '
+                                                 'without a channel are sent to the first one.'),
 
             'token': qsettings.Setting('token', '', converter='twitch.token',
                                        tooltip="The OAuth token to connect to chat with.  If one isn't provided, "
-                                               "the bot will connect anonymously.")
+                                               "the bot will connect anonymously."),
+            'server': qsettings.Setting('server', '', display_name='IRC Server',
+                                        tooltip="The host:port of the IRC server to connect to, like the stand-in "
+                                                "bundled in extensions.twitch.standin.  The port defaults to 6667.  "
+                                                "If a server isn't provided, the bot will connect to Twitch.")
         }
 
         # Return values
@@ -231,7 +291,7 @@ class Twitch(dataclassez.Platform, dataclassez.Modifier):
         # Set the setting's internals to the new token
         self.client.settings['extensions']['twitch']['account']['token'].set_value(token.data)
         self.client.settings['extensions']['twitch']['account']['token'].data['scopes'] = [s.value for s in
-                                                                                           token.scopes]
+                                                                                           token.scope_list()]
 
         # Set the QLineEdit's text to the token
         try:
@@ -255,91 +315,109 @@ class Twitch(dataclassez.Platform, dataclassez.Modifier):
 
     # Slots
     def sync_settings(self):
-        """Syncs setting changes with objects the Twitch extension uses."""
-        channel = self.client.settings['extensions']['twitch']['channel'].value
-        token = self.client.settings['extensions']['twitch']['token'].value
-        login = None
+        """Syncs setting changes with objects the Twitch extension uses.
+        Tokens are validated asynchronously;  the IRC credentials are updated
+        once the validation finishes."""
+        token = self.token.value
 
         self.http.token = token
-        self.http.client_id = self.client.settings['extensions']['twitch']['client_id'].value
+        self.http.client_id = self.client_id.value
+        self.helix.set_credentials(self.client_id.value, token)
 
-        if token is not None and token != '':
-            response = self.http.validate_token(token)
-            login = response['login']
-            self.client.settings['extensions']['twitch']['token'].data['scopes'] = response.get('scopes', [])
+        if token:
+            self.validator.validate(token)
 
-            # Set the QLineEdit's text to the token
-            # TODO: This could potentially cause issues with process_token
-            try:
-                view = self.client.settings.view['extensions/twitch/token']
+        else:
+            self.audience.stop()
+            self.eventsub.set_broadcaster(None)
+            self.update_credentials('justinfan3892', 'foobar')
 
-            except KeyError:
-                self.LOGGER.warning("The settings dialog hasn't been set up yet!")
-                raise LookupError("The settings dialog hasn't been set up yet!")
+        if self.irc.is_connected():
+            self.irc.set_channels(self.channels())
 
-            else:
-                if view.display is None or view.display.layout() is None:
-                    self.LOGGER.warning("The token setting's display hasn't been set up yet!")
-                    raise LookupError(f"The token setting's display hasn't been set up yet!")
+    def token_validated(self, token: str, validation: TokenValidation):
+        """Invoked when a token was validated."""
+        if token != self.token.value:
+            return  # The token changed while it was being validated
+
+        self.token.node.data['scopes'] = list(validation.scopes)
+        self.scope_registry.set_granted(twitch_enums.Scopes.pack(validation.scopes))
+
+        # Set the token's tooltip to its scopes
+        # TODO: This could potentially cause issues with process_token
+        try:
+            view = self.client.settings.view['extensions/twitch/token']
+
+        except KeyError:
+            self.LOGGER.debug("The settings dialog hasn't been set up yet!")
 
+        else:
+            if view.display is not None and view.display.layout() is not None:
                 for child in view.display.layout().children():
                     if isinstance(child, QtWidgets.QLineEdit):
-                        child.setToolTip('Current scopes: {}'.format(', '.join(response.get('scopes', []))))
+                        child.setToolTip('Current scopes: {}'.format(', '.join(validation.scopes)))
                         break
 
-            finally:
-                self.process_token()
+        self.update_credentials(validation.login, token)
+        self.audience.start(validation.user_id, self.scope_registry.granted)
+        self.eventsub.set_broadcaster(validation.user_id)
+        self.process_token()
 
-        elif token == '':
-            login = 'justinfan3892'
-            token = 'foobar'
+    def token_invalidated(self, token: str, reason: str):
+        """Invoked when Twitch rejected a token."""
+        if token == self.token.value:
+            self.LOGGER.warning(f'The Twitch token is no longer valid!  Reason: {reason}')
 
-        if self.irc.nick.lower() != login.lower() or self.irc.token != token.lower():
-            self.irc.set_credentials(login, token)
+    def update_credentials(self, login: str, token: str):
+        """Sets the IRC credentials.  Connections are only restarted if the
+        credentials changed."""
+        if self.irc.nick.lower() == login.lower() and self.irc.token == token:
+            return
 
-        if self.irc.is_connected() and channel.lower() not in self.irc.channels:
-            # Leave every channel the client is currently in
-            # The client should only ever be in one channel.
-            for c in self.irc.channels:
-                self.irc.part(c)
+        self.irc.set_credentials(login, token)
 
-            # Join the new channel
-            if channel:
-                self.irc.join(channel)
+        if self.irc.is_connected():
+            self.LOGGER.info('IRC credentials changed;  reconnecting...')
+            self.irc.restart('the credentials changed')
 
     def transform_message(self, message: str):
         """Transform a QtTwitch message string into a Message dataclass."""
-        print(message.strip())
         m = parser.Parser.PATTERN.match(message.strip())
 
         if not m:
             return self.LOGGER.warning(f'Could not parse message "{message}"')
 
         components = m.groupdict()
+        tags = {}
 
-        if components['command'] == 'PRIVMSG':
-            tags = {}
+        if components.get('tags'):
+            for segment in components['tags'].split(';'):
+                parts = segment.split('=')
 
-            if 'tags' in components:
-                for segment in components['tags'].split(';'):
-                    parts = segment.split('=')
+                try:
+                    tags[parts[0]] = parts[1]
 
-                    try:
-                        tags[parts[0]] = parts[1]
+                except IndexError:
+                    tags[parts[0]] = ""
 
-                    except IndexError:
-                        tags[parts[0]] = ""
+        if components['command'] == 'USERSTATE':
+            # Sent when the bot joins a channel or sends a message;  it
+            # describes the bot's own badges in that channel.
+            channel = components['params'].split(' ')[0].lstrip('#')
+            roles = self.badges.roles(channel, self.irc.nick, tags.get('badges', ''))
+            moderator = core_enums.Roles.MODERATOR | core_enums.Roles.BROADCASTER
+            self.outbound.set_moderator(channel, roles & moderator != 0)
 
+        elif components['command'] == 'PRIVMSG':
             username = components['prefix'].split('!')[0]
             display_name = tags.get('display-name', username.title())
             color = QtGui.QColor(tags.get('color', '#262626'))
-            badge_str = tags.get('badges', '')
-
-            mod = 'moderator' in badge_str or 'global_mod' in badge_str or 'staff' in badge_str \
-                  or 'broadcaster' in badge_str or 'admin' in badge_str
+            channel, _, content = components['params'].partition(' ')
+            roles = self.badges.roles(channel.lstrip('#'), tags.get('user-id') or username, tags.get('badges', ''))
 
-            user = dataclassez.User(username, display_name, color, mod)
-            message = dataclassez.Message(components['params'].split(' ')[-1].lstrip(':'), user)
+            user = dataclassez.User(username, display_name, color, roles & core_enums.Roles.MODERATION != 0, roles)
+            message = dataclassez.Message(content[1:] if content.startswith(':') else content, user,
+                                          channel.lstrip('#'))
 
             self.onMessage.emit(message)
 
@@ -354,15 +432,37 @@ class Twitch(dataclassez.Platform, dataclassez.Modifier):
         # Register settings
         self.register_settings()
 
+        # Register the scopes the bot needs to chat
+        self.register_scope(self.NAME, twitch_enums.Scopes.READ_CHAT.value, 'Reading chat')
+        self.register_scope(self.NAME, twitch_enums.Scopes.EDIT_CHAT.value, 'Sending messages')
+
         # noinspection PyAttributeOutsideInit
-        self.http = http.Http(self.client.settings['extensions']['twitch']['client_id'].value,
+        self.http = http.Http(self.client_id.value,
                               factory=self.client.request_factory)
 
+        manager = QtCore.QCoreApplication.instance().network_access_manager
+        self.helix = Helix(manager, parent=self)
+        self.validator = TokenValidator(manager, parent=self)
+
+        store = AudienceStore(self.client.database)
+        store.create()
+        self.audience = AudienceSync(self.helix, store, parent=self)
+        self.eventsub = EventSub(self.helix, parent=self)
+
+        self.validator.validated.connect(self.token_validated)
+        self.validator.invalidated.connect(self.token_invalidated)
+        self.sync_settings()
+
         # Mark the Twitch extension as set up
         self.set_state(core_enums.ExtensionStates.SET_UP)
 
     def teardown(self):
         """Tears down the Twitch extension."""
+        if self.eventsub is not None:
+            self.eventsub.close()
+
+        if self.audience is not None:
+            self.audience.stop()
 
     # Modifier overrides
     def should_modify(self, platform: dataclassez.Platform) -> bool:
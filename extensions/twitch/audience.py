@@ -0,0 +1,233 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import dataclasses
+import functools
+import logging
+import time
+import typing
+
+from PySide2 import QtCore
+
+from core.utils.intset import IntSet
+from .enums import Audiences, Scopes
+from .helix import Helix
+
+if typing.TYPE_CHECKING:
+    from core.utils.database import Database
+
+__all__ = ['AudienceStore', 'AudienceSync', 'Diff']
+
+
+@dataclasses.dataclass(frozen=True)
+class Diff:
+    """The changes to an audience since it was last synced."""
+    audience: Audiences
+    broadcaster_id: int
+    added: typing.Tuple[int, ...]
+    removed: typing.Tuple[int, ...]
+    total: int
+    seconds: float
+
+
+@dataclasses.dataclass()
+class _Run:
+    audience: Audiences
+    broadcaster_id: int
+    previous: IntSet
+    current: IntSet = dataclasses.field(default_factory=IntSet)
+    added: typing.List[int] = dataclasses.field(default_factory=list)
+    started: float = dataclasses.field(default_factory=time.perf_counter)
+
+
+class AudienceStore:
+    """Stores the last synced snapshot of each audience in the client's
+    database.  Only members that joined or left an audience are written."""
+    SCHEMA = [
+        'CREATE TABLE IF NOT EXISTS twitch_audience ('
+        '  audience TEXT NOT NULL,'
+        '  broadcaster_id INTEGER NOT NULL,'
+        '  user_id INTEGER NOT NULL,'
+        '  login TEXT NOT NULL,'
+        "  detail TEXT NOT NULL DEFAULT '',"  # When the user followed, or their subscription tier
+        '  PRIMARY KEY (audience, broadcaster_id, user_id)'
+        ') WITHOUT ROWID'
+    ]
+    UPSERT = ('INSERT OR REPLACE INTO twitch_audience (audience, broadcaster_id, user_id, login, detail) '
+              'VALUES (?, ?, ?, ?, ?)')
+    DELETE = 'DELETE FROM twitch_audience WHERE audience = ? AND broadcaster_id = ? AND user_id = ?'
+
+    def __init__(self, database: 'Database'):
+        self.database = database
+
+    def create(self):
+        """Creates the audience table, if it doesn't exist."""
+        with self.database.transaction():
+            for statement in self.SCHEMA:
+                self.database.execute(statement).finish()
+
+    def load(self, audience: Audiences, broadcaster_id: int) -> IntSet:
+        """Returns the ids of every member of the last snapshot of
+        `audience`."""
+        query = self.database.execute('SELECT user_id FROM twitch_audience WHERE audience = ? AND broadcaster_id = ?',
+                                      audience.value, broadcaster_id)
+        members = IntSet()
+
+        while query.next():
+            members.add(int(query.value(0)))
+
+        query.finish()
+        return members
+
+    def add(self, audience: Audiences, broadcaster_id: int, rows: typing.Iterable[typing.Tuple[int, str, str]]):
+        """Adds `(user id, login, detail)` rows to a snapshot."""
+        with self.database.transaction():
+            for user_id, login, detail in rows:
+                self.database.execute(self.UPSERT, audience.value, broadcaster_id, user_id, login, detail)
+
+    def remove(self, audience: Audiences, broadcaster_id: int, user_ids: typing.Iterable[int]):
+        """Removes users from a snapshot."""
+        with self.database.transaction():
+            for user_id in user_ids:
+                self.database.execute(self.DELETE, audience.value, broadcaster_id, user_id)
+
+
+class AudienceSync(QtCore.QObject):
+    """Periodically syncs a broadcaster's followers and subscribers.
+
+    Each sync streams the audience from Helix one page at a time.  Users that
+    aren't in the previous snapshot are written as their page arrives, and
+    users missing from the new snapshot are removed once the last page has
+    been read.  The current snapshot of each audience is kept in memory as an
+    `IntSet`, so membership checks don't touch the database."""
+    LOGGER = logging.getLogger('extensions.twitch.audience')
+    INTERVAL = 10 * 60 * 1000
+
+    # audience: (endpoint, required scope, detail field)
+    ENDPOINTS = {
+        Audiences.FOLLOWERS: ('channels/followers', Scopes.READ_FOLLOWERS, 'followed_at'),
+        Audiences.SUBSCRIBERS: ('subscriptions', Scopes.READ_CHANNEL_SUBSCRIPTIONS, 'tier')
+    }
+
+    synced = QtCore.Signal(object)  # Diff
+
+    def __init__(self, helix: Helix, store: AudienceStore, parent: QtCore.QObject = None):
+        super(AudienceSync, self).__init__(parent=parent)
+
+        self.helix = helix
+        self.store = store
+        self.broadcaster_id: typing.Optional[int] = None
+        self.members: typing.Dict[Audiences, IntSet] = {}
+
+        self._runs: typing.Dict[Audiences, _Run] = {}
+        self._timer = QtCore.QTimer(parent=self)
+        self._timer.setInterval(self.INTERVAL)
+        self._timer.timeout.connect(self.sync_all)
+
+    # Membership methods
+    def is_follower(self, user_id: typing.Union[int, str]) -> bool:
+        return int(user_id) in self.members.get(Audiences.FOLLOWERS, ())
+
+    def is_subscriber(self, user_id: typing.Union[int, str]) -> bool:
+        return int(user_id) in self.members.get(Audiences.SUBSCRIBERS, ())
+
+    # Sync methods
+    def start(self, broadcaster_id: typing.Union[int, str], scopes: int):
+        """Starts syncing every audience the bitset `scopes` grants access
+        to.  The last snapshots are loaded from the database, so membership
+        checks work before the first sync finishes."""
+        broadcaster_id = int(broadcaster_id)
+        audiences = [a for a, (_, scope, _) in self.ENDPOINTS.items() if scopes & scope.bit]
+
+        if broadcaster_id == self.broadcaster_id and set(audiences) == set(self.members):
+            return
+
+        self.stop()
+        self.broadcaster_id = broadcaster_id
+
+        for audience in audiences:
+            self.members[audience] = self.store.load(audience, broadcaster_id)
+            self.LOGGER.info(f'Loaded {len(self.members[audience])} {audience.value}')
+
+        self.sync_all()
+        self._timer.start()
+
+    def stop(self):
+        """Stops syncing, and forgets the loaded snapshots.  Syncs that are in
+        progress are abandoned."""
+        self._timer.stop()
+        self._runs.clear()
+        self.members.clear()
+        self.broadcaster_id = None
+
+    def sync_all(self):
+        for audience in list(self.members):
+            self.sync(audience)
+
+    def sync(self, audience: Audiences):
+        """Starts syncing `audience`, unless it's already being synced."""
+        if audience in self._runs or audience not in self.members:
+            return
+
+        run = _Run(audience, self.broadcaster_id, self.members[audience])
+        endpoint = self.ENDPOINTS[audience][0]
+
+        self._runs[audience] = run
+        self.helix.pages(endpoint, {'broadcaster_id': run.broadcaster_id},
+                         functools.partial(self._page, run), functools.partial(self._done, run))
+
+    def _page(self, run: _Run, page: typing.List[dict]):
+        if self._runs.get(run.audience) is not run:
+            return
+
+        detail = self.ENDPOINTS[run.audience][2]
+        rows = []
+
+        for entry in page:
+            user_id = int(entry['user_id'])
+
+            if run.current.add(user_id) and user_id not in run.previous:
+                rows.append((user_id, entry.get('user_login', ''), str(entry.get(detail, ''))))
+                run.added.append(user_id)
+
+        if rows:
+            self.store.add(run.audience, run.broadcaster_id, rows)
+
+    def _done(self, run: _Run, okay: bool):
+        if self._runs.get(run.audience) is not run:
+            return
+
+        del self._runs[run.audience]
+
+        if not okay:
+            # Users that were already written stay in the snapshot, so the
+            # next sync doesn't report them again.
+            self.LOGGER.warning(f'Could not sync {run.audience.value};  retrying at the next interval')
+            run.previous.update(run.added)
+
+            return
+
+        removed = tuple(run.previous.difference(run.current))
+
+        if removed:
+            self.store.remove(run.audience, run.broadcaster_id, removed)
+
+        self.members[run.audience] = run.current
+        diff = Diff(run.audience, run.broadcaster_id, tuple(run.added), removed, len(run.current),
+                    time.perf_counter() - run.started)
+
+        self.LOGGER.info(f'Synced {diff.total} {run.audience.value} in {diff.seconds:.2f}s '
+                         f'(+{len(diff.added)}, -{len(diff.removed)})')
+        self.synced.emit(diff)
@@ -0,0 +1,103 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import typing
+
+from core.utils.enums import Roles
+
+__all__ = ['BadgeCache', 'parse_badges']
+
+# badge: roles
+BADGE_ROLES = {
+    'broadcaster': Roles.BROADCASTER,
+    'moderator': Roles.MODERATOR,
+    'vip': Roles.VIP,
+    'subscriber': Roles.SUBSCRIBER,
+    'founder': Roles.SUBSCRIBER,
+    'staff': Roles.STAFF,
+    'admin': Roles.STAFF,
+    'global_mod': Roles.STAFF
+}
+
+
+def parse_badges(badges: str) -> Roles:
+    """Returns the roles described by a badges tag, like
+    "broadcaster/1,subscriber/3012".  Subscriber badge versions of 2000 and
+    3000 onward are tier 2 and 3 subscriptions."""
+    roles = Roles.NONE
+
+    for badge in badges.split(','):
+        name, _, version = badge.partition('/')
+        roles |= BADGE_ROLES.get(name, Roles.NONE)
+
+        if name == 'subscriber' and version.isdigit():
+            tier = int(version) // 1000
+
+            if tier == 2:
+                roles |= Roles.TIER_2
+
+            elif tier == 3:
+                roles |= Roles.TIER_3
+
+    return roles
+
+
+class BadgeCache:
+    """Remembers the roles each user holds in each channel.  A user's badges
+    are only parsed again when their badges tag changes.  The least recently
+    seen users are forgotten once `size` are remembered."""
+
+    def __init__(self, size: int = 10000):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: typing.OrderedDict[typing.Tuple[str, str], typing.Tuple[str, Roles]] = \
+            collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def roles(self, channel: str, user: str, badges: str) -> Roles:
+        """Returns the roles `user` holds in `channel`, given their current
+        badges tag."""
+        key = (channel, user)
+        entry = self._entries.get(key)
+
+        if entry is not None and entry[0] == badges:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+            return entry[1]
+
+        self.misses += 1
+        roles = parse_badges(badges) if badges else Roles.NONE
+        self._entries[key] = (badges, roles)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+        return roles
+
+    def cached(self, channel: str, user: str) -> Roles:
+        """Returns the roles `user` was last seen with in `channel`."""
+        entry = self._entries.get((channel, user))
+
+        return entry[1] if entry is not None else Roles.NONE
+
+    def clear(self):
+        self._entries.clear()
@@ -25,12 +25,25 @@ __all__ = ['Token']
 class Token:
     client_id: str
     data: str
-    scopes: typing.List[Scopes]
+    scopes: int  # A bitset of Scopes;  see Scopes.pack
+
+    @classmethod
+    def from_scopes(cls, client_id: str, data: str, scopes: typing.Iterable[typing.Union[Scopes, str]]) -> 'Token':
+        return cls(client_id, data, Scopes.pack(scopes))
+
+    def scope_list(self) -> typing.List[Scopes]:
+        """Returns the scopes this token was granted."""
+        return Scopes.unpack(self.scopes)
 
     # Scope methods
     def has_scope(self, scope: Scopes) -> bool:
         """Returns whether or not this token has the scope specified."""
-        return scope.lower() in self.scopes
+        return self.scopes & scope.bit != 0
+
+    def has_scopes(self, scopes: int) -> bool:
+        """Returns whether or not this token has every scope in the bitset
+        `scopes`."""
+        return self.scopes & scopes == scopes
 
     def can_read_extension_analytics(self) -> bool:
         """Whether or not this token can be used to view analytics data for
@@ -70,7 +83,7 @@ class Token:
     def can_read_broadcast(self) -> bool:
         """Whether or not this token can be used to read its account holder's
         broadcast configuration, including extension configurations."""
-        return self.has_scope(Scopes.READ_USER_BROADCAST) or self.can_read_broadcast()
+        return self.has_scope(Scopes.READ_BROADCAST) or self.can_edit_broadcast()
 
     def can_read_email(self) -> bool:
         """Whether or not this token can be used to read its account holder's
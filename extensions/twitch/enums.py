@@ -14,11 +14,15 @@ You should have received a copy of the GNU General Public License along with
 ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
 """
 import enum
+import typing
 
-__all__ = ['Scopes']
+__all__ = ['Scopes', 'Priority', 'Audiences']
 
 
 class Scopes(enum.Enum):
+    """The scopes a token can be granted.  Sets of scopes are represented
+    as integer bitsets, where each scope's bit is its position in this enum;
+    bitsets are never persisted, so members can be added anywhere."""
     # "New Twitch API" scopes
     # Analytics
     READ_EXTENSION_ANALYTICS = 'analytics:read:extensions'
@@ -37,3 +41,54 @@ class Scopes(enum.Enum):
     EDIT_FOLLOWS = 'user:edit:follows'
     READ_BROADCAST = 'user:read:broadcast'
     READ_USER_EMAIL = 'user:read:email'
+    READ_FOLLOWERS = 'moderator:read:followers'
+    EDIT_USER_BROADCAST = 'user:edit:broadcast'
+
+    # Chat scopes
+    READ_CHAT = 'chat:read'
+    EDIT_CHAT = 'chat:edit'
+    MODERATE_CHANNEL = 'channel:moderate'
+    READ_WHISPERS = 'whispers:read'
+    EDIT_WHISPERS = 'whispers:edit'
+
+    @property
+    def bit(self) -> int:
+        return _SCOPE_BITS[self]
+
+    @classmethod
+    def pack(cls, scopes: typing.Iterable[typing.Union['Scopes', str]]) -> int:
+        """Returns the bitset of `scopes`.  Scopes this enum doesn't know
+        about are ignored."""
+        bits = 0
+
+        for scope in scopes:
+            if not isinstance(scope, Scopes):
+                scope = _SCOPE_VALUES.get(scope.lower())
+
+            if scope is not None:
+                bits |= scope.bit
+
+        return bits
+
+    @classmethod
+    def unpack(cls, bits: int) -> typing.List['Scopes']:
+        """Returns the scopes in a bitset."""
+        return [scope for scope in cls if bits & scope.bit]
+
+
+_SCOPE_BITS: typing.Dict[Scopes, int] = {scope: 1 << index for index, scope in enumerate(Scopes)}
+_SCOPE_VALUES: typing.Dict[str, Scopes] = {scope.value: scope for scope in Scopes}
+
+
+class Priority(enum.IntEnum):
+    """The order outbound messages are sent in when the bot is being rate
+    limited.  Lower values are sent first."""
+    MODERATION = 0
+    REPLY = 1
+    TIMER = 2
+
+
+class Audiences(enum.Enum):
+    """The sets of users synced from a broadcaster's channel."""
+    FOLLOWERS = 'followers'
+    SUBSCRIBERS = 'subscribers'
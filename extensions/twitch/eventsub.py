@@ -0,0 +1,380 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import dataclasses
+import functools
+import json
+import logging
+import random
+import typing
+
+from PySide2 import QtCore, QtWebSockets
+
+from .helix import Helix
+
+__all__ = ['EventSub', 'Notification', 'Topic']
+
+
+@dataclasses.dataclass(frozen=True)
+class Topic:
+    """An EventSub subscription type.  A `condition` of None is filled in
+    with the broadcaster's id when the subscription is created."""
+    type: str
+    version: str = '1'
+    condition: typing.Optional[typing.Tuple[typing.Tuple[str, str], ...]] = None
+
+
+@dataclasses.dataclass(frozen=True)
+class Notification:
+    """A single event delivered by EventSub."""
+    id: str
+    topic: Topic
+    event: dict
+    timestamp: str
+
+
+class EventSub(QtCore.QObject):
+    """Maintains a single EventSub websocket shared by every extension.
+
+    Extensions `subscribe` to the topics they need, and connect to the
+    signals below;  a topic is only subscribed to once, no matter how many
+    extensions use it, and is unsubscribed from once none of them do.  The
+    websocket is only open while there are topics.  If the websocket drops,
+    or Twitch stops sending keepalives, it's reopened after a jittered
+    backoff and every topic is subscribed to again.  Twitch may deliver a
+    notification more than once, so recently seen message ids are ignored."""
+    LOGGER = logging.getLogger('extensions.twitch.eventsub')
+
+    URL = 'wss://eventsub.wss.twitch.tv/ws'
+    BASE_DELAY = 1.0  # Seconds
+    MAX_DELAY = 120.0
+    KEEPALIVE_GRACE = 5.0  # Seconds added to the keepalive timeout Twitch asks for
+    SEEN = 1024  # Message ids remembered
+
+    # type: (version, signal, condition keys)
+    TOPICS = {
+        'channel.channel_points_custom_reward_redemption.add': ('1', 'onRedemption', ('broadcaster_user_id',)),
+        'channel.cheer': ('1', 'onCheer', ('broadcaster_user_id',)),
+        'channel.follow': ('2', 'onFollow', ('broadcaster_user_id', 'moderator_user_id')),
+        'channel.raid': ('1', 'onRaid', ('to_broadcaster_user_id',)),
+        'channel.subscribe': ('1', 'onSubscription', ('broadcaster_user_id',)),
+        'channel.subscription.gift': ('1', 'onSubscriptionGift', ('broadcaster_user_id',)),
+        'channel.subscription.message': ('1', 'onResubscription', ('broadcaster_user_id',)),
+        'channel.hype_train.begin': ('1', 'onHypeTrainBegin', ('broadcaster_user_id',)),
+        'channel.hype_train.progress': ('1', 'onHypeTrainProgress', ('broadcaster_user_id',)),
+        'channel.hype_train.end': ('1', 'onHypeTrainEnd', ('broadcaster_user_id',))
+    }
+
+    onEvent: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    """Emitted for every notification, including topics without a dedicated
+    signal.  The emitted object is a Notification."""
+
+    onRedemption: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    """Emitted when a viewer redeems a custom channel points reward."""
+
+    onCheer: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    """Emitted when a viewer cheers bits."""
+
+    onFollow: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    """Emitted when a viewer follows the channel."""
+
+    onRaid: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    """Emitted when another broadcaster raids the channel."""
+
+    onSubscription: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    """Emitted when a viewer subscribes, or is gifted a subscription."""
+
+    onSubscriptionGift: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    """Emitted when a viewer gifts one or more subscriptions."""
+
+    onResubscription: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    """Emitted when a viewer shares a resubscription message."""
+
+    onHypeTrainBegin: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    onHypeTrainProgress: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+    onHypeTrainEnd: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object)
+
+    onRevoked: typing.ClassVar[QtCore.Signal] = QtCore.Signal(object, str)
+    """Emitted when Twitch revokes a subscription.  The emitted objects are
+    the Topic and the reason it was revoked."""
+
+    def __init__(self, helix: Helix, *, url: str = None, parent: QtCore.QObject = None):
+        super(EventSub, self).__init__(parent=parent)
+
+        self.helix = helix
+        self.url = url or self.URL
+        self.broadcaster_id: typing.Optional[str] = None
+        self.session_id: typing.Optional[str] = None
+        self.socket: typing.Optional[QtWebSockets.QWebSocket] = None
+
+        self.topics: typing.Counter[Topic] = collections.Counter()  # Topic: subscribers
+        self.subscriptions: typing.Dict[Topic, str] = {}  # Topic: subscription id
+        self.notifications = 0
+        self.duplicates = 0
+
+        self._pending: typing.Set[Topic] = set()
+        self._previous: typing.Optional[QtWebSockets.QWebSocket] = None  # The socket being migrated away from
+        self._migrating = False
+        self._seen: typing.OrderedDict[str, None] = collections.OrderedDict()
+        self._attempt = 0
+
+        self._keepalive_timer = QtCore.QTimer(parent=self)
+        self._keepalive_timer.setSingleShot(True)
+        self._keepalive_timer.timeout.connect(lambda: self.restart('no keepalive was received'))
+
+        self._retry_timer = QtCore.QTimer(parent=self)
+        self._retry_timer.setSingleShot(True)
+        self._retry_timer.timeout.connect(self.open)
+
+    def is_connected(self) -> bool:
+        return self.session_id is not None
+
+    # Topic methods
+    def subscribe(self, topic_type: str, condition: typing.Mapping[str, str] = None, *,
+                  version: str = None) -> Topic:
+        """Subscribes to `topic_type`, and returns the topic to unsubscribe
+        from later.  If `condition` isn't given, the broadcaster's id is used
+        for every key the topic needs."""
+        version = version or self.TOPICS.get(topic_type, ('1',))[0]
+        topic = Topic(topic_type, version, tuple(sorted(condition.items())) if condition is not None else None)
+
+        self.topics[topic] += 1
+
+        if self.topics[topic] == 1:
+            if self.is_connected():
+                self._create(topic)
+
+            else:
+                self.open()
+
+        return topic
+
+    def unsubscribe(self, topic: Topic):
+        """Releases a topic returned by `subscribe`."""
+        if self.topics[topic] <= 0:
+            return
+
+        self.topics[topic] -= 1
+
+        if self.topics[topic] > 0:
+            return
+
+        del self.topics[topic]
+        self._pending.discard(topic)
+        subscription_id = self.subscriptions.pop(topic, None)
+
+        if subscription_id is not None:
+            self.helix.delete('eventsub/subscriptions', {'id': subscription_id})
+
+        if not self.topics:
+            self.close()
+
+    def set_broadcaster(self, broadcaster_id: typing.Optional[str]):
+        """Sets the broadcaster whose events are delivered.  Subscriptions are
+        recreated for the new broadcaster, since tokens can't be shared
+        between sessions."""
+        if broadcaster_id == self.broadcaster_id:
+            return
+
+        self.broadcaster_id = broadcaster_id
+        self.close()
+
+        if broadcaster_id is not None and self.topics:
+            self.open()
+
+    def condition(self, topic: Topic) -> typing.Optional[typing.Dict[str, str]]:
+        """Returns the condition `topic` should be subscribed with, or None if
+        it depends on a broadcaster that isn't known yet."""
+        if topic.condition is not None:
+            return dict(topic.condition)
+
+        if self.broadcaster_id is None:
+            return None
+
+        keys = self.TOPICS.get(topic.type, (None, None, ('broadcaster_user_id',)))[2]
+        return {key: self.broadcaster_id for key in keys}
+
+    def _create(self, topic: Topic):
+        condition = self.condition(topic)
+
+        if condition is None or topic in self._pending or topic in self.subscriptions:
+            return
+
+        self._pending.add(topic)
+        body = {'type': topic.type, 'version': topic.version, 'condition': condition,
+                'transport': {'method': 'websocket', 'session_id': self.session_id}}
+
+        self.helix.post('eventsub/subscriptions', body, functools.partial(self._created, topic, self.session_id))
+
+    def _created(self, topic: Topic, session_id: str, response: typing.Optional[dict]):
+        if session_id != self.session_id or topic not in self._pending:
+            return  # The session ended, or the topic was released, while the subscription was being created
+
+        self._pending.discard(topic)
+
+        if not response or not response.get('data'):
+            self.LOGGER.warning(f'Could not subscribe to {topic.type};  it will be retried when the session restarts')
+            return
+
+        self.subscriptions[topic] = response['data'][0]['id']
+        self.LOGGER.debug(f'Subscribed to {topic.type}')
+
+    # Connection methods
+    def _socket(self, url: str) -> QtWebSockets.QWebSocket:
+        socket = QtWebSockets.QWebSocket(parent=self)
+        socket.textMessageReceived.connect(functools.partial(self._received, socket))
+        socket.disconnected.connect(functools.partial(self._disconnected, socket))
+        socket.open(QtCore.QUrl(url))
+
+        return socket
+
+    def open(self):
+        """Opens the websocket, if there's anything to subscribe to."""
+        self._retry_timer.stop()
+
+        if self.socket is not None or not self.topics or self.broadcaster_id is None:
+            return
+
+        self.LOGGER.info('Connecting to EventSub...')
+        self.socket = self._socket(self.url)
+
+    def close(self):
+        """Closes the websocket.  Twitch deletes a session's subscriptions
+        when it closes."""
+        self._retry_timer.stop()
+        self._keepalive_timer.stop()
+
+        sockets, self.socket, self._previous = (self.socket, self._previous), None, None
+
+        for socket in sockets:
+            if socket is not None:
+                socket.close()
+                socket.deleteLater()
+
+        self._migrating = False
+        self.session_id = None
+        self.subscriptions.clear()
+        self._pending.clear()
+
+    def restart(self, reason: str):
+        """Closes the websocket, then reopens it after a backoff delay."""
+        self.LOGGER.warning(f'Restarting EventSub;  {reason}')
+        self.close()
+
+        delay = random.uniform(0, min(self.MAX_DELAY, self.BASE_DELAY * 2 ** self._attempt))
+        self._attempt += 1
+        self._retry_timer.start(int(delay * 1000))
+
+    def _disconnected(self, socket: QtWebSockets.QWebSocket):
+        if socket is self._previous:
+            self._previous = None
+            socket.deleteLater()
+
+        elif socket is self.socket:
+            self.restart(f'the websocket closed ({socket.closeReason() or socket.closeCode()})')
+
+    # Message handling
+    def _received(self, socket: QtWebSockets.QWebSocket, text: str):
+        if socket is not self.socket and socket is not self._previous:
+            return
+
+        try:
+            message = json.loads(text)
+            metadata, payload = message['metadata'], message['payload']
+
+        except (ValueError, KeyError):
+            return self.LOGGER.warning(f'Received a malformed EventSub message: {text[:200]}')
+
+        message_type = metadata.get('message_type')
+
+        if socket is self.socket:
+            self._keepalive_timer.start()  # Any message counts as a keepalive
+
+        if message_type == 'session_welcome':
+            self._welcome(socket, payload['session'])
+
+        elif message_type == 'notification':
+            self._notification(metadata, payload)
+
+        elif message_type == 'session_reconnect':
+            self.LOGGER.info('EventSub asked us to reconnect;  migrating the session...')
+            self._migrating = True
+            self._previous, self.socket = self.socket, self._socket(payload['session']['reconnect_url'])
+
+        elif message_type == 'revocation':
+            self._revocation(payload['subscription'])
+
+    def _welcome(self, socket: QtWebSockets.QWebSocket, session: dict):
+        timeout = session.get('keepalive_timeout_seconds') or 10
+        self._keepalive_timer.setInterval(int((timeout + self.KEEPALIVE_GRACE) * 1000))
+        self._keepalive_timer.start()
+        self._attempt = 0
+
+        if self._migrating:
+            # Subscriptions carry over to the new socket
+            self._migrating = False
+            self.session_id = session['id']
+
+            if self._previous is not None:
+                self._previous.close()
+
+            return self.LOGGER.info('Migrated the EventSub session')
+
+        self.session_id = session['id']
+        self.subscriptions.clear()
+        self._pending.clear()
+        self.LOGGER.info(f'Connected to EventSub;  subscribing to {len(self.topics)} topics...')
+
+        for topic in self.topics:
+            self._create(topic)
+
+    def _notification(self, metadata: dict, payload: dict):
+        message_id = metadata['message_id']
+
+        if message_id in self._seen:
+            self.duplicates += 1
+            return
+
+        self._seen[message_id] = None
+
+        if len(self._seen) > self.SEEN:
+            self._seen.popitem(last=False)
+
+        subscription = payload['subscription']
+        topic = next((t for t, i in self.subscriptions.items() if i == subscription['id']), None)
+
+        if topic is None:
+            condition = tuple(sorted(subscription['condition'].items()))
+            topic = Topic(subscription['type'], subscription['version'], condition)
+
+        notification = Notification(message_id, topic, payload['event'], metadata.get('message_timestamp', ''))
+        self.notifications += 1
+
+        self.onEvent.emit(notification)
+        signal = self.TOPICS.get(topic.type, (None, None))[1]
+
+        if signal is not None:
+            getattr(self, signal).emit(notification)
+
+    def _revocation(self, subscription: dict):
+        topic = next((t for t, i in self.subscriptions.items() if i == subscription['id']), None)
+
+        if topic is None:
+            return
+
+        del self.subscriptions[topic]
+        self.LOGGER.warning(f'Twitch revoked the {topic.type} subscription;  reason: {subscription["status"]}')
+        self.onRevoked.emit(topic, subscription['status'])
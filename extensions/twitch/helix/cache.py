@@ -0,0 +1,110 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import dataclasses
+import time
+import typing
+
+__all__ = ['ResponseCache', 'Key', 'make_key']
+
+Params = typing.Union[typing.Mapping[str, typing.Any], typing.Iterable[typing.Tuple[str, typing.Any]]]
+Key = typing.Tuple[str, typing.Tuple[typing.Tuple[str, str], ...]]
+
+
+def make_key(endpoint: str, params: Params = None) -> Key:
+    """Returns the cache key of a request.  Parameters are sorted, so the
+    same request always has the same key."""
+    if params is None:
+        pairs = ()
+
+    elif isinstance(params, typing.Mapping):
+        pairs = params.items()
+
+    else:
+        pairs = params
+
+    return endpoint.strip('/'), tuple(sorted((str(k), str(v)) for k, v in pairs))
+
+
+@dataclasses.dataclass()
+class _Entry:
+    value: typing.Any
+    stored_at: float
+    ttl: float
+    stale: float
+
+
+class ResponseCache:
+    """A bounded cache of API responses.
+
+    Entries are fresh for `ttl` seconds after they're stored, then stale for
+    another `stale` seconds, during which they're still served while the
+    response is fetched again.  The least recently used entries are evicted
+    once the cache holds `size` entries."""
+
+    def __init__(self, size: int = 1024):
+        self.size = size
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+        self._entries: typing.OrderedDict[Key, _Entry] = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, key: Key) -> typing.Tuple[typing.Any, bool]:
+        """Returns the cached value of `key`, and whether or not it's stale.
+        The value is None if there isn't a usable entry."""
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            age = time.monotonic() - entry.stored_at
+
+            if age < entry.ttl:
+                self.hits += 1
+                self._entries.move_to_end(key)
+
+                return entry.value, False
+
+            if age < entry.ttl + entry.stale:
+                self.stale_hits += 1
+                self._entries.move_to_end(key)
+
+                return entry.value, True
+
+            del self._entries[key]
+
+        self.misses += 1
+
+        return None, False
+
+    def store(self, key: Key, value: typing.Any, *, ttl: float, stale: float = 0.0):
+        self._entries[key] = _Entry(value, time.monotonic(), ttl, stale)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint: str = None):
+        """Discards every entry, or only the entries of `endpoint`."""
+        if endpoint is None:
+            return self._entries.clear()
+
+        endpoint = endpoint.strip('/')
+
+        for key in [k for k in self._entries if k[0] == endpoint]:
+            del self._entries[key]
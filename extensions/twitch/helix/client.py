@@ -0,0 +1,309 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import dataclasses
+import functools
+import json
+import logging
+import time
+import typing
+
+from PySide2 import QtCore, QtNetwork
+
+from .cache import Key, Params, ResponseCache, make_key
+
+__all__ = ['Helix', 'RateLimit']
+
+Callback = typing.Callable[[typing.Optional[dict]], None]  # Passed None if the request failed
+
+
+@dataclasses.dataclass()
+class RateLimit:
+    """The rate limit Helix reported in its last response."""
+    limit: int = 800
+    remaining: int = 800
+    reset: float = 0.0  # Seconds since the epoch
+
+
+@dataclasses.dataclass()
+class _Request:
+    key: Key
+    method: bytes = b'GET'
+    body: typing.Optional[dict] = None
+    ttl: float = 0.0
+    stale: float = 0.0
+    callback: typing.Optional[Callback] = None  # Only used by requests that aren't coalesced
+
+
+class Helix(QtCore.QObject):
+    """An asynchronous client for Twitch's Helix API.
+
+    Responses are cached by endpoint and parameters;  fresh entries are
+    returned without a request, and stale entries are returned while they're
+    fetched again.  Identical requests made while one is in flight share its
+    response.  User lookups made in the same event loop iteration are batched
+    into as few requests as the endpoint allows, and requests are held back
+    when the rate limit reported by Helix is nearly exhausted."""
+    LOGGER = logging.getLogger('extensions.twitch.helix')
+
+    BASE = 'https://api.twitch.tv/helix/'
+    BATCH_SIZE = 100
+    RESERVE = 5  # Rate limit points kept for requests that can't wait
+    TTL = 60.0  # Seconds
+    STALE = 5 * 60.0
+    USER_TTL = 10 * 60.0
+
+    def __init__(self, manager: QtNetwork.QNetworkAccessManager, *, base: str = None,
+                 parent: QtCore.QObject = None):
+        super(Helix, self).__init__(parent=parent)
+
+        self.manager = manager
+        self.base = base or self.BASE
+        self.client_id = ''
+        self.token = ''
+
+        self.cache = ResponseCache()
+        self.rate_limit = RateLimit()
+        self.sent = 0
+        self.coalesced = 0
+
+        self._queue: typing.Deque[_Request] = collections.deque()
+        self._inflight: typing.Dict[Key, typing.List[Callback]] = {}
+        self._active = 0
+        self._batch: typing.Dict[typing.Tuple[str, str], typing.List[Callback]] = {}
+
+        self._pump_timer = QtCore.QTimer(parent=self)
+        self._pump_timer.setSingleShot(True)
+        self._pump_timer.timeout.connect(self._pump)
+
+        self._batch_timer = QtCore.QTimer(parent=self)
+        self._batch_timer.setSingleShot(True)
+        self._batch_timer.timeout.connect(self._flush_batch)
+
+    def set_credentials(self, client_id: str, token: str):
+        if (client_id, token) != (self.client_id, self.token):
+            self.client_id = client_id
+            self.token = token
+            self.cache.invalidate()
+
+    # Request methods
+    def get(self, endpoint: str, params: Params = None, callback: Callback = None, *,
+            ttl: float = TTL, stale: float = STALE):
+        """Requests `endpoint` with `params`, and passes the decoded response
+        to `callback`.  Responses are cached for `ttl` seconds, then served
+        stale for another `stale` seconds;  a `ttl` of 0 disables caching."""
+        key = make_key(endpoint, params)
+
+        if ttl > 0:
+            value, is_stale = self.cache.lookup(key)
+
+            if value is not None:
+                if callback is not None:
+                    callback(value)
+
+                if not is_stale:
+                    return
+
+                callback = None  # Revalidate in the background
+
+        waiters = self._inflight.get(key)
+
+        if waiters is not None:
+            self.coalesced += 1
+
+            if callback is not None:
+                waiters.append(callback)
+
+            return
+
+        self._inflight[key] = [callback] if callback is not None else []
+        self._queue.append(_Request(key, ttl=ttl, stale=stale))
+        self._pump()
+
+    def post(self, endpoint: str, body: dict, callback: Callback = None, *, params: Params = None):
+        """Posts `body` to `endpoint` as JSON.  Writes are never cached or
+        coalesced, but are paced like every other request."""
+        self._queue.append(_Request(make_key(endpoint, params), b'POST', body, callback=callback))
+        self._pump()
+
+    def delete(self, endpoint: str, params: Params = None, callback: Callback = None):
+        """Deletes the resource at `endpoint`."""
+        self._queue.append(_Request(make_key(endpoint, params), b'DELETE', callback=callback))
+        self._pump()
+
+    def _pump(self):
+        while self._queue:
+            now = time.time()
+            remaining = self.rate_limit.remaining if now < self.rate_limit.reset else self.rate_limit.limit
+
+            if remaining - self._active <= self.RESERVE:
+                if now >= self.rate_limit.reset:
+                    return  # Requests in flight will pump the queue when they finish
+
+                delay = int((self.rate_limit.reset - now) * 1000) + 1
+                self.LOGGER.debug(f'Rate limit nearly exhausted;  holding {len(self._queue)} requests for {delay}ms')
+
+                return self._pump_timer.start(delay)
+
+            self._send(self._queue.popleft())
+
+    def _send(self, request: _Request):
+        endpoint, pairs = request.key
+        query = QtCore.QUrlQuery()
+
+        for name, value in pairs:
+            query.addQueryItem(name, value)
+
+        url = QtCore.QUrl(self.base + endpoint)
+        url.setQuery(query)
+
+        outgoing = QtNetwork.QNetworkRequest(url)
+        outgoing.setRawHeader(b'Client-Id', self.client_id.encode())
+        outgoing.setRawHeader(b'Authorization', f'Bearer {self.token}'.encode())
+
+        if request.body is not None:
+            outgoing.setHeader(QtNetwork.QNetworkRequest.ContentTypeHeader, 'application/json')
+            reply = self.manager.sendCustomRequest(outgoing, request.method, json.dumps(request.body).encode())
+
+        else:
+            reply = self.manager.sendCustomRequest(outgoing, request.method)
+
+        reply.finished.connect(lambda: self._finished(request, reply))
+
+        self._active += 1
+        self.sent += 1
+
+    def _finished(self, request: _Request, reply: QtNetwork.QNetworkReply):
+        key = request.key
+        self._active -= 1
+        reply.deleteLater()
+
+        headers = {bytes(k).decode().lower(): bytes(v).decode() for k, v in reply.rawHeaderPairs()}
+
+        if 'ratelimit-remaining' in headers:
+            self.rate_limit = RateLimit(int(headers.get('ratelimit-limit') or self.rate_limit.limit),
+                                        int(headers['ratelimit-remaining']),
+                                        float(headers.get('ratelimit-reset') or 0))
+
+        if reply.attribute(QtNetwork.QNetworkRequest.HttpStatusCodeAttribute) == 429:
+            self.LOGGER.warning(f'Helix rate limited a request to {key[0]};  retrying after the reset')
+            self.rate_limit.remaining = 0
+            self.rate_limit.reset = max(self.rate_limit.reset, time.time() + 1)
+            self._queue.appendleft(request)
+
+            return self._pump()
+
+        if request.method == b'GET':
+            waiters = self._inflight.pop(key, [])
+
+        else:
+            waiters = [request.callback] if request.callback is not None else []
+
+        data = None
+
+        if reply.error() != QtNetwork.QNetworkReply.NoError:
+            self.LOGGER.warning(f'Request to {key[0]} failed!  Reason: {reply.errorString()}')
+
+        else:
+            try:
+                data = json.loads(bytes(reply.readAll()).decode() or '{}')  # DELETE responds with no content
+
+            except ValueError as e:
+                self.LOGGER.warning(f'Could not decode the response from {key[0]}!  Reason: {e!s}')
+
+            else:
+                if request.ttl > 0:
+                    self.cache.store(key, data, ttl=request.ttl, stale=request.stale)
+
+        for waiter in waiters:
+            waiter(data)
+
+        self._pump()
+
+    def pages(self, endpoint: str, params: Params, on_page: typing.Callable[[typing.List[dict]], None],
+              on_done: typing.Callable[[bool], None] = None, *, size: int = BATCH_SIZE):
+        """Streams every page of a paginated endpoint.  Each page's data is
+        passed to `on_page` as it arrives, and the next page isn't requested
+        until then, so only one page is held in memory at a time.  `on_done`
+        is passed False if a page couldn't be fetched."""
+        pairs = list(params.items() if isinstance(params, typing.Mapping) else params or [])
+
+        def fetched(response: typing.Optional[dict]):
+            if response is None:
+                return on_done(False) if on_done is not None else None
+
+            on_page(response.get('data', []))
+            cursor = response.get('pagination', {}).get('cursor')
+
+            if not cursor:
+                return on_done(True) if on_done is not None else None
+
+            request(cursor)
+
+        def request(cursor: typing.Optional[str]):
+            page = pairs + [('first', size)] + ([('after', cursor)] if cursor else [])
+            self.get(endpoint, page, fetched, ttl=0)
+
+        request(None)
+
+    # User methods
+    def user(self, callback: typing.Callable[[typing.Optional[dict]], None], *, login: str = None,
+             user_id: str = None):
+        """Looks up a user by login or id, and passes the user object to
+        `callback`, or None if the user doesn't exist."""
+        field, value = ('login', login.lower()) if login is not None else ('id', str(user_id))
+        cached, is_stale = self.cache.lookup(make_key('users', [(field, value)]))
+
+        if cached is not None:
+            callback(cached)
+
+            if not is_stale:
+                return
+
+            callback = None
+
+        self._batch.setdefault((field, value), [])
+
+        if callback is not None:
+            self._batch[(field, value)].append(callback)
+
+        if not self._batch_timer.isActive():
+            self._batch_timer.start(0)
+
+    def _flush_batch(self):
+        batch, self._batch = self._batch, {}
+
+        for field in ('login', 'id'):
+            keys = [k for k in batch if k[0] == field]
+
+            for start in range(0, len(keys), self.BATCH_SIZE):
+                chunk = keys[start:start + self.BATCH_SIZE]
+                waiters = {k: batch[k] for k in chunk}
+
+                self.get('users', chunk, functools.partial(self._users_fetched, waiters), ttl=0)
+
+    def _users_fetched(self, waiters: typing.Dict[typing.Tuple[str, str], typing.List[Callback]],
+                       response: typing.Optional[dict]):
+        found = {}
+
+        for user in (response or {}).get('data', []):
+            for key in (('login', user['login'].lower()), ('id', user['id'])):
+                found[key] = user
+                self.cache.store(make_key('users', [key]), user, ttl=self.USER_TTL, stale=self.STALE)
+
+        for key, callbacks in waiters.items():
+            for callback in callbacks:
+                callback(found.get(key))
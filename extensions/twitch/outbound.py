@@ -0,0 +1,195 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import dataclasses
+import heapq
+import logging
+import time
+import typing
+
+from PySide2 import QtCore
+
+from .enums import Priority
+
+__all__ = ['OutboundScheduler', 'Metrics']
+
+
+@dataclasses.dataclass()
+class Metrics:
+    """Counters describing an outbound scheduler's queue."""
+    queued: int = 0
+    sent: int = 0
+    coalesced: int = 0  # Duplicates merged into a message that was already queued
+    dropped: int = 0  # Messages discarded because the queue was full
+    max_depth: int = 0
+    total_wait: float = 0.0  # Seconds
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        return self.total_wait / self.sent if self.sent else 0.0
+
+
+@dataclasses.dataclass(order=True)
+class _Entry:
+    priority: Priority
+    sequence: int
+    channel: str = dataclasses.field(compare=False)
+    text: str = dataclasses.field(compare=False)
+    queued_at: float = dataclasses.field(compare=False)
+    cancelled: bool = dataclasses.field(default=False, compare=False)
+
+
+class OutboundScheduler(QtCore.QObject):
+    """Sends chat messages without exceeding Twitch's message limits.
+
+    Every message the account sent in the last `WINDOW` seconds is counted,
+    across all channels.  A message can be sent to a channel while that count
+    is below the channel's limit, which is higher in channels the account
+    moderates.  Messages that can't be sent yet are queued by priority, then
+    by the order they were sent in, and identical messages already waiting
+    for the same channel are merged."""
+    LOGGER = logging.getLogger('extensions.twitch.outbound')
+
+    WINDOW = 30.0  # Seconds
+    USER_LIMIT = 20
+    MODERATOR_LIMIT = 100
+    MAX_QUEUE = 500
+
+    def __init__(self, sender: typing.Callable[[str, str], None], parent: QtCore.QObject = None):
+        super(OutboundScheduler, self).__init__(parent=parent)
+
+        self.sender = sender
+        self.moderated: typing.Set[str] = set()  # Channels the account moderates
+        self.metrics = Metrics()
+
+        self._queue: typing.List[_Entry] = []
+        self._pending: typing.Dict[typing.Tuple[str, str], _Entry] = {}
+        self._sent: typing.Deque[float] = collections.deque()
+        self._sequence = 0
+
+        self._timer = QtCore.QTimer(parent=self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.drain)
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def limit(self, channel: str) -> int:
+        """Returns how many messages can be sent to `channel` per window."""
+        return self.MODERATOR_LIMIT if channel.lower() in self.moderated else self.USER_LIMIT
+
+    def set_moderator(self, channel: str, moderator: bool):
+        """Sets whether or not the account moderates `channel`."""
+        if moderator:
+            self.moderated.add(channel.lower())
+
+        else:
+            self.moderated.discard(channel.lower())
+
+        self.drain()
+
+    # Queue methods
+    def send(self, channel: str, text: str, priority: Priority = Priority.REPLY):
+        """Sends `text` to `channel` as soon as the rate limit allows."""
+        key = (channel.lower(), text)
+        existing = self._pending.get(key)
+
+        if existing is not None:
+            self.metrics.coalesced += 1
+
+            if priority >= existing.priority:
+                return
+
+            # Requeue the message at the higher priority
+            existing.cancelled = True
+
+        elif len(self._pending) >= self.MAX_QUEUE and not self._evict(priority):
+            self.metrics.dropped += 1
+
+            return self.LOGGER.warning(f'Outbound queue is full;  dropped message to #{channel}')
+
+        entry = _Entry(priority, self._sequence, channel, text, existing.queued_at if existing else time.monotonic())
+        self._sequence += 1
+        self._pending[key] = entry
+        heapq.heappush(self._queue, entry)
+
+        if existing is None:
+            self.metrics.queued += 1
+            self.metrics.max_depth = max(self.metrics.max_depth, len(self._pending))
+
+        self.drain()
+
+    def clear(self):
+        """Discards every queued message."""
+        self._queue.clear()
+        self._pending.clear()
+        self._timer.stop()
+
+    def drain(self):
+        """Sends queued messages until the queue is empty, or the rate limit
+        is reached.  In the latter case, draining resumes once the oldest
+        message leaves the window."""
+        now = time.monotonic()
+
+        while self._sent and now - self._sent[0] >= self.WINDOW:
+            self._sent.popleft()
+
+        while self._queue:
+            entry = self._queue[0]
+
+            if entry.cancelled:
+                heapq.heappop(self._queue)
+                continue
+
+            if len(self._sent) >= self.limit(entry.channel):
+                delay = self._sent[len(self._sent) - self.limit(entry.channel)] + self.WINDOW - now
+                self._timer.start(max(int(delay * 1000) + 1, 1))
+
+                return
+
+            heapq.heappop(self._queue)
+            del self._pending[(entry.channel.lower(), entry.text)]
+
+            wait = now - entry.queued_at
+            self.metrics.sent += 1
+            self.metrics.total_wait += wait
+            self.metrics.max_wait = max(self.metrics.max_wait, wait)
+            self._sent.append(now)
+
+            self.sender(entry.channel, entry.text)
+
+    def _evict(self, priority: Priority) -> bool:
+        """Discards the newest queued message with a lower priority than
+        `priority`, and returns whether one was found."""
+        victim = max((e for e in self._pending.values() if e.priority > priority), default=None)
+
+        if victim is None:
+            return False
+
+        victim.cancelled = True
+        del self._pending[(victim.channel.lower(), victim.text)]
+        self.metrics.dropped += 1
+
+        return True
+
+    def dump(self):
+        """Logs the scheduler's metrics."""
+        m = self.metrics
+        self.LOGGER.info(f'Outbound queue: {self.depth} queued, {m.sent} sent, {m.coalesced} coalesced, '
+                         f'{m.dropped} dropped, {m.max_depth} deepest, {m.average_wait:.2f}s average wait, '
+                         f'{m.max_wait:.2f}s longest wait')
@@ -0,0 +1,274 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import logging
+import time
+import typing
+
+from PySide2 import QtCore
+
+from QtTwitch import gateway
+from .supervisor import Supervisor
+
+__all__ = ['GatewayPool', 'JoinScheduler']
+
+
+class JoinScheduler(QtCore.QObject):
+    """Joins channels without exceeding Twitch's JOIN limit.
+
+    Every channel the account joined in the last `WINDOW` seconds is counted,
+    across all connections.  Queued joins are sent in batches whenever the
+    count drops below `limit`, and only once the join's connection is
+    established."""
+    LOGGER = logging.getLogger('extensions.twitch.joins')
+
+    WINDOW = 10.0  # Seconds
+    LIMIT = 20
+    INTERVAL = 250  # Milliseconds between attempts while joins are waiting
+
+    joined = QtCore.Signal(object, str)  # Connection, channel
+
+    def __init__(self, limit: int = LIMIT, parent: QtCore.QObject = None):
+        super(JoinScheduler, self).__init__(parent=parent)
+
+        self.limit = limit
+        self.total = 0
+
+        self._queue: typing.Deque[typing.Tuple[gateway.Gateway, str]] = collections.deque()
+        self._sent: typing.Deque[float] = collections.deque()
+
+        self._timer = QtCore.QTimer(parent=self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.drain)
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def join(self, connection: gateway.Gateway, channel: str):
+        """Queues a join of `channel` on `connection`."""
+        self._queue.append((connection, channel))
+        self.drain()
+
+    def cancel(self, channel: str):
+        """Discards any queued join of `channel`."""
+        self._queue = collections.deque(e for e in self._queue if e[1] != channel)
+
+    def cancel_connection(self, connection: gateway.Gateway):
+        """Discards every queued join on `connection`."""
+        self._queue = collections.deque(e for e in self._queue if e[0] is not connection)
+
+    def clear(self):
+        """Discards every queued join."""
+        self._queue.clear()
+        self._timer.stop()
+
+    def drain(self):
+        now = time.monotonic()
+
+        while self._sent and now - self._sent[0] >= self.WINDOW:
+            self._sent.popleft()
+
+        budget = self.limit - len(self._sent)
+        waiting = collections.deque()
+
+        while self._queue and budget > 0:
+            connection, channel = self._queue.popleft()
+
+            if not connection.is_connected():
+                waiting.append((connection, channel))
+                continue
+
+            connection.join(channel)
+            self._sent.append(now)
+            self.total += 1
+            budget -= 1
+
+            self.joined.emit(connection, channel)
+
+        self._queue.extendleft(reversed(waiting))
+
+        if self._queue:
+            if budget > 0 or not self._sent:
+                delay = self.INTERVAL
+
+            else:
+                delay = max(int((self._sent[0] + self.WINDOW - now) * 1000) + 1, self.INTERVAL)
+
+            self.LOGGER.debug(f'{len(self._queue)} joins waiting;  retrying in {delay}ms')
+            self._timer.start(delay)
+
+
+class GatewayPool(QtCore.QObject):
+    """A set of gateway connections shared by many channels.
+
+    Channels are assigned to the connection with the fewest channels, and a
+    new connection is opened once every connection holds
+    `CHANNELS_PER_GATEWAY` channels, and closed once its last channel is
+    parted.  Every connection's messages are
+    re-emitted through `on_message`.  The pool exposes the parts of
+    `gateway.Gateway`'s interface the Twitch extension uses, so it can be used
+    in its place.  Connections that drop are restarted by the pool's
+    supervisor."""
+    LOGGER = logging.getLogger('extensions.twitch.pool')
+    CHANNELS_PER_GATEWAY = 50
+
+    on_message = QtCore.Signal(str)
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super(GatewayPool, self).__init__(parent=parent)
+
+        self.gateways: typing.List[gateway.Gateway] = []
+        self.shards: typing.Dict[str, gateway.Gateway] = {}  # Channel -> connection
+        self.joins = JoinScheduler(parent=self)
+        self.supervisor = Supervisor(self)
+
+        self.nick = ''
+        self.token = ''
+
+        self._server: typing.Optional[typing.Tuple[str, int]] = None
+        self._connected = False
+
+    @property
+    def channels(self) -> typing.List[str]:
+        return list(self.shards)
+
+    # Connection methods
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def connect(self, host: str = None, port: int = None):
+        """Opens every connection in the pool.  If `host` isn't passed, the
+        connections connect to Twitch."""
+        self._server = (host, port) if host else None
+        self._connected = True
+
+        for connection in self.gateways:
+            self.connect_gateway(connection)
+
+        self.supervisor.start()
+
+    def disconnect(self):
+        """Closes every connection, and forgets every channel."""
+        self._connected = False
+        self.joins.clear()
+        self.supervisor.stop()
+
+        for connection in self.gateways:
+            connection.disconnect()
+            connection.deleteLater()
+
+        self.gateways.clear()
+        self.shards.clear()
+
+    def set_credentials(self, nick: str, token: str):
+        self.nick = nick
+        self.token = token
+
+        for connection in self.gateways:
+            connection.set_credentials(nick, token)
+
+    def connect_gateway(self, connection: gateway.Gateway):
+        """Connects a single connection to the pool's server."""
+        if self._server is not None:
+            connection.connect(*self._server)
+
+        else:
+            connection.connect()
+
+    def restart(self, reason: str):
+        """Restarts every connection, rejoining their channels as the join
+        limit allows."""
+        for connection in self.gateways:
+            self.supervisor.restart(connection, reason)
+
+    def _open(self) -> gateway.Gateway:
+        connection = gateway.Gateway()
+        connection.set_credentials(self.nick, self.token)
+        connection.on_message.connect(self.on_message.emit)
+        self.gateways.append(connection)
+        self.supervisor.watch(connection)
+
+        self.LOGGER.info(f'Opening connection #{len(self.gateways)}...')
+
+        if self._connected:
+            self.connect_gateway(connection)
+
+        return connection
+
+    # Channel methods
+    def set_channels(self, channels: typing.Iterable[str]):
+        """Joins every channel in `channels`, and parts every other channel."""
+        wanted = [c.lower() for c in channels]
+
+        for channel in [c for c in self.shards if c not in wanted]:
+            self.part(channel)
+
+        for channel in wanted:
+            self.join(channel)
+
+    def join(self, channel: str):
+        channel = channel.lower()
+
+        if channel in self.shards:
+            return
+
+        loads = collections.Counter({c: 0 for c in self.gateways})
+        loads.update(self.shards.values())
+        connection = min(loads, key=loads.__getitem__, default=None)
+
+        if connection is None or loads[connection] >= self.CHANNELS_PER_GATEWAY:
+            connection = self._open()
+
+        self.shards[channel] = connection
+        self.joins.join(connection, channel)
+
+    def part(self, channel: str):
+        channel = channel.lower()
+        connection = self.shards.pop(channel, None)
+
+        if connection is None:
+            return
+
+        self.joins.cancel(channel)
+
+        if connection in self.shards.values():
+            if connection.is_connected():
+                connection.part(channel)
+
+        else:
+            self._close(connection)
+
+    def _close(self, connection: gateway.Gateway):
+        self.LOGGER.info(f'Closing connection #{self.gateways.index(connection) + 1} since it has no channels...')
+
+        self.joins.cancel_connection(connection)
+        self.supervisor.unwatch(connection)
+        self.gateways.remove(connection)
+
+        connection.disconnect()
+        connection.deleteLater()
+
+    # Message methods
+    def send_priv_message(self, channel: str, message: str):
+        """Sends `message` to `channel` through the connection that joined
+        it."""
+        connection = self.shards.get(channel.lower())
+
+        if connection is None:
+            return self.LOGGER.warning(f'Cannot send a message to #{channel} before joining it!')
+
+        connection.send_priv_message(channel, message)
@@ -0,0 +1,138 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import logging
+import typing
+
+from PySide2 import QtCore
+
+from .enums import Scopes
+
+__all__ = ['ScopeRegistry']
+
+
+class ScopeRegistry(QtCore.QObject):
+    """Tracks the scopes each extension needs.
+
+    The union of every extension's scopes is kept up to date as scopes are
+    registered, using a reference count per scope, so it never has to be
+    recomputed from every extension.  Registrations are batched;  the first
+    registration in a batch starts a timer, and when it fires, the user is
+    asked to authorize the scopes the current token is missing at most once,
+    no matter how many registrations the batch contained.  Scopes that are no
+    longer needed don't prompt the user, since a token with extra scopes
+    still works."""
+    LOGGER = logging.getLogger('extensions.twitch.scopes')
+    BATCH_INTERVAL = 5 * 1000
+
+    authorizationRequired = QtCore.Signal(int)  # The bitset of missing scopes
+
+    def __init__(self, parent: QtCore.QObject = None):
+        super(ScopeRegistry, self).__init__(parent=parent)
+
+        self.union = 0
+        self.granted = 0
+
+        self._extensions: typing.Dict[str, int] = collections.defaultdict(int)  # Extension: bitset
+        self._counts: typing.Counter[Scopes] = collections.Counter()  # Scope: extensions that need it
+        self._reasons: typing.Dict[typing.Tuple[str, Scopes], str] = {}
+        self._prompted = 0  # The missing scopes the user was last asked to authorize
+
+        self._timer = QtCore.QTimer(parent=self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.BATCH_INTERVAL)
+        self._timer.timeout.connect(self.check)
+
+    @property
+    def missing(self) -> int:
+        """The bitset of scopes extensions need that the token wasn't
+        granted."""
+        return self.union & ~self.granted
+
+    def scopes(self, extension: str) -> int:
+        return self._extensions.get(extension, 0)
+
+    def reasons(self, scopes: int) -> typing.Dict[Scopes, typing.List[str]]:
+        """Returns why each scope in `scopes` was registered."""
+        reasons = {scope: [] for scope in Scopes.unpack(scopes)}
+
+        for (extension, scope), reason in self._reasons.items():
+            if scope in reasons:
+                reasons[scope].append(f'{extension}: {reason}' if reason else extension)
+
+        return reasons
+
+    # Registration methods
+    def register(self, extension: str, scope: typing.Union[Scopes, str], reason: str = None):
+        """Registers `scope` to `extension` for `reason`."""
+        scope = Scopes(scope)
+
+        if not self._extensions[extension] & scope.bit:
+            self._extensions[extension] |= scope.bit
+            self._counts[scope] += 1
+
+            if self._counts[scope] == 1:
+                self.union |= scope.bit
+
+        self._reasons[(extension, scope)] = reason or ''
+        self._schedule()
+
+    def unregister(self, extension: str, scope: typing.Union[Scopes, str]):
+        """Unregisters `scope` from `extension`."""
+        scope = Scopes(scope)
+
+        if not self._extensions.get(extension, 0) & scope.bit:
+            return
+
+        self._extensions[extension] &= ~scope.bit
+        self._reasons.pop((extension, scope), None)
+        self._counts[scope] -= 1
+
+        if self._counts[scope] == 0:
+            del self._counts[scope]
+            self.union &= ~scope.bit
+
+        self._schedule()
+
+    def unregister_all(self, extension: str):
+        """Unregisters every scope `extension` registered."""
+        for scope in Scopes.unpack(self._extensions.get(extension, 0)):
+            self.unregister(extension, scope)
+
+    def set_granted(self, scopes: int):
+        """Sets the scopes the current token was granted."""
+        if scopes != self.granted:
+            self.granted = scopes
+            self._prompted &= ~scopes
+            self._schedule()
+
+    # Prompt methods
+    def _schedule(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def check(self):
+        """Asks the user to authorize missing scopes, unless they were
+        already asked to authorize the same scopes."""
+        self._timer.stop()
+        missing = self.missing
+
+        if not missing or missing & ~self._prompted == 0:
+            return
+
+        self._prompted = missing
+        self.LOGGER.info(f'The token is missing {len(Scopes.unpack(missing))} scopes extensions registered')
+        self.authorizationRequired.emit(missing)
@@ -29,6 +29,7 @@ def token(obj: settings.Setting):
 
     # Imports
     from ..dataclasses import Token
+    from ..enums import Scopes
 
     # Declarations
     container = QtWidgets.QWidget()
@@ -59,7 +60,7 @@ def token(obj: settings.Setting):
         the freshly generated token."""
         obj.set_value(t.data)
         line_edit.set_text(t.data)
-        obj.data['scopes'] = [s.value for s in t.scopes]
+        obj.data['scopes'] = [s.value for s in t.scope_list()]
 
         line_edit.setToolTip('Current scopes: {}'.format(', '.join(obj.data['scopes'])))
 
@@ -68,7 +69,7 @@ def token(obj: settings.Setting):
         is responsible for displaying the OAuth flow to the user in, hopefully,
         a user friendly way."""
         client: 'Client' = QtWidgets.QApplication.instance().client
-        g = Generator(parent=client.settings)
+        g = Generator(requested=Scopes.pack(obj.data.get('requested_scopes', [])), parent=client.settings)
         g.setWindowFlags(QtCore.Qt.Dialog | QtCore.Qt.WindowSystemMenuHint)
 
         g.setup_ui()
@@ -18,11 +18,14 @@ import secrets
 import typing
 from urllib import parse
 
-from PySide2 import QtCore, QtWebEngineWidgets, QtWidgets
+from PySide2 import QtCore, QtWidgets
 
 from ..dataclasses import token
 from ..enums import Scopes
 
+if typing.TYPE_CHECKING:
+    from core.widgets.webview import WebView
+
 __all__ = ['Generator']
 
 
@@ -37,7 +40,7 @@ class Generator(QtWidgets.QDialog):
     # Class attributes
     ENDPOINT = QtCore.QUrl('https://id.twitch.tv/oauth2/authorize')
 
-    def __init__(self, *, parent: QtWidgets.QWidget = None):
+    def __init__(self, *, requested: int = 0, parent: QtWidgets.QWidget = None):
         # Super call
         super(Generator, self).__init__(parent=parent)
 
@@ -51,7 +54,7 @@ class Generator(QtWidgets.QDialog):
 
         # Browser widgets
         self.label: typing.Optional[QtWidgets.QLabel] = None
-        self.browser: typing.Optional[QtWebEngineWidgets.QWebEngineView] = None
+        self.browser: typing.Optional['WebView'] = None
 
         # Scope widgets
         self.scopes: typing.Optional[QtWidgets.QListWidget] = None
@@ -59,6 +62,7 @@ class Generator(QtWidgets.QDialog):
 
         # Private attributes
         self._state: typing.Optional[str] = None
+        self._requested = requested  # The bitset of scopes checked by default
 
     # Ui methods
     def setup_ui(self):
@@ -77,7 +81,11 @@ class Generator(QtWidgets.QDialog):
 
         # Browser widgets
         if self.browser is None:
-            self.browser = QtWebEngineWidgets.QWebEngineView()
+            # Imported here so loading the extension doesn't import the web
+            # engine, or any widgets when running headless.
+            from core.widgets.webview import WebView
+
+            self.browser = WebView()
             self.browser.urlChanged.connect(self.url_watcher)
 
         if self.label is None:
@@ -91,7 +99,7 @@ class Generator(QtWidgets.QDialog):
             for scope in Scopes.__members__.values():  # type: Scopes
                 i = QtWidgets.QListWidgetItem(scope.value)
                 i.setFlags(QtCore.Qt.ItemIsUserCheckable | QtCore.Qt.ItemIsEditable | QtCore.Qt.ItemIsEnabled)
-                i.setCheckState(QtCore.Qt.Unchecked)
+                i.setCheckState(QtCore.Qt.Checked if self._requested & scope.bit else QtCore.Qt.Unchecked)
 
                 self.scopes.addItem(i)
 
@@ -328,7 +336,7 @@ class Generator(QtWidgets.QDialog):
             # Declarations
             app: QtWidgets.QApplication = QtWidgets.QApplication.instance()
             client_id = app.client.settings['extensions']['twitch']['client_id'].value
-            scopes: typing.List[Scopes] = [Scopes(s) for s in parse.unquote(query.queryItemValue('scope')).split('+')]
+            scopes = parse.unquote(query.queryItemValue('scope')).split('+')
 
-            self.GENERATED.emit(token.Token(client_id, query.queryItemValue('access_token'), scopes))
+            self.GENERATED.emit(token.Token.from_scopes(client_id, query.queryItemValue('access_token'), scopes))
             self.accept()
@@ -0,0 +1,26 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+# Local stand-ins for Twitch's IRC servers, API, and EventSub websocket, so the
+# Twitch extension can be exercised without network access.  The stand-ins
+# don't import Qt.
+from .eventsub import EventSubStandIn, Session, cheer
+from .helix import HelixStandIn
+from .messages import chatter, clearchat, privmsg, usernotice
+from .script import run_script
+from .server import Connection, StandIn
+
+__all__ = ['StandIn', 'HelixStandIn', 'EventSubStandIn', 'Connection', 'Session', 'chatter', 'privmsg', 'clearchat',
+           'usernotice', 'cheer', 'run_script']
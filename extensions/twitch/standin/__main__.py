@@ -0,0 +1,57 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+# Runs the stand-in from the repository's root:
+#
+#   python -m extensions.twitch.standin [--port 6667] [--script burst.txt]
+#
+# Then set the Twitch extension's "server" setting to 127.0.0.1:6667.
+import argparse
+import logging
+import pathlib
+import time
+import typing
+
+from .script import USAGE, run_script
+from .server import StandIn
+
+
+def main(args: typing.List[str] = None):
+    parser = argparse.ArgumentParser(description="A local stand-in for Twitch's IRC servers.", epilog=USAGE,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6667)
+    parser.add_argument('--script', type=pathlib.Path, help='A script to run once the server is listening.')
+    parser.add_argument('--verbose', action='store_true')
+    options = parser.parse_args(args)
+
+    logging.basicConfig(level=logging.DEBUG if options.verbose else logging.INFO,
+                        format='[%(asctime)s][%(name)s][%(levelname)s] %(message)s')
+
+    with StandIn(options.host, options.port) as server:
+        try:
+            if options.script is not None:
+                with options.script.open(encoding='UTF-8') as infile:
+                    run_script(server, infile)
+
+            while True:
+                time.sleep(1)
+
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,365 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import base64
+import datetime
+import hashlib
+import json
+import logging
+import socket
+import struct
+import threading
+import time
+import typing
+import uuid
+from urllib import parse
+
+__all__ = ['EventSubStandIn', 'Session', 'cheer']
+
+GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'  # RFC 6455
+TEXT, CLOSE, PING, PONG = 0x1, 0x8, 0x9, 0xA
+
+
+def timestamp() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat().replace('+00:00', 'Z')
+
+
+def cheer(broadcaster_id: str, user_id: int, bits: int = 100, message: str = 'Cheer100') -> dict:
+    """Returns a channel.cheer event."""
+    return {'is_anonymous': False, 'user_id': str(user_id), 'user_login': f'user{user_id}',
+            'user_name': f'User{user_id}', 'broadcaster_user_id': broadcaster_id,
+            'broadcaster_user_login': 'standin', 'broadcaster_user_name': 'StandIn', 'message': message,
+            'bits': bits}
+
+
+class Session:
+    """A client connected to the stand-in's websocket."""
+
+    def __init__(self, server: 'EventSubStandIn', sock: socket.socket, session_id: str):
+        self.server = server
+        self.socket = sock
+        self.id = session_id
+        self.sent = 0
+        self.last_sent = time.monotonic()
+
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f'standin-eventsub-{session_id[:8]}', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def send(self, message_type: str, payload: dict, *, message_id: str = None, **metadata):
+        """Sends a message with Twitch's metadata envelope."""
+        metadata = {'message_id': message_id or str(uuid.uuid4()), 'message_type': message_type,
+                    'message_timestamp': timestamp(), **metadata}
+        self.send_frame(TEXT, json.dumps({'metadata': metadata, 'payload': payload}).encode())
+
+    def send_frame(self, opcode: int, payload: bytes):
+        length = len(payload)
+
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+
+        elif length < 65536:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+
+        with self._lock:
+            try:
+                self.socket.sendall(header + payload)
+                self.sent += 1
+                self.last_sent = time.monotonic()
+
+            except OSError:
+                self.close()
+
+    def close(self, code: int = None):
+        """Closes the session, with a close frame if `code` is given."""
+        if code is not None:
+            self.send_frame(CLOSE, struct.pack('!H', code))
+
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+
+        except OSError:
+            pass
+
+        self.socket.close()
+
+    # Reader thread
+    def _read(self, size: int) -> bytes:
+        data = b''
+
+        while len(data) < size:
+            chunk = self.socket.recv(size - len(data))
+
+            if not chunk:
+                raise ConnectionError
+
+            data += chunk
+
+        return data
+
+    def _run(self):
+        try:
+            while True:
+                first, second = self._read(2)
+                opcode, length = first & 0x0F, second & 0x7F
+
+                if length == 126:
+                    length, = struct.unpack('!H', self._read(2))
+
+                elif length == 127:
+                    length, = struct.unpack('!Q', self._read(8))
+
+                mask = self._read(4) if second & 0x80 else b'\0\0\0\0'
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self._read(length)))
+
+                if opcode == PING:
+                    self.send_frame(PONG, payload)
+
+                elif opcode == CLOSE:
+                    self.send_frame(CLOSE, payload[:2])
+                    break
+
+                elif opcode == TEXT:
+                    # Twitch disconnects clients that send anything but pongs
+                    self.server.LOGGER.warning(f'Session {self.id} sent a message;  closing it')
+                    self.close(4001)
+                    break
+
+        except (OSError, ConnectionError, ValueError):
+            pass
+
+        finally:
+            self.server.session_closed(self)
+
+
+class EventSubStandIn:
+    """A local server that speaks enough of Twitch's EventSub websocket
+    protocol for the Twitch extension to connect, subscribe, and receive
+    notifications.
+
+    Subscriptions are created through `HelixStandIn`, which calls
+    `subscribe` when it's given this stand-in.  Notifications are sent with
+    `notify`, and `reconnect`, `revoke`, and `drop` reproduce the ways
+    Twitch ends or migrates sessions."""
+    LOGGER = logging.getLogger('extensions.twitch.standin.eventsub')
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, *, keepalive: int = 10):
+        self.keepalive = keepalive  # Seconds
+        self.sessions: typing.Dict[str, Session] = {}
+        self.subscriptions: typing.Dict[str, dict] = {}
+        self.notifications = 0
+
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._socket = socket.create_server((host, port))
+        self._thread = threading.Thread(target=self._accept, name='standin-eventsub', daemon=True)
+        self._keepalive_thread = threading.Thread(target=self._keep_alive, name='standin-eventsub-keepalive',
+                                                  daemon=True)
+
+    @property
+    def url(self) -> str:
+        """The url the EventSub client should connect to."""
+        return 'ws://{}:{}/ws'.format(*self._socket.getsockname()[:2])
+
+    def start(self) -> 'EventSubStandIn':
+        self._thread.start()
+        self._keepalive_thread.start()
+        self.LOGGER.info(f'Listening on {self.url}')
+
+        return self
+
+    def close(self):
+        self._closed.set()
+        self._socket.close()
+
+        for session in list(self.sessions.values()):
+            session.close()
+
+    def __enter__(self) -> 'EventSubStandIn':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # Connection methods
+    def _accept(self):
+        while not self._closed.is_set():
+            try:
+                sock, _ = self._socket.accept()
+
+            except OSError:
+                break
+
+            threading.Thread(target=self._handshake, args=(sock,), daemon=True).start()
+
+    def _handshake(self, sock: socket.socket):
+        request = b''
+
+        try:
+            while b'\r\n\r\n' not in request:
+                chunk = sock.recv(4096)
+
+                if not chunk:
+                    raise ConnectionError
+
+                request += chunk
+
+        except (OSError, ConnectionError):
+            return sock.close()
+
+        lines = request.split(b'\r\n\r\n', 1)[0].decode('latin-1').split('\r\n')
+        target = lines[0].split(' ')[1]
+        headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(':') for line in lines[1:])}
+        accept = base64.b64encode(hashlib.sha1(headers.get('sec-websocket-key', '').encode() + GUID).digest())
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.sendall(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                     b'Sec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+
+        previous_id = dict(parse.parse_qsl(parse.urlsplit(target).query)).get('reconnect')
+
+        with self._lock:
+            previous = self.sessions.get(previous_id)
+            session = Session(self, sock, previous.id if previous is not None else str(uuid.uuid4()))
+            self.sessions[session.id] = session
+
+        session.start()
+        session.send('session_welcome', {'session': {
+            'id': session.id, 'status': 'connected', 'keepalive_timeout_seconds': self.keepalive,
+            'reconnect_url': None, 'connected_at': timestamp()
+        }})
+
+        if previous is not None:
+            # Subscriptions were migrated to the new connection
+            previous.close(4004)
+
+    def session_closed(self, session: Session):
+        with self._lock:
+            if self.sessions.get(session.id) is not session:
+                return  # The session was migrated to another connection
+
+            del self.sessions[session.id]
+
+            for subscription_id in [k for k, v in self.subscriptions.items()
+                                    if v['transport']['session_id'] == session.id]:
+                del self.subscriptions[subscription_id]
+
+    def _keep_alive(self):
+        while not self._closed.wait(0.25):
+            now = time.monotonic()
+
+            for session in list(self.sessions.values()):
+                if now - session.last_sent >= self.keepalive:
+                    session.send('session_keepalive', {})
+
+    # Subscription methods
+    def subscribe(self, session_id: str, subscription_type: str, version: str,
+                  condition: typing.Dict[str, str]) -> typing.Tuple[int, dict]:
+        """Creates a subscription, and returns the status and body Helix
+        should respond with."""
+        with self._lock:
+            if session_id not in self.sessions:
+                return 400, {'error': 'Bad Request', 'status': 400, 'message': 'websocket transport session not found'}
+
+            for existing in self.subscriptions.values():
+                if (existing['type'], existing['version'], existing['condition']) == \
+                        (subscription_type, version, condition):
+                    return 409, {'error': 'Conflict', 'status': 409, 'message': 'subscription already exists'}
+
+            subscription = {'id': str(uuid.uuid4()), 'status': 'enabled', 'type': subscription_type,
+                            'version': version, 'condition': condition, 'created_at': timestamp(), 'cost': 0,
+                            'transport': {'method': 'websocket', 'session_id': session_id,
+                                          'connected_at': timestamp()}}
+            self.subscriptions[subscription['id']] = subscription
+
+        return 202, {'data': [subscription], 'total': len(self.subscriptions), 'total_cost': 0,
+                     'max_total_cost': 10}
+
+    def unsubscribe(self, subscription_id: str) -> bool:
+        with self._lock:
+            return self.subscriptions.pop(subscription_id, None) is not None
+
+    # Outbound methods
+    def notify(self, subscription_type: str, event: dict, *, condition: typing.Dict[str, str] = None,
+               repeat: int = 1) -> int:
+        """Sends `event` to every session subscribed to `subscription_type`
+        whose condition includes `condition`.  Each notification is sent
+        `repeat` times with the same message id, like Twitch may.  Returns
+        how many subscriptions were notified."""
+        with self._lock:
+            targets = [(s, self.sessions.get(s['transport']['session_id'])) for s in self.subscriptions.values()
+                       if s['type'] == subscription_type
+                       and all(s['condition'].get(k) == v for k, v in (condition or {}).items())]
+
+        for subscription, session in targets:
+            if session is None:
+                continue
+
+            message_id = str(uuid.uuid4())
+
+            for _ in range(repeat):
+                session.send('notification', {'subscription': subscription, 'event': event},
+                             message_id=message_id, subscription_type=subscription_type,
+                             subscription_version=subscription['version'])
+                self.notifications += 1
+
+        return len(targets)
+
+    def burst(self, subscription_type: str, events: typing.Iterable[dict], *, rate: float = 0) -> float:
+        """Notifies every event in `events`, `rate` events per second, or as
+        fast as possible if `rate` isn't positive.  Returns how long the
+        burst took."""
+        interval = 1 / rate if rate > 0 else 0
+        start = deadline = time.perf_counter()
+
+        for event in events:
+            if interval:
+                deadline += interval
+                time.sleep(max(deadline - time.perf_counter(), 0))
+
+            self.notify(subscription_type, event)
+
+        return time.perf_counter() - start
+
+    def reconnect(self):
+        """Asks every session to reconnect to a new url.  Subscriptions are
+        kept if the client connects within 30 seconds, like Twitch does."""
+        for session in list(self.sessions.values()):
+            session.send('session_reconnect', {'session': {
+                'id': session.id, 'status': 'reconnecting', 'keepalive_timeout_seconds': None,
+                'reconnect_url': f'{self.url}?reconnect={session.id}', 'connected_at': timestamp()
+            }})
+
+    def revoke(self, subscription_id: str, status: str = 'authorization_revoked'):
+        """Revokes a subscription."""
+        with self._lock:
+            subscription = self.subscriptions.pop(subscription_id, None)
+            session = self.sessions.get(subscription['transport']['session_id']) if subscription else None
+
+        if session is not None:
+            subscription = dict(subscription, status=status)
+            session.send('revocation', {'subscription': subscription}, subscription_type=subscription['type'],
+                         subscription_version=subscription['version'])
+
+    def drop(self):
+        """Drops every connection without a close frame.  Their
+        subscriptions are deleted."""
+        for session in list(self.sessions.values()):
+            session.close()
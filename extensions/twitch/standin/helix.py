@@ -0,0 +1,220 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import collections
+import http.server
+import json
+import logging
+import threading
+import time
+import typing
+import zlib
+from urllib import parse
+
+if typing.TYPE_CHECKING:
+    from .eventsub import EventSubStandIn
+
+__all__ = ['HelixStandIn']
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    server: '_Server'
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # Headers and bodies are written separately
+
+    def do_GET(self):
+        url = parse.urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length)) if length else None
+
+        status, headers, body = self.server.standin.handle(url.path, parse.parse_qsl(url.query), dict(self.headers),
+                                                           method=self.command, body=body)
+        payload = json.dumps(body).encode() if body is not None else b''
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(payload)
+
+    do_POST = do_DELETE = do_GET
+
+    def log_message(self, format, *args):
+        HelixStandIn.LOGGER.debug(format % args)
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    standin: 'HelixStandIn'
+
+
+class HelixStandIn:
+    """A local stand-in for the parts of Twitch's Helix API, and its token
+    validation endpoint, the Twitch extension uses.
+
+    Users are generated from their login or id, so any user exists.  EventSub
+    subscriptions are created on `eventsub`, if it's set.  A
+    broadcaster's followers and subscribers are the user ids in `followers`
+    and `subscribers`, keyed by the broadcaster's id, and are paginated like
+    Helix paginates them.  Requests are rate limited with a bucket of `limit`
+    points that refills every `window` seconds, and the bucket is reported
+    through the same headers Helix uses."""
+    LOGGER = logging.getLogger('extensions.twitch.standin.helix')
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, *, limit: int = 800, window: float = 60.0,
+                 latency: float = 0.0):
+        self.limit = limit
+        self.window = window
+        self.latency = latency  # Seconds each request is delayed by
+        self.requests: typing.Counter[str] = collections.Counter()
+        self.followers: typing.Dict[str, typing.List[int]] = {}
+        self.subscribers: typing.Dict[str, typing.List[int]] = {}
+        self.eventsub: typing.Optional['EventSubStandIn'] = None
+
+        self._remaining = limit
+        self._reset = time.time() + window
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.standin = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name='standin-helix', daemon=True)
+
+    @property
+    def base(self) -> str:
+        """The base url the Helix client should be pointed at."""
+        return 'http://{}:{}/helix/'.format(*self._server.server_address[:2])
+
+    @property
+    def validate_url(self) -> str:
+        return 'http://{}:{}/oauth2/validate'.format(*self._server.server_address[:2])
+
+    def start(self) -> 'HelixStandIn':
+        self._thread.start()
+
+        return self
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'HelixStandIn':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # Request handling
+    def handle(self, path: str, query: typing.List[typing.Tuple[str, str]], headers: typing.Dict[str, str], *,
+               method: str = 'GET', body: typing.Any = None) -> typing.Tuple[int, typing.Dict[str, str], typing.Any]:
+        self.requests[path] += 1
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if path == '/oauth2/validate':
+            token = headers.get('Authorization', '').partition(' ')[2]
+
+            if not token or token == 'invalid':
+                return 401, {}, {'status': 401, 'message': 'invalid access token'}
+
+            return 200, {}, {'client_id': 'standin', 'login': 'standin', 'user_id': '1',
+                             'scopes': ['chat:read', 'chat:edit'], 'expires_in': 3600}
+
+        with self._lock:
+            now = time.time()
+
+            if now >= self._reset:
+                self._remaining = self.limit
+                self._reset = now + self.window
+
+            allowed = self._remaining > 0
+            self._remaining = max(self._remaining - 1, 0)
+            headers = {'Ratelimit-Limit': str(self.limit), 'Ratelimit-Remaining': str(self._remaining),
+                       'Ratelimit-Reset': str(int(self._reset))}
+
+        if not allowed:
+            return 429, headers, {'error': 'Too Many Requests', 'status': 429, 'message': 'Rate limit exceeded'}
+
+        if path == '/helix/users':
+            if len(query) > 100:
+                return 400, headers, {'error': 'Bad Request', 'status': 400, 'message': 'Too many users'}
+
+            return 200, headers, {'data': [self.user(login=v) if k == 'login' else self.user(user_id=v)
+                                           for k, v in query if k in ('login', 'id')]}
+
+        if path == '/helix/eventsub/subscriptions' and self.eventsub is not None:
+            if method == 'POST':
+                transport = body.get('transport', {})
+
+                if transport.get('method') != 'websocket':
+                    return 400, headers, {'error': 'Bad Request', 'status': 400, 'message': 'Unsupported transport'}
+
+                status, response = self.eventsub.subscribe(transport.get('session_id'), body['type'],
+                                                           body['version'], body['condition'])
+                return status, headers, response
+
+            if method == 'DELETE':
+                if self.eventsub.unsubscribe(dict(query).get('id')):
+                    return 204, headers, None
+
+                return 404, headers, {'error': 'Not Found', 'status': 404, 'message': 'Subscription not found'}
+
+        if path in ('/helix/channels/followers', '/helix/subscriptions'):
+            params = dict(query)
+            audience = self.followers if path.endswith('followers') else self.subscribers
+
+            if 'broadcaster_id' not in params:
+                return 400, headers, {'error': 'Bad Request', 'status': 400, 'message': 'Missing broadcaster_id'}
+
+            return 200, headers, self.page(path, audience.get(params['broadcaster_id'], []), params)
+
+        return 404, headers, {'error': 'Not Found', 'status': 404, 'message': f'{path} is not implemented'}
+
+    @staticmethod
+    def page(path: str, user_ids: typing.List[int], params: typing.Dict[str, str]) -> dict:
+        """Returns a page of an audience.  Cursors are the offset of the
+        page's first entry."""
+        start = int(params.get('after') or 0)
+        end = start + min(int(params.get('first') or 20), 100)
+        data = []
+
+        for user_id in user_ids[start:end]:
+            entry = {'user_id': str(user_id), 'user_login': f'user{user_id}', 'user_name': f'User{user_id}'}
+
+            if path.endswith('followers'):
+                entry['followed_at'] = '2020-01-01T00:00:00Z'
+
+            else:
+                entry.update(broadcaster_id=params['broadcaster_id'], tier='1000', is_gift=False)
+
+            data.append(entry)
+
+        return {'data': data, 'total': len(user_ids), 'pagination': {'cursor': str(end)} if end < len(user_ids) else {}}
+
+    @staticmethod
+    def user(*, login: str = None, user_id: str = None) -> dict:
+        """Returns the user a login or id belongs to.  Logins of the form
+        "user<id>" map to that id, so lookups by either agree."""
+        if login is None:
+            login = f'user{user_id}'
+
+        elif user_id is None:
+            user_id = login[4:] if login.startswith('user') and login[4:].isdigit() else str(zlib.crc32(login.encode()))
+
+        return {'id': user_id, 'login': login.lower(), 'display_name': login.title(), 'type': '',
+                'broadcaster_type': '', 'description': '', 'created_at': '2020-01-01T00:00:00Z'}
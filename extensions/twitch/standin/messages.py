@@ -0,0 +1,80 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import random
+import time
+import typing
+
+__all__ = ['privmsg', 'clearchat', 'usernotice', 'chatter']
+
+WORDS = ('hello', 'pog', 'lul', 'nice', 'gg', 'what', 'is', 'this', 'stream', 'chat', 'hype', 'clip', 'that',
+         'no', 'way', 'kappa', 'the', 'boss', 'again', 'wow')
+
+
+def _tags(tags: typing.Dict[str, typing.Any]) -> str:
+    escaped = (str(v).replace('\\', '\\\\').replace(';', '\\:').replace(' ', '\\s') for v in tags.values())
+
+    return '@' + ';'.join(f'{k}={v}' for k, v in zip(tags, escaped))
+
+
+def _timestamp() -> int:
+    return int(time.time() * 1000)
+
+
+def privmsg(channel: str, user: str, text: str, *, badges: str = '', color: str = '', **tags) -> str:
+    """Returns a PRIVMSG line as Twitch would send it."""
+    tags = {'badges': badges, 'color': color, 'display-name': user.title(),
+            'mod': int('moderator' in badges), 'tmi-sent-ts': _timestamp(), **tags}
+
+    return f'{_tags(tags)} :{user}!{user}@{user}.tmi.twitch.tv PRIVMSG #{channel} :{text}'
+
+
+def clearchat(channel: str, user: str = None, *, duration: int = None) -> str:
+    """Returns a CLEARCHAT line.  Without a user, the entire chat was
+    cleared;  without a duration, the user was banned."""
+    tags = {'room-id': 1, 'tmi-sent-ts': _timestamp()}
+
+    if duration is not None:
+        tags['ban-duration'] = duration
+
+    return f'{_tags(tags)} :tmi.twitch.tv CLEARCHAT #{channel}' + (f' :{user}' if user else '')
+
+
+def usernotice(channel: str, user: str, msg_id: str, text: str = None, **tags) -> str:
+    """Returns a USERNOTICE line, like the ones sent for subscriptions and
+    raids."""
+    tags = {'login': user, 'display-name': user.title(), 'msg-id': msg_id,
+            'system-msg': f'{user.title()} triggered {msg_id}.', 'tmi-sent-ts': _timestamp(), **tags}
+
+    return f'{_tags(tags)} :tmi.twitch.tv USERNOTICE #{channel}' + (f' :{text}' if text else '')
+
+
+def chatter(channel: str, count: int, *, users: int = 100, command_ratio: float = 0.0, prefix: str = '!',
+            commands: typing.Sequence[str] = ('ping',), seed: int = 0) -> typing.Iterator[str]:
+    """Yields `count` lines of synthetic chat from `users` distinct chatters.
+    About `command_ratio` of the messages invoke one of `commands`."""
+    rng = random.Random(seed)
+
+    for _ in range(count):
+        user = f'viewer{rng.randrange(users)}'
+        badges = 'moderator/1' if rng.random() < 0.05 else 'subscriber/12' if rng.random() < 0.3 else ''
+
+        if rng.random() < command_ratio:
+            text = f'{prefix}{rng.choice(commands)}'
+
+        else:
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+
+        yield privmsg(channel, user, text, badges=badges, color=f'#{rng.randrange(0xFFFFFF):06X}')
@@ -0,0 +1,88 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+import shlex
+import time
+import typing
+
+from . import messages
+from .server import StandIn
+
+__all__ = ['run_script']
+
+LOGGER = logging.getLogger('extensions.twitch.standin.script')
+USAGE = """\
+Each line of a script is one of:
+  wait #channel [timeout]             Waits until a client joins #channel.
+  sleep seconds                       Pauses the script.
+  say #channel user text...           Sends a single chat message.
+  burst #channel count [rate] [ratio] Sends `count` synthetic messages, `rate` per second.
+  clearchat #channel [user] [secs]    Clears the chat, bans a user, or times them out.
+  usernotice #channel user msg-id     Sends a user notice, like "sub" or "raid".
+  ping                                Pings every client.
+  reconnect                           Asks every client to reconnect, then drops them.
+Blank lines and lines starting with "#" followed by a space are ignored."""
+
+
+def run_script(server: StandIn, lines: typing.Iterable[str]):
+    """Runs a stand-in script against `server`."""
+    for number, line in enumerate(lines, start=1):
+        line = line.strip()
+
+        if not line or line.startswith('# '):
+            continue
+
+        command, *args = shlex.split(line)
+        channel = args[0].lstrip('#').lower() if args else ''
+
+        LOGGER.info(f'{number}: {line}')
+
+        if command == 'wait':
+            deadline = time.monotonic() + (float(args[1]) if len(args) > 1 else 60)
+
+            while not server.members(channel) and time.monotonic() < deadline:
+                time.sleep(0.05)
+
+        elif command == 'sleep':
+            time.sleep(float(args[0]))
+
+        elif command == 'say':
+            server.broadcast(channel, messages.privmsg(channel, args[1], ' '.join(args[2:])))
+
+        elif command == 'burst':
+            count = int(args[1])
+            rate = float(args[2]) if len(args) > 2 else 0
+            ratio = float(args[3]) if len(args) > 3 else 0
+            elapsed = server.burst(channel, messages.chatter(channel, count, command_ratio=ratio), rate=rate)
+
+            LOGGER.info(f'Sent {count} messages in {elapsed:.3f}s ({count / max(elapsed, 1e-9):,.0f}/s)')
+
+        elif command == 'clearchat':
+            user = args[1] if len(args) > 1 else None
+            duration = int(args[2]) if len(args) > 2 else None
+            server.broadcast(channel, messages.clearchat(channel, user, duration=duration))
+
+        elif command == 'usernotice':
+            server.broadcast(channel, messages.usernotice(channel, args[1], args[2]))
+
+        elif command == 'ping':
+            server.ping()
+
+        elif command == 'reconnect':
+            server.reconnect()
+
+        else:
+            raise ValueError(f'Unknown stand-in command "{command}" on line {number}')
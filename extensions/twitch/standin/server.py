@@ -0,0 +1,310 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+import socket
+import threading
+import time
+import typing
+
+__all__ = ['StandIn', 'Connection']
+
+HOST = 'tmi.twitch.tv'
+CAPABILITIES = ('twitch.tv/tags', 'twitch.tv/commands', 'twitch.tv/membership')
+
+
+class Connection:
+    """A client connected to the stand-in."""
+
+    def __init__(self, server: 'StandIn', sock: socket.socket, address: typing.Tuple[str, int]):
+        self.server = server
+        self.socket = sock
+        self.address = address
+
+        self.nick: typing.Optional[str] = None
+        self.password: typing.Optional[str] = None
+        self.capabilities: typing.Set[str] = set()
+        self.channels: typing.Set[str] = set()
+        self.received: typing.List[str] = []  # PRIVMSGs sent by the client
+
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name=f'standin-{address[1]}', daemon=True)
+
+    @property
+    def prefix(self) -> str:
+        return f'{self.nick}!{self.nick}@{self.nick}.{HOST}'
+
+    def start(self):
+        self._thread.start()
+
+    def send(self, line: str):
+        """Sends a single line to the client.  Tags are stripped if the client
+        didn't request the tags capability."""
+        if line.startswith('@') and 'twitch.tv/tags' not in self.capabilities:
+            line = line.partition(' ')[2]
+
+        self.send_raw(f'{line}\r\n'.encode('UTF-8'))
+
+    def send_raw(self, data: bytes):
+        with self._lock:
+            try:
+                self.socket.sendall(data)
+
+            except OSError:
+                self.close()
+
+    def close(self):
+        try:
+            self.socket.shutdown(socket.SHUT_RDWR)
+
+        except OSError:
+            pass
+
+        self.socket.close()
+
+    # Reader thread
+    def _run(self):
+        buffer = b''
+
+        try:
+            while True:
+                data = self.socket.recv(65536)
+
+                if not data:
+                    break
+
+                buffer += data
+
+                while b'\r\n' in buffer:
+                    line, buffer = buffer.split(b'\r\n', 1)
+                    self._handle(line.decode('UTF-8', 'replace'))
+
+        except OSError:
+            pass
+
+        finally:
+            self.server.connection_closed(self)
+
+    def _handle(self, line: str):
+        self.server.LOGGER.debug(f'{self.address[1]} > {line}')
+        command, _, params = line.partition(' ')
+        command = command.upper()
+
+        if command == 'CAP':
+            sub, _, requested = params.partition(' ')
+
+            if sub.upper() == 'REQ':
+                requested = set(requested.lstrip(':').split())
+                accepted = requested.intersection(CAPABILITIES)
+                self.capabilities.update(accepted)
+
+                self.send(f':{HOST} CAP * {"ACK" if accepted == requested else "NAK"} :{" ".join(sorted(requested))}')
+
+        elif command == 'PASS':
+            self.password = params
+
+        elif command == 'NICK':
+            self.nick = params.strip().lower()
+
+            for code, text in (('001', 'Welcome, GLHF!'), ('002', f'Your host is {HOST}'),
+                               ('003', 'This server is rather new'), ('004', '-'), ('375', '-'),
+                               ('372', 'You are in a maze of twisty passages, all alike.'), ('376', '>')):
+                self.send(f':{HOST} {code} {self.nick} :{text}')
+
+        elif command == 'PING':
+            self.send(f':{HOST} PONG {HOST} {params}')
+
+        elif command == 'JOIN':
+            for channel in params.split(','):
+                self.server.join(self, channel.strip().lstrip('#').lower())
+
+        elif command == 'PART':
+            for channel in params.split(','):
+                self.server.part(self, channel.strip().lstrip('#').lower())
+
+        elif command == 'PRIVMSG':
+            self.received.append(line)
+            self.server.message_received(self, line)
+
+        elif command == 'QUIT':
+            self.close()
+
+
+class StandIn:
+    """A local server that speaks enough of Twitch's IRC dialect for the
+    Twitch extension to connect, join channels, send messages, and receive
+    chat, moderation, and user notices.
+
+    The server runs on background threads.  Lines are broadcast to every
+    client in a channel with `broadcast`, and `burst` streams a sequence of
+    lines at a fixed rate, so connection handling and throughput can be
+    measured without Twitch."""
+    LOGGER = logging.getLogger('extensions.twitch.standin')
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        self.connections: typing.List[Connection] = []
+        self.joins = 0
+        self.messages = 0  # PRIVMSGs received from clients
+
+        self._lock = threading.Lock()
+        self._socket = socket.create_server((host, port))
+        self._thread = threading.Thread(target=self._accept, name='standin', daemon=True)
+        self._on_message: typing.List[typing.Callable[[Connection, str], None]] = []
+
+    @property
+    def address(self) -> typing.Tuple[str, int]:
+        return self._socket.getsockname()[:2]
+
+    @property
+    def server(self) -> str:
+        """The value the Twitch extension's "server" setting should be set to
+        to connect to this stand-in."""
+        return '{}:{}'.format(*self.address)
+
+    def start(self) -> 'StandIn':
+        self._thread.start()
+        self.LOGGER.info(f'Listening on {self.server}')
+
+        return self
+
+    def close(self):
+        self._socket.close()
+
+        for connection in self.connections.copy():
+            connection.close()
+
+    def __enter__(self) -> 'StandIn':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # Membership methods
+    def join(self, connection: Connection, channel: str):
+        with self._lock:
+            connection.channels.add(channel)
+            self.joins += 1
+
+        connection.send(f':{connection.prefix} JOIN #{channel}')
+        connection.send(f':{connection.nick}.{HOST} 353 {connection.nick} = #{channel} :{connection.nick}')
+        connection.send(f':{connection.nick}.{HOST} 366 {connection.nick} #{channel} :End of /NAMES list')
+
+        if 'twitch.tv/commands' in connection.capabilities:
+            connection.send(f'@emote-only=0;followers-only=-1;r9k=0;room-id=1;slow=0;subs-only=0 '
+                            f':{HOST} ROOMSTATE #{channel}')
+
+        self._membership(connection, channel, 'JOIN')
+
+    def part(self, connection: Connection, channel: str):
+        with self._lock:
+            connection.channels.discard(channel)
+
+        connection.send(f':{connection.prefix} PART #{channel}')
+        self._membership(connection, channel, 'PART')
+
+    def _membership(self, connection: Connection, channel: str, command: str):
+        for other in self.members(channel):
+            if other is not connection and 'twitch.tv/membership' in other.capabilities:
+                other.send(f':{connection.prefix} {command} #{channel}')
+
+    def members(self, channel: str) -> typing.List[Connection]:
+        with self._lock:
+            return [c for c in self.connections if channel in c.channels]
+
+    # Inbound methods
+    def on_message(self, callback: typing.Callable[[Connection, str], None]):
+        """Registers a callback invoked with every PRIVMSG a client sends."""
+        self._on_message.append(callback)
+
+    def message_received(self, connection: Connection, line: str):
+        self.messages += 1
+
+        for callback in self._on_message:
+            callback(connection, line)
+
+    # Outbound methods
+    def broadcast(self, channel: str, line: str) -> int:
+        """Sends `line` to every client in `channel`, and returns how many
+        clients received it.  CLEARCHAT and USERNOTICE lines are only sent to
+        clients that requested the commands capability, like Twitch does."""
+        command = line.partition(' ')[2] if line.startswith('@') else line
+        needs_commands = any(f' {c} ' in command for c in ('CLEARCHAT', 'USERNOTICE', 'ROOMSTATE'))
+        members = [c for c in self.members(channel) if not needs_commands or 'twitch.tv/commands' in c.capabilities]
+
+        for connection in members:
+            connection.send(line)
+
+        return len(members)
+
+    def burst(self, channel: str, lines: typing.Iterable[str], *, rate: float = 0) -> float:
+        """Broadcasts every line in `lines` to `channel`, `rate` lines per
+        second, or as fast as possible if `rate` isn't positive.  Returns how
+        long the burst took."""
+        interval = 1 / rate if rate > 0 else 0
+        start = deadline = time.perf_counter()
+
+        for line in lines:
+            if interval:
+                deadline += interval
+                time.sleep(max(deadline - time.perf_counter(), 0))
+
+            self.broadcast(channel, line)
+
+        return time.perf_counter() - start
+
+    def burst_async(self, channel: str, lines: typing.Iterable[str], *, rate: float = 0) -> threading.Thread:
+        """Runs `burst` on a background thread, and returns the thread."""
+        thread = threading.Thread(target=self.burst, args=(channel, lines), kwargs={'rate': rate},
+                                  name='standin-burst', daemon=True)
+        thread.start()
+
+        return thread
+
+    def reconnect(self):
+        """Asks every client to reconnect, then drops them, like Twitch does
+        before a server restarts."""
+        for connection in self.connections.copy():
+            connection.send(f':{HOST} RECONNECT')
+            connection.close()
+
+    def ping(self):
+        """Pings every client."""
+        for connection in self.connections.copy():
+            connection.send(f'PING :{HOST}')
+
+    # Accept thread
+    def _accept(self):
+        while True:
+            try:
+                sock, address = self._socket.accept()
+
+            except OSError:
+                break
+
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            connection = Connection(self, sock, address)
+
+            with self._lock:
+                self.connections.append(connection)
+
+            self.LOGGER.debug(f'Accepted connection from {address[0]}:{address[1]}')
+            connection.start()
+
+    def connection_closed(self, connection: Connection):
+        with self._lock:
+            if connection in self.connections:
+                self.connections.remove(connection)
+
+        self.LOGGER.debug(f'Connection from {connection.address[0]}:{connection.address[1]} closed')
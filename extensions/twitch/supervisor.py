@@ -0,0 +1,235 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import dataclasses
+import logging
+import random
+import time
+import typing
+
+from PySide2 import QtCore
+
+from QtTwitch import gateway
+
+if typing.TYPE_CHECKING:
+    from .pool import GatewayPool
+
+__all__ = ['Supervisor', 'Counters']
+
+
+@dataclasses.dataclass()
+class Counters:
+    """Counters describing how often connections dropped, and how long they
+    took to recover."""
+    disconnects: int = 0
+    reconnect_requests: int = 0  # RECONNECTs sent by Twitch
+    timeouts: int = 0  # Connections that went silent
+    attempts: int = 0
+    recoveries: typing.List[float] = dataclasses.field(default_factory=list)  # Seconds, drop to rejoined
+
+    @property
+    def average_recovery(self) -> float:
+        return sum(self.recoveries) / len(self.recoveries) if self.recoveries else 0.0
+
+    @property
+    def max_recovery(self) -> float:
+        return max(self.recoveries, default=0.0)
+
+
+@dataclasses.dataclass()
+class _State:
+    last_seen: float
+    attempt: int = 0
+    dropped_at: typing.Optional[float] = None
+    connecting_since: typing.Optional[float] = None
+    retrying: bool = False
+    rejoining: bool = False  # Whether recovery waits for a channel to be joined
+
+
+class Supervisor(QtCore.QObject):
+    """Keeps a pool's connections alive.
+
+    A connection is restarted when it drops, when Twitch asks for it with a
+    RECONNECT, or when nothing was received on it for `SILENCE_TIMEOUT`
+    seconds;  Twitch pings every connection about every five minutes.
+    Restarts are delayed with exponential backoff and full jitter, so a pool
+    doesn't reconnect all at once, and the connection's channels are rejoined
+    through the pool's join scheduler.  A connection counts as recovered once
+    Twitch confirms the first of those joins, or welcomes it if it had no
+    channels."""
+    LOGGER = logging.getLogger('extensions.twitch.supervisor')
+
+    BASE_DELAY = 1.0  # Seconds
+    MAX_DELAY = 120.0
+    CONNECT_TIMEOUT = 15.0
+    SILENCE_TIMEOUT = 6 * 60.0
+    CHECK_INTERVAL = 1000  # Milliseconds
+
+    def __init__(self, pool: 'GatewayPool'):
+        super(Supervisor, self).__init__(parent=pool)
+
+        self.pool = pool
+        self.counters = Counters()
+
+        self._states: typing.Dict[gateway.Gateway, _State] = {}
+        self._timer = QtCore.QTimer(parent=self)
+        self._timer.setInterval(self.CHECK_INTERVAL)
+        self._timer.timeout.connect(self.check)
+
+    # Tracking methods
+    def watch(self, connection: gateway.Gateway):
+        """Starts supervising `connection`."""
+        self._states[connection] = _State(time.monotonic(), connecting_since=time.monotonic())
+        connection.on_message.connect(lambda line, c=connection: self.seen(c, line))
+
+    def unwatch(self, connection: gateway.Gateway):
+        """Stops supervising `connection`, including any pending restart."""
+        self._states.pop(connection, None)
+
+    def start(self):
+        now = time.monotonic()
+
+        for state in self._states.values():
+            state.last_seen = state.connecting_since = now
+
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._states.clear()
+
+    def seen(self, connection: gateway.Gateway, line: str):
+        """Invoked with every line received on `connection`."""
+        state = self._states.get(connection)
+
+        if state is None:
+            return
+
+        state.last_seen = time.monotonic()
+        state.connecting_since = None
+
+        if line.startswith('@'):
+            line = line.partition(' ')[2]
+
+        source = ''
+
+        if line.startswith(':'):
+            source, _, line = line.partition(' ')
+
+        command = line.partition(' ')[0]
+
+        if command == 'RECONNECT':
+            self.counters.reconnect_requests += 1
+            self.restart(connection, 'the server requested a reconnect')
+
+        elif state.dropped_at is not None and not state.retrying:
+            if state.rejoining:
+                # 366 ends the names list Twitch sends after the account joins
+                nick = source[1:].partition('!')[0]
+                recovered = command == '366' or command == 'JOIN' and nick.lower() == self.pool.nick.lower()
+
+            else:
+                recovered = command == '001'
+
+            if recovered:
+                self._recovered(connection, state)
+
+    def check(self):
+        """Restarts every connection that dropped or went silent."""
+        now = time.monotonic()
+
+        for connection, state in list(self._states.items()):
+            if state.retrying:
+                continue
+
+            if state.connecting_since is not None:
+                if connection.is_connected():
+                    state.connecting_since = None
+
+                elif now - state.connecting_since >= self.CONNECT_TIMEOUT:
+                    self.restart(connection, 'the connection could not be established')
+
+            elif not connection.is_connected():
+                self.restart(connection, 'the connection was lost')
+
+            elif now - state.last_seen >= self.SILENCE_TIMEOUT:
+                self.counters.timeouts += 1
+                self.restart(connection, f'nothing was received for {self.SILENCE_TIMEOUT:.0f} seconds')
+
+    # Reconnection methods
+    def delay(self, attempt: int) -> float:
+        """Returns how long to wait before the `attempt`th reconnect."""
+        return random.uniform(0, min(self.MAX_DELAY, self.BASE_DELAY * 2 ** attempt))
+
+    def restart(self, connection: gateway.Gateway, reason: str):
+        """Closes `connection`, then reconnects it after a backoff delay."""
+        state = self._states.get(connection)
+
+        if state is None or state.retrying:
+            return
+
+        if state.dropped_at is None:
+            state.dropped_at = time.monotonic()
+            self.counters.disconnects += 1
+
+        delay = self.delay(state.attempt)
+        state.retrying = True
+
+        self.LOGGER.warning(f'Restarting connection #{self.pool.gateways.index(connection) + 1} in {delay:.1f}s '
+                            f'since {reason}')
+
+        self.pool.joins.cancel_connection(connection)
+        connection.disconnect()
+        QtCore.QTimer.singleShot(int(delay * 1000), lambda: self._reconnect(connection))
+
+    def _reconnect(self, connection: gateway.Gateway):
+        state = self._states.get(connection)
+
+        if state is None or not self.pool.is_connected():
+            return
+
+        channels = [c for c, g in self.pool.shards.items() if g is connection]
+
+        state.retrying = False
+        state.attempt += 1
+        state.last_seen = state.connecting_since = time.monotonic()
+        state.rejoining = bool(channels)
+        self.counters.attempts += 1
+
+        # The gateway rejoins the channels it remembers as soon as it
+        # connects, which would bypass the join scheduler's budget, and join
+        # every channel twice.
+        connection.channels.clear()
+        self.pool.connect_gateway(connection)
+
+        for channel in channels:
+            self.pool.joins.join(connection, channel)
+
+    def _recovered(self, connection: gateway.Gateway, state: _State):
+        elapsed = time.monotonic() - state.dropped_at
+        self.counters.recoveries.append(elapsed)
+
+        self.LOGGER.info(f'Connection #{self.pool.gateways.index(connection) + 1} recovered in {elapsed:.1f}s '
+                         f'after {state.attempt} attempts')
+
+        state.dropped_at = None
+        state.attempt = 0
+
+    def dump(self):
+        """Logs the supervisor's counters."""
+        c = self.counters
+        self.LOGGER.info(f'Connections: {c.disconnects} disconnects ({c.reconnect_requests} requested, '
+                         f'{c.timeouts} timed out), {c.attempts} reconnect attempts, {len(c.recoveries)} recoveries, '
+                         f'{c.average_recovery:.1f}s average recovery, {c.max_recovery:.1f}s longest recovery')
@@ -0,0 +1,179 @@
+"""
+This file is part of ShovelBot.
+
+ShovelBot is free software: you can redistribute it and/or modify it under the
+terms of the GNU General Public License as published by the Free Software
+Foundation, either version 3 of the License, or (at your option) any later
+version.
+
+ShovelBot is distributed in the hope that it will be useful, but WITHOUT ANY
+WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+PARTICULAR PURPOSE.  See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with
+ShovelBot.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import dataclasses
+import hashlib
+import json
+import logging
+import time
+import typing
+
+from PySide2 import QtCore, QtNetwork
+
+__all__ = ['TokenValidator', 'Validation', 'token_hash']
+
+
+def token_hash(token: str) -> str:
+    """Returns the key a token's validation is cached under, so tokens
+    themselves are never kept around as keys."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+@dataclasses.dataclass(frozen=True)
+class Validation:
+    """The result of validating a token with Twitch."""
+    login: str
+    user_id: str
+    client_id: str
+    scopes: typing.Tuple[str, ...]
+    expires_at: typing.Optional[float]  # Seconds since the epoch;  None if the token doesn't expire
+    validated_at: float
+
+    def is_fresh(self, interval: float, margin: float, minimum: float) -> bool:
+        """Whether or not the validation is recent enough to be trusted."""
+        return time.time() < self.revalidate_at(interval, margin, minimum)
+
+    def revalidate_at(self, interval: float, margin: float, minimum: float) -> float:
+        """Returns when the token should be validated again.  Tokens are
+        revalidated `interval` seconds after they were validated, or `margin`
+        seconds before they expire, but never sooner than `minimum` seconds
+        after they were validated, unless they expire before then."""
+        due = self.validated_at + interval
+
+        if self.expires_at is None:
+            return due
+
+        # Once a token is inside the margin, the margin is always in the past,
+        # so it's checked again after the minimum instead.
+        due = max(min(due, self.expires_at - margin), self.validated_at + minimum)
+
+        return min(due, self.expires_at)
+
+
+class TokenValidator(QtCore.QObject):
+    """Validates tokens with Twitch without blocking the event loop.
+
+    Results are cached by the token's sha256 hash.  Twitch expects tokens in
+    use to be validated every hour, so the current token is revalidated
+    `INTERVAL` seconds after its last validation, or `EXPIRY_MARGIN` seconds
+    before it expires, whichever is sooner.  Tokens that are already close to
+    expiring are revalidated every `MINIMUM_INTERVAL` seconds until they
+    expire.  Concurrent validations of the
+    same token share a single request."""
+    LOGGER = logging.getLogger('extensions.twitch.validation')
+
+    ENDPOINT = QtCore.QUrl('https://id.twitch.tv/oauth2/validate')
+    INTERVAL = 55 * 60.0  # Seconds
+    EXPIRY_MARGIN = 5 * 60.0
+    MINIMUM_INTERVAL = 60.0
+
+    validated = QtCore.Signal(str, object)  # Token, Validation
+    invalidated = QtCore.Signal(str, str)  # Token, reason
+
+    def __init__(self, manager: QtNetwork.QNetworkAccessManager, parent: QtCore.QObject = None):
+        super(TokenValidator, self).__init__(parent=parent)
+
+        self.manager = manager
+        self.cache: typing.Dict[str, Validation] = {}
+
+        self._pending: typing.Dict[str, QtNetwork.QNetworkReply] = {}
+        self._current: typing.Optional[str] = None
+
+        self._timer = QtCore.QTimer(parent=self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._revalidate)
+
+    def cached(self, token: str) -> typing.Optional[Validation]:
+        """Returns the cached validation of `token`, if it's still fresh."""
+        validation = self.cache.get(token_hash(token))
+
+        if validation is not None and validation.is_fresh(self.INTERVAL, self.EXPIRY_MARGIN, self.MINIMUM_INTERVAL):
+            return validation
+
+        return None
+
+    def validate(self, token: str, *, force: bool = False):
+        """Validates `token`, and makes it the token that's periodically
+        revalidated.  A fresh cached result is emitted immediately unless
+        `force` is passed."""
+        self._current = token
+        key = token_hash(token)
+        validation = None if force else self.cached(token)
+
+        if validation is not None:
+            self._schedule(validation)
+
+            return self.validated.emit(token, validation)
+
+        if key in self._pending:
+            return
+
+        request = QtNetwork.QNetworkRequest(self.ENDPOINT)
+        request.setRawHeader(b'Authorization', f'OAuth {token}'.encode())
+
+        reply = self.manager.get(request)
+        reply.finished.connect(lambda: self._finished(token, key, reply))
+        self._pending[key] = reply
+
+    def forget(self, token: str):
+        """Discards everything cached about `token`."""
+        self.cache.pop(token_hash(token), None)
+
+        if self._current == token:
+            self._current = None
+            self._timer.stop()
+
+    def _revalidate(self):
+        if self._current is not None:
+            self.validate(self._current, force=True)
+
+    def _finished(self, token: str, key: str, reply: QtNetwork.QNetworkReply):
+        self._pending.pop(key, None)
+        reply.deleteLater()
+
+        status = reply.attribute(QtNetwork.QNetworkRequest.HttpStatusCodeAttribute)
+
+        if status == 401:
+            self.cache.pop(key, None)
+
+            return self.invalidated.emit(token, 'Twitch rejected the token')
+
+        if reply.error() != QtNetwork.QNetworkReply.NoError:
+            # Network failures aren't the token's fault;  try again later.
+            self.LOGGER.warning(f'Could not validate token!  Reason: {reply.errorString()}')
+            self._timer.start(int(self.EXPIRY_MARGIN * 1000 / 5))
+
+            return
+
+        try:
+            data = json.loads(bytes(reply.readAll()).decode())
+
+        except ValueError as e:
+            return self.LOGGER.warning(f'Could not decode token validation!  Reason: {e!s}')
+
+        now = time.time()
+        expires_in = data.get('expires_in', 0)
+        validation = Validation(data.get('login', ''), data.get('user_id', ''), data.get('client_id', ''),
+                                tuple(data.get('scopes') or ()), now + expires_in if expires_in else None, now)
+        self.cache[key] = validation
+
+        if token == self._current:
+            self._schedule(validation)
+
+        self.validated.emit(token, validation)
+
+    def _schedule(self, validation: Validation):
+        delay = validation.revalidate_at(self.INTERVAL, self.EXPIRY_MARGIN, self.MINIMUM_INTERVAL) - time.time()
+        self._timer.start(max(int(delay * 1000), 1000))